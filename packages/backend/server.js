@@ -57,6 +57,12 @@ const config = {
   ragServiceUrl: process.env.RAG_SERVICE_URL || "http://localhost:8000",
   ragTopK: parseInt(process.env.RAG_TOP_K) || 5,
   ragThreshold: parseFloat(process.env.RAG_SIMILARITY_THRESHOLD) || 0.5,
+  // Adaptive retrieval: RAG_TOP_K becomes an upper bound
+  ragAdaptive: process.env.RAG_ADAPTIVE === "true",
+  // Diverse retrieval (MMR): skip near-duplicate chunks, and cap the chunks
+  // taken from one document, so the prompt carries less repeated context
+  ragDiversify: process.env.RAG_DIVERSIFY === "true",
+  ragMaxPerDocument: parseInt(process.env.RAG_MAX_PER_DOCUMENT) || undefined,
 
   // Session
   sessionStore: process.env.SESSION_STORE || "memory",
@@ -424,9 +430,17 @@ app.post("/chat/sendText", async (req, res) => {
             query: text,
             k: config.ragTopK,
             threshold: config.ragThreshold,
+            adaptive: config.ragAdaptive,
+            diversify: config.ragDiversify,
+            max_per_document: config.ragMaxPerDocument,
             lang_hint: language,
           },
-          { timeout: 10000 }
+          {
+            timeout: 10000,
+            // Chat traffic is scheduled ahead of bulk jobs; the RAG service
+            // drops the request if it cannot start before we give up
+            headers: { "X-Priority": "interactive", "X-Timeout-Ms": "10000" },
+          }
         );
 
         ragHits = ragResponse.data.results || [];
@@ -568,9 +582,15 @@ app.post("/chat/sendAudio", upload.single("audio"), async (req, res) => {
             query: transcription.text,
             k: config.ragTopK,
             threshold: config.ragThreshold,
+            adaptive: config.ragAdaptive,
+            diversify: config.ragDiversify,
+            max_per_document: config.ragMaxPerDocument,
             lang_hint: transcription.language,
           },
-          { timeout: 10000 }
+          {
+            timeout: 10000,
+            headers: { "X-Priority": "interactive", "X-Timeout-Ms": "10000" },
+          }
         );
 
         ragHits = ragResponse.data.results || [];
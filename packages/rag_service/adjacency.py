@@ -0,0 +1,118 @@
+"""
+Chunk adjacency index for context expansion
+
+Chunks are stored in reading order (document, page, offset). For each chunk
+position this module records its previous/next neighbour in the same
+document and the position ranges of its page and document as compact int32
+arrays, so neighbours can be looked up without another vector search.
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+ADJACENCY_KEYS = ('prev', 'next', 'page_start', 'page_end', 'doc_start', 'doc_end')
+
+# Longest overlap looked for when stitching consecutive chunks
+MAX_OVERLAP_CHARS = 400
+# Characters of the next chunk used to locate it in the previous one
+OVERLAP_PROBE_CHARS = 32
+
+
+def build_adjacency(chunks: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """
+    Compute neighbour links and page/document ranges
+
+    Args:
+        chunks: Chunk dicts in reading order (need 'filename' and 'page_num')
+
+    Returns:
+        Dict of int32 arrays indexed by chunk position:
+            prev / next           -> neighbour position in the same document, or -1
+            page_start / page_end -> [start, end) positions of the chunk's page
+            doc_start / doc_end   -> [start, end) positions of the chunk's document
+    """
+    n = len(chunks)
+    doc_keys = [chunk['filename'] for chunk in chunks]
+    page_keys = [(chunk['filename'], chunk['page_num']) for chunk in chunks]
+    doc_start, doc_end = _runs(doc_keys)
+    page_start, page_end = _runs(page_keys)
+
+    positions = np.arange(n, dtype=np.int32)
+    prev = np.where(positions > doc_start, positions - 1, -1).astype(np.int32)
+    nxt = np.where(positions + 1 < doc_end, positions + 1, -1).astype(np.int32)
+    return {
+        'prev': prev,
+        'next': nxt,
+        'page_start': page_start,
+        'page_end': page_end,
+        'doc_start': doc_start,
+        'doc_end': doc_end,
+    }
+
+
+def _runs(keys: List) -> tuple:
+    """[start, end) of the run of equal consecutive keys containing each position"""
+    n = len(keys)
+    starts = np.empty(n, dtype=np.int32)
+    ends = np.empty(n, dtype=np.int32)
+    run_start = 0
+    for i in range(1, n + 1):
+        if i == n or keys[i] != keys[run_start]:
+            starts[run_start:i] = run_start
+            ends[run_start:i] = i
+            run_start = i
+    return starts, ends
+
+
+def window_range(adjacency: Dict[str, np.ndarray], position: int, window: int,
+                 scope: str = 'document') -> range:
+    """
+    Positions of a chunk and up to `window` neighbours on each side
+
+    Args:
+        adjacency: Output of build_adjacency
+        position: Chunk position
+        window: Neighbours per side
+        scope: 'document' or 'page' (neighbours never cross this boundary)
+
+    Returns:
+        Range of chunk positions in reading order
+    """
+    prefix = 'page' if scope == 'page' else 'doc'
+    lo = adjacency[f'{prefix}_start'][position]
+    hi = adjacency[f'{prefix}_end'][position]
+    return range(max(int(lo), position - window), min(int(hi), position + window + 1))
+
+
+def merge_overlap(left: str, right: str) -> str:
+    """
+    Join two consecutive chunks, dropping the text they share
+
+    The overlap is found by locating the start of `right` in the tail of
+    `left`; chunks that do not overlap (e.g. across pages) are joined with
+    a newline.
+    """
+    if not left:
+        return right
+    tail = left[-MAX_OVERLAP_CHARS:]
+    probe = right[:OVERLAP_PROBE_CHARS]
+    if probe:
+        at = tail.find(probe)
+        while at != -1:
+            shared = tail[at:]
+            if right.startswith(shared):
+                return left + right[len(shared):]
+            if shared.startswith(right):
+                # right lies entirely inside the overlap
+                return left
+            at = tail.find(probe, at + 1)
+    return left + "\n" + right
+
+
+def stitch(texts: Sequence[str]) -> str:
+    """Concatenate consecutive chunk texts with overlap removal"""
+    text = ""
+    for part in texts:
+        text = merge_overlap(text, part)
+    return text
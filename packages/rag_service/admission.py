@@ -0,0 +1,217 @@
+"""
+Admission control for retrieval work
+
+Interactive chat queries and bulk jobs (nightly evaluations, re-ranking
+sweeps) share the encoder and the FAISS search. Requests wait in one queue
+per priority class, and a fixed number of worker slots run them, picking
+queues by smooth weighted round-robin (interactive 4 : bulk 1 by default).
+Before running, a request is dropped if its client deadline has already
+passed. New low-priority requests are shed while queueing delay is over the
+target, so a bulk burst cannot push interactive latency up.
+"""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from starlette.concurrency import run_in_threadpool
+
+PRIORITIES = ("interactive", "bulk")
+DEFAULT_WEIGHTS = {"interactive": 4, "bulk": 1}
+
+# Smoothing of the queue delay average (weight of the newest sample)
+DELAY_EWMA_ALPHA = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Request refused at admission or dropped from the queue"""
+
+    def __init__(self, reason: str, detail: str, retry_after: float = 1.0):
+        """
+        Args:
+            reason: shed | queue_full | deadline
+            detail: Human-readable message
+            retry_after: Suggested client back-off in seconds
+        """
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+class _Ticket:
+    """A queued request waiting for a worker slot"""
+
+    __slots__ = ("priority", "deadline", "enqueued", "future")
+
+    def __init__(self, priority: str, deadline: Optional[float], future: asyncio.Future):
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued = time.monotonic()
+        self.future = future
+
+
+class AdmissionController:
+    """Priority queues with weighted dispatch onto a bounded set of workers"""
+
+    def __init__(self, workers: int = 2, weights: Dict[str, int] = None,
+                 max_queue: int = 100, target_queue_ms: float = 250.0,
+                 shed: Sequence[str] = ("bulk",)):
+        """
+        Args:
+            workers: Requests running at once (threads doing encode + search)
+            weights: Share of dispatches per priority class when all are queued
+            max_queue: Queued requests allowed per priority class
+            target_queue_ms: Queueing delay above which `shed` classes are refused
+            shed: Priority classes refused while over the target
+        """
+        self.workers = workers
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.max_queue = max_queue
+        self.target_queue_ms = target_queue_ms
+        self.shed = set(shed)
+        self.queues: Dict[str, deque] = {priority: deque() for priority in self.weights}
+        self._credits: Dict[str, int] = dict.fromkeys(self.weights, 0)
+        self.active = 0
+        # Moving average of the time requests spent queued
+        self.queue_delay_ms = 0.0
+        self.stats: Dict[str, Dict[str, int]] = {
+            priority: {'admitted': 0, 'completed': 0, 'shed': 0, 'rejected': 0, 'expired': 0}
+            for priority in self.weights
+        }
+
+    def current_delay_ms(self) -> float:
+        """
+        Queueing delay estimate
+
+        The moving average, or the age of the oldest waiter if that is longer;
+        zero when nothing is queued, so shedding stops as soon as the backlog
+        clears.
+        """
+        waiting = [queue[0].enqueued for queue in self.queues.values() if queue]
+        if not waiting:
+            return 0.0
+        oldest = (time.monotonic() - min(waiting)) * 1000
+        return max(self.queue_delay_ms, oldest)
+
+    async def run(self, priority: str, fn: Callable, *args,
+                  deadline: Optional[float] = None) -> Any:
+        """
+        Run a blocking function in a worker slot once admitted
+
+        Args:
+            priority: Priority class (a key of weights)
+            fn: Blocking callable (runs in the thread pool)
+            *args: Arguments for fn
+            deadline: time.monotonic() value after which the client has given up
+
+        Returns:
+            fn's return value
+
+        Raises:
+            AdmissionRejected: Shed, queue full, or deadline passed before running
+        """
+        if priority not in self.queues:
+            raise ValueError(f"Unknown priority: {priority}")
+        stats = self.stats[priority]
+
+        if deadline is not None and time.monotonic() >= deadline:
+            stats['expired'] += 1
+            raise AdmissionRejected("deadline", "Client deadline already passed")
+        delay_ms = self.current_delay_ms()
+        if priority in self.shed and delay_ms > self.target_queue_ms:
+            stats['shed'] += 1
+            raise AdmissionRejected(
+                "shed", f"Overloaded ({delay_ms:.0f} ms queueing), {priority} request shed",
+                retry_after=max(1.0, delay_ms / 1000),
+            )
+        queue = self.queues[priority]
+        if len(queue) >= self.max_queue:
+            stats['rejected'] += 1
+            raise AdmissionRejected("queue_full", f"Too many queued {priority} requests")
+        stats['admitted'] += 1
+
+        if self.active < self.workers and not any(self.queues.values()):
+            # Idle worker and nobody waiting: run now
+            self.active += 1
+            self._observe_wait(0.0)
+        else:
+            ticket = _Ticket(priority, deadline, asyncio.get_running_loop().create_future())
+            queue.append(ticket)
+            try:
+                await ticket.future
+            except asyncio.CancelledError:
+                if ticket.future.cancelled():
+                    # Client went away while queued
+                    try:
+                        queue.remove(ticket)
+                    except ValueError:
+                        pass
+                else:
+                    # Slot was granted just before the cancellation
+                    self._release()
+                raise
+
+        try:
+            return await run_in_threadpool(fn, *args)
+        finally:
+            stats['completed'] += 1
+            self._release()
+
+    def _release(self) -> None:
+        """Free a worker slot and hand it to the next queued request"""
+        self.active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free worker slots to queued requests"""
+        while self.active < self.workers:
+            ticket = self._next_ticket()
+            if ticket is None:
+                return
+            if ticket.future.done():
+                continue
+            now = time.monotonic()
+            if ticket.deadline is not None and now >= ticket.deadline:
+                # Nobody is waiting for this answer any more
+                self.stats[ticket.priority]['expired'] += 1
+                ticket.future.set_exception(
+                    AdmissionRejected("deadline", "Client deadline passed while queued")
+                )
+                continue
+            self._observe_wait((now - ticket.enqueued) * 1000)
+            self.active += 1
+            ticket.future.set_result(None)
+
+    def _next_ticket(self) -> Optional[_Ticket]:
+        """Smooth weighted round-robin over the non-empty queues"""
+        ready = [priority for priority, queue in self.queues.items() if queue]
+        if not ready:
+            return None
+        for priority in self.queues:
+            if priority in ready:
+                self._credits[priority] += self.weights[priority]
+            else:
+                # No credit banked while idle, so a class cannot burst later
+                self._credits[priority] = 0
+        chosen = max(ready, key=lambda priority: self._credits[priority])
+        self._credits[chosen] -= sum(self.weights[priority] for priority in ready)
+        return self.queues[chosen].popleft()
+
+    def _observe_wait(self, wait_ms: float) -> None:
+        self.queue_delay_ms += DELAY_EWMA_ALPHA * (wait_ms - self.queue_delay_ms)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depths, counters and delay"""
+        return {
+            'workers': self.workers,
+            'active': self.active,
+            'queue_delay_ms': round(self.current_delay_ms(), 1),
+            'target_queue_ms': self.target_queue_ms,
+            'classes': {
+                priority: {'queued': len(self.queues[priority]), 'weight': self.weights[priority],
+                           **self.stats[priority]}
+                for priority in self.queues
+            },
+        }
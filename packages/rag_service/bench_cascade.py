@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Cascade Search Benchmark for Shankh.ai RAG Service
+
+Compares two-stage search (reduced-dimension coarse pass + exact re-rank)
+against exhaustive full-dimension search on an existing index: recall@k of
+the cascade results and mean latency per query, for each reduced dimension
+and candidate pool size. Use it to choose --coarse-dim for ingest.py and
+CASCADE_POOL for the server.
+
+Queries are stored chunk vectors with Gaussian noise added (so a query is
+never identical to a chunk), or real questions with --queries.
+
+Usage:
+    python bench_cascade.py --index ./index
+    python bench_cascade.py --index ./index --dims 64 128 256 --pools 50 100 200 -k 5
+    python bench_cascade.py --index ./index --queries questions.txt --method truncate
+
+Author: Shankh.ai Team
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import faiss
+import numpy as np
+
+from cascade import PROJECTION_METHODS, CascadeIndex
+
+
+def load_queries(index: faiss.Index, args) -> np.ndarray:
+    """Normalized query embeddings (encoded questions or perturbed chunk vectors)"""
+    if args.queries:
+        from sentence_transformers import SentenceTransformer
+        texts = [line.strip() for line in Path(args.queries).read_text(encoding='utf-8').splitlines()
+                 if line.strip()]
+        model = SentenceTransformer(args.embedding_model, token=False)
+        queries = model.encode(texts, convert_to_numpy=True).astype(np.float32)
+    else:
+        rng = np.random.default_rng(0)
+        picks = rng.choice(index.ntotal, size=min(args.num_queries, index.ntotal), replace=False)
+        queries = index.reconstruct_batch(picks)
+        queries = queries + rng.normal(0, args.noise, queries.shape).astype(np.float32)
+    faiss.normalize_L2(queries)
+    return queries
+
+
+def benchmark_cascade(index: faiss.Index, vectors: np.ndarray, queries: np.ndarray,
+                      exact: np.ndarray, dim: int, pool: int, args) -> Dict:
+    """Recall@k and latency of one (dim, pool) setting"""
+    cascade = CascadeIndex.build(vectors, dim, args.method)
+    hits = 0
+    start = time.perf_counter()
+    for query, truth in zip(queries, exact):
+        _, positions = cascade.search(index.reconstruct_batch, query[None, :], args.k, pool)
+        hits += len(set(positions.tolist()) & set(truth.tolist()))
+    elapsed = time.perf_counter() - start
+    return {
+        'dim': dim,
+        'pool': pool,
+        'recall': hits / exact.size,
+        'ms': elapsed * 1000 / len(queries),
+    }
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark cascade search recall and latency")
+    parser.add_argument("--index", default="./index", help="Index directory (default: ./index)")
+    parser.add_argument("--dims", type=int, nargs="*", default=[64, 128, 256],
+                        help="Reduced dimensions to test (default: 64 128 256)")
+    parser.add_argument("--pools", type=int, nargs="*", default=[50, 100, 200],
+                        help="Candidate pool sizes to test (default: 50 100 200)")
+    parser.add_argument("--method", choices=PROJECTION_METHODS, default="pca",
+                        help="Projection (default: pca)")
+    parser.add_argument("-k", type=int, default=5, help="Hits per query (default: 5)")
+    parser.add_argument("--num-queries", type=int, default=200,
+                        help="Synthetic queries from perturbed chunk vectors (default: 200)")
+    parser.add_argument("--noise", type=float, default=0.02,
+                        help="Per-dimension noise of synthetic queries (default: 0.02)")
+    parser.add_argument("--queries", default=None, help="Text file with one question per line")
+    parser.add_argument("--embedding-model", default="paraphrase-multilingual-mpnet-base-v2",
+                        help="Encoder for --queries")
+    args = parser.parse_args()
+
+    index_file = Path(args.index) / "faiss_index.bin"
+    if not index_file.exists():
+        print(f"✗ FAISS index file not found: {index_file}")
+        return 1
+    index = faiss.read_index(str(index_file))
+    vectors = index.reconstruct_n(0, index.ntotal)
+    queries = load_queries(index, args)
+
+    # Exhaustive full-dimension search is the ground truth
+    # (one query at a time, like /retrieve)
+    start = time.perf_counter()
+    exact = np.vstack([index.search(query[None, :], args.k)[1] for query in queries])
+    exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    print("=" * 70)
+    print(f"  Cascade Benchmark ({index.ntotal} vectors x {index.d} dims, "
+          f"{len(queries)} queries, k={args.k}, {args.method})")
+    print("=" * 70)
+    print(f"  exhaustive search: {exact_ms:.3f} ms/query")
+
+    rows: List[Dict] = []
+    for dim in args.dims:
+        if not 0 < dim < index.d:
+            print(f"  ✗ Skipping dim {dim} (index has {index.d})")
+            continue
+        for pool in args.pools:
+            rows.append(benchmark_cascade(index, vectors, queries, exact, dim, pool, args))
+
+    print("\n" + "=" * 70)
+    print(f"  {'dim':>6} {'pool':>6} {'recall@' + str(args.k):>10} {'ms/query':>10}")
+    for row in rows:
+        print(f"  {row['dim']:>6} {row['pool']:>6} {row['recall']:>10.3f} {row['ms']:>10.3f}")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
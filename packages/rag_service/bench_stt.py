@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+STT Benchmark for Shankh.ai RAG Service
+
+Measures transcription speed of each installed STT backend and reports the
+real-time factor (RTF = processing time / audio duration; lower is better,
+RTF < 1 means faster than real time).
+
+Usage:
+    python bench_stt.py --audio sample_hi.wav sample_en.mp3
+    python bench_stt.py --audio sample.wav --backends faster-whisper --beam-size 5
+    python bench_stt.py --synthetic 20 --model small
+
+Author: Shankh.ai Team
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from stt_service import (
+    SAMPLE_RATE,
+    STT_ENGINES,
+    available_backends,
+    decode_audio,
+)
+
+
+def synthetic_clip(seconds: float) -> np.ndarray:
+    """Speech-like test signal (alternating tone bursts and pauses)"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = (np.sin(2 * np.pi * 0.5 * t) > -0.3).astype(np.float32)
+    return (0.3 * envelope * np.sin(2 * np.pi * 180 * t)).astype(np.float32)
+
+
+def load_clips(args) -> List[Tuple[str, np.ndarray]]:
+    """Decode benchmark audio files (or build a synthetic clip)"""
+    clips = []
+    for path in args.audio or []:
+        clips.append((Path(path).name, decode_audio(Path(path).read_bytes())))
+    if args.synthetic:
+        clips.append((f"synthetic_{args.synthetic:g}s", synthetic_clip(args.synthetic)))
+    return clips
+
+
+def benchmark_backend(backend: str, clips: List[Tuple[str, np.ndarray]], args) -> Dict:
+    """Load one engine and time it on every clip"""
+    load_start = time.perf_counter()
+    engine = STT_ENGINES[backend](
+        args.model,
+        compute_type=args.compute_type,
+        cpu_threads=args.cpu_threads,
+    )
+    load_seconds = time.perf_counter() - load_start
+
+    # Warm-up run so one-time initialisation is not counted
+    engine.transcribe(clips[0][1][:SAMPLE_RATE * 2], language=args.language)
+
+    total_audio = 0.0
+    total_time = 0.0
+    for name, audio in clips:
+        duration = len(audio) / SAMPLE_RATE
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            result = engine.transcribe(audio, language=args.language, beam_size=args.beam_size)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        total_audio += duration
+        total_time += best
+        print(f"  {name:<28} {duration:7.1f}s audio  {best:7.2f}s  RTF {best / duration:.3f}"
+              f"  [{result.get('language')}] {result.get('text', '').strip()[:40]!r}")
+
+    return {
+        'backend': backend,
+        'load_seconds': load_seconds,
+        'rtf': total_time / total_audio if total_audio else float('nan'),
+    }
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark STT backends (real-time factor)")
+    parser.add_argument("--audio", nargs="*", help="Audio files to transcribe")
+    parser.add_argument("--synthetic", type=float, default=0.0,
+                        help="Add a synthetic clip of this many seconds")
+    parser.add_argument("--backends", nargs="*", default=None,
+                        help=f"Backends to test (default: all installed of {list(STT_ENGINES)})")
+    parser.add_argument("--model", default="base", help="Whisper model size (default: base)")
+    parser.add_argument("--language", default=None, help="Language hint (skips detection)")
+    parser.add_argument("--beam-size", type=int, default=None, help="Beam width (default: greedy)")
+    parser.add_argument("--compute-type", default="int8", help="faster-whisper compute type")
+    parser.add_argument("--cpu-threads", type=int, default=0, help="faster-whisper CPU threads")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per clip (best is kept)")
+    args = parser.parse_args()
+
+    clips = load_clips(args)
+    if not clips:
+        parser.error("Provide --audio files and/or --synthetic SECONDS")
+
+    backends = args.backends or available_backends()
+    if not backends:
+        print("✗ No STT backend installed (pip install openai-whisper faster-whisper)")
+        return 1
+
+    print("=" * 70)
+    print(f"  STT Benchmark (model: {args.model})")
+    print("=" * 70)
+
+    summary = []
+    for backend in backends:
+        print(f"\n{backend}:")
+        try:
+            summary.append(benchmark_backend(backend, clips, args))
+        except Exception as e:
+            print(f"  ✗ {backend} failed: {e}")
+
+    print("\n" + "=" * 70)
+    print(f"  {'backend':<20} {'load (s)':>10} {'RTF':>8}")
+    for row in summary:
+        print(f"  {row['backend']:<20} {row['load_seconds']:>10.1f} {row['rtf']:>8.3f}")
+    print("=" * 70)
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
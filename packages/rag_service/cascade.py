@@ -0,0 +1,128 @@
+"""
+Two-stage cascade search
+
+A coarse index holds every chunk vector projected to a few dimensions
+(e.g. 128 of 768). A query first searches the coarse index for a candidate
+pool, then only the candidates are scored exactly against the full vectors
+(from the embedding store, or reconstructed from the main index).
+
+Projections:
+    pca      -> top eigenvectors of the (uncentred) second-moment matrix, so
+                projected inner products approximate the full ones
+    truncate -> the first dims of each vector, for Matryoshka-trained models
+"""
+
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import faiss
+import numpy as np
+
+COARSE_INDEX_FILE = "coarse_index.bin"
+COARSE_PROJECTION_FILE = "coarse_projection.npy"
+PROJECTION_METHODS = ("pca", "truncate")
+
+
+def learn_projection(vectors: np.ndarray, dim: int, method: str = "pca") -> np.ndarray:
+    """
+    Learn a (full_dim, dim) projection matrix
+
+    Args:
+        vectors: L2-normalized chunk embeddings (n, full_dim)
+        dim: Reduced dimension
+        method: 'pca' or 'truncate'
+
+    Returns:
+        float32 matrix with orthonormal columns
+    """
+    full_dim = vectors.shape[1]
+    if not 0 < dim < full_dim:
+        raise ValueError(f"Reduced dimension must be between 1 and {full_dim - 1}: {dim}")
+    if method == "truncate":
+        return np.eye(full_dim, dim, dtype=np.float32)
+    if method != "pca":
+        raise ValueError(f"Unknown projection method: {method}")
+
+    # Not centred: centring would change the inner products being approximated
+    moments = vectors.T.astype(np.float64) @ vectors.astype(np.float64)
+    _, eigenvectors = np.linalg.eigh(moments)
+    # eigh sorts ascending; keep the largest components
+    return np.ascontiguousarray(eigenvectors[:, ::-1][:, :dim], dtype=np.float32)
+
+
+class CascadeIndex:
+    """Reduced-dimension coarse index plus the projection that feeds it"""
+
+    def __init__(self, projection: np.ndarray, coarse_index: faiss.Index):
+        """
+        Args:
+            projection: (full_dim, dim) projection matrix
+            coarse_index: Inner-product index over projected vectors, in the
+                same order as the full index
+        """
+        self.projection = projection
+        self.coarse_index = coarse_index
+
+    @property
+    def dim(self) -> int:
+        return self.projection.shape[1]
+
+    @property
+    def ntotal(self) -> int:
+        return self.coarse_index.ntotal
+
+    @classmethod
+    def build(cls, vectors: np.ndarray, dim: int, method: str = "pca") -> "CascadeIndex":
+        """Learn the projection from the chunk vectors and index them"""
+        projection = learn_projection(vectors, dim, method)
+        coarse_index = faiss.IndexFlatIP(dim)
+        coarse_index.add(np.ascontiguousarray(vectors @ projection, dtype=np.float32))
+        return cls(projection, coarse_index)
+
+    def save(self, directory: str) -> None:
+        """Write the coarse index and projection next to the main index"""
+        path = Path(directory)
+        faiss.write_index(self.coarse_index, str(path / COARSE_INDEX_FILE))
+        np.save(path / COARSE_PROJECTION_FILE, self.projection)
+
+    @staticmethod
+    def remove(directory: str) -> None:
+        """Delete a previously saved coarse index (it would no longer match)"""
+        for name in (COARSE_INDEX_FILE, COARSE_PROJECTION_FILE):
+            (Path(directory) / name).unlink(missing_ok=True)
+
+    @classmethod
+    def load(cls, directory: str) -> Optional["CascadeIndex"]:
+        """Coarse index saved in an index directory, or None if there is none"""
+        path = Path(directory)
+        index_file = path / COARSE_INDEX_FILE
+        projection_file = path / COARSE_PROJECTION_FILE
+        if not (index_file.exists() and projection_file.exists()):
+            return None
+        return cls(np.load(projection_file), faiss.read_index(str(index_file)))
+
+    def search(self, full_vectors: Callable[[np.ndarray], np.ndarray], query: np.ndarray,
+               k: int, pool: int,
+               params: Optional[faiss.SearchParameters] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Coarse search for `pool` candidates, then exact re-rank
+
+        Args:
+            full_vectors: Returns the full vectors of chunk positions
+                (e.g. index.reconstruct_batch)
+            query: L2-normalized query embedding (1, full_dim)
+            k: Number of hits to return
+            pool: Candidates taken from the coarse pass (at least k)
+            params: Search parameters (e.g. a language selector) for the coarse pass
+
+        Returns:
+            (scores, positions), best first, with exact full-dimension scores
+        """
+        coarse_query = np.ascontiguousarray(query @ self.projection, dtype=np.float32)
+        _, candidates = self.coarse_index.search(coarse_query, max(pool, k), params=params)
+        candidates = candidates[0][candidates[0] != -1]
+        if not len(candidates):
+            return np.empty(0, dtype=np.float32), candidates
+        scores = full_vectors(candidates) @ query[0]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return scores[order], candidates[order]
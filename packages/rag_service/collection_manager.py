@@ -0,0 +1,344 @@
+"""
+Named document collections for the retrieval server
+
+Each collection is a directory produced by ingest.py (faiss_index.bin +
+metadata.pkl), e.g. one for RBI circulars, one for SEBI filings and one for
+product FAQs. Collections are loaded on first use and kept under a memory
+budget: when loading one pushes the total over the budget, the least
+recently used collections are unloaded. The embedding model is not part of a
+collection; the server shares one encoder across all of them.
+"""
+
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import faiss
+import numpy as np
+
+from adjacency import build_adjacency, stitch, window_range
+from cascade import COARSE_INDEX_FILE, CascadeIndex
+from embedding_store import load_embeddings
+from lang_detect import classify_by_script
+from semantic_cache import SemanticCache
+
+# In-memory size of unpickled chunk metadata relative to the pickle file
+METADATA_OVERHEAD = 3
+
+
+class Collection:
+    """One FAISS index with its chunk metadata and lookup tables"""
+
+    def __init__(self, name: str, path: str):
+        """
+        Args:
+            name: Collection name used in requests
+            path: Directory with faiss_index.bin and metadata.pkl
+        """
+        self.name = name
+        self.path = Path(path)
+        self.index: Optional[faiss.Index] = None
+        self.metadata: Optional[Dict] = None
+        # Language code -> chunk positions, plus FAISS selectors built from them
+        self.language_ids: Dict[str, np.ndarray] = {}
+        self.language_selectors: Dict[str, Any] = {}
+        # chunk_id -> position in metadata['chunks'] (and the FAISS index)
+        self.chunk_positions: Dict[int, int] = {}
+        # Neighbour links / page and document ranges by position
+        self.adjacency: Dict[str, np.ndarray] = {}
+        self.semantic_cache: Optional[SemanticCache] = None
+        # Reduced-dimension coarse index for two-stage search (optional)
+        self.cascade: Optional[CascadeIndex] = None
+        # Memory-mapped normalised embeddings by position (optional)
+        self.vectors: Optional[np.ndarray] = None
+        # Approximate resident size, from the file sizes
+        self.memory_bytes = 0
+        self.load_seconds = 0.0
+
+    @property
+    def chunks(self) -> List[Dict]:
+        return self.metadata['chunks']
+
+    def load(self, embedding_model: str = None) -> "Collection":
+        """
+        Read the index and metadata and build the lookup tables
+
+        Args:
+            embedding_model: Encoder the server uses (mismatches are reported)
+        """
+        start = time.perf_counter()
+        if not self.path.exists():
+            raise RuntimeError(
+                f"Index directory not found: {self.path}\n"
+                f"Run 'python ingest.py' first to create the index."
+            )
+
+        index_file = self.path / "faiss_index.bin"
+        if not index_file.exists():
+            raise RuntimeError(f"FAISS index file not found: {index_file}")
+        print(f"Loading FAISS index from {index_file}...")
+        self.index = faiss.read_index(str(index_file))
+        print(f"✓ Loaded index with {self.index.ntotal} vectors")
+
+        metadata_file = self.path / "metadata.pkl"
+        if not metadata_file.exists():
+            raise RuntimeError(f"Metadata file not found: {metadata_file}")
+        print(f"Loading metadata from {metadata_file}...")
+        with open(metadata_file, 'rb') as f:
+            self.metadata = pickle.load(f)
+        print(f"✓ Loaded metadata for {len(self.chunks)} chunks")
+
+        self.build_language_selectors()
+        self.build_chunk_lookup()
+        self.memory_bytes = (
+            index_file.stat().st_size + metadata_file.stat().st_size * METADATA_OVERHEAD
+        )
+
+        self.cascade = CascadeIndex.load(str(self.path))
+        if self.cascade is not None:
+            if self.cascade.ntotal != self.index.ntotal:
+                print(f"Warning: Coarse index of '{self.name}' does not match the index; "
+                      f"re-run ingest with --coarse-dim")
+                self.cascade = None
+            else:
+                self.memory_bytes += (self.path / COARSE_INDEX_FILE).stat().st_size
+                print(f"✓ Loaded {self.cascade.dim}-dim coarse index for cascade search")
+
+        self.vectors = self.load_vectors()
+        if self.vectors is None and self.metadata.get('index_type', 'Flat') != 'Flat':
+            # Trained index types cannot reconstruct vectors for exact
+            # re-scoring, cascade search or diversification
+            raise RuntimeError(
+                f"Collection '{self.name}' ({self.metadata['index_type']}) needs its embedding "
+                f"store; re-run 'python ingest.py rebuild-index' from an index that has one"
+            )
+
+        # Verify embedding model matches
+        stored_model = self.metadata.get('embedding_model')
+        if embedding_model and stored_model and stored_model != embedding_model:
+            print(f"Warning: Collection '{self.name}' was built with {stored_model}, "
+                  f"but configured to use {embedding_model}")
+        self.load_seconds = round(time.perf_counter() - start, 2)
+        return self
+
+    def load_vectors(self) -> Optional[np.ndarray]:
+        """Memory-map the embedding store if it matches the index"""
+        try:
+            store = load_embeddings(str(self.path))
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not open embedding store of '{self.name}': {e}")
+            return None
+        if store is None:
+            return None
+        vectors, chunk_ids, _ = store
+        if len(vectors) != self.index.ntotal or not np.array_equal(
+                chunk_ids, [chunk['chunk_id'] for chunk in self.chunks]):
+            print(f"Warning: Embedding store of '{self.name}' does not match the index; ignoring it")
+            return None
+        return vectors
+
+    def vectors_at(self, positions: np.ndarray) -> np.ndarray:
+        """Full vectors of chunk positions (embedding store, else reconstructed)"""
+        if self.vectors is not None:
+            return np.asarray(self.vectors[positions])
+        return self.index.reconstruct_batch(positions)
+
+    def search_params(self, lang: Optional[str]) -> Optional[faiss.SearchParameters]:
+        """
+        FAISS search parameters restricting a search to one language
+
+        IVF indexes only accept SearchParametersIVF, which also has to carry
+        the index's nprobe (it replaces the index setting for the call).
+        """
+        if lang is None:
+            return None
+        selector = self.language_selectors[lang]
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def build_language_selectors(self) -> None:
+        """Group chunk positions by language so retrieval can be filtered by language"""
+        language_ids: Dict[str, List[int]] = {}
+        for position, chunk in enumerate(self.chunks):
+            # Indexes built before chunk languages were recorded fall back to
+            # the script classifier
+            lang = chunk.get('language')
+            if lang is None:
+                lang = classify_by_script(chunk['text'], short_query_chars=None)
+            if lang:
+                language_ids.setdefault(lang, []).append(position)
+
+        self.language_ids = {
+            lang: np.array(ids, dtype='int64') for lang, ids in language_ids.items()
+        }
+        # IDSelectorBatch keeps a raw pointer, so the arrays above must stay alive
+        self.language_selectors = {
+            lang: faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+            for lang, ids in self.language_ids.items()
+        }
+        summary = ", ".join(f"{lang}={len(ids)}" for lang, ids in self.language_ids.items())
+        print(f"✓ Chunk languages: {summary or 'none detected'}")
+
+    def build_chunk_lookup(self) -> None:
+        """Map chunk ids to metadata positions and load the adjacency arrays"""
+        chunks = self.chunks
+        self.chunk_positions = {chunk['chunk_id']: position for position, chunk in enumerate(chunks)}
+
+        # Indexes built before adjacency was stored get it computed on load
+        adjacency = self.metadata.get('adjacency')
+        if adjacency is None or len(adjacency['prev']) != len(chunks):
+            adjacency = build_adjacency(chunks)
+            print("✓ Built chunk adjacency (not stored in index; re-run ingest to precompute)")
+        self.adjacency = adjacency
+
+    def get_semantic_cache(self, max_entries: int, min_similarity: float) -> Optional[SemanticCache]:
+        """Semantic query cache for this index (None when max_entries is 0)"""
+        if self.semantic_cache is None and max_entries > 0 and self.index is not None:
+            self.semantic_cache = SemanticCache(
+                self.index.d,
+                max_entries=max_entries,
+                min_similarity=min_similarity,
+            )
+        return self.semantic_cache
+
+    def rescore(self, query_embedding: np.ndarray, positions: np.ndarray):
+        """
+        Score a cached hit list against the new query and re-sort it
+
+        Returns:
+            (scores, positions), best first, or None if the index cannot
+            reconstruct vectors
+        """
+        try:
+            vectors = self.vectors_at(positions)
+        except RuntimeError:
+            # Index type without reconstruction: keep the cached order
+            return None
+        scores = vectors @ query_embedding[0]
+        order = np.argsort(-scores, kind="stable")
+        return scores[order], positions[order]
+
+    def context(self, position: int, window: int, scope: str) -> str:
+        """Text of a chunk and its neighbours, stitched with overlap removal"""
+        chunks = self.chunks
+        return stitch([chunks[p]['text'] for p in window_range(self.adjacency, position, window, scope)])
+
+
+class CollectionManager:
+    """Lazily loaded collections with LRU eviction under a memory budget"""
+
+    def __init__(self, paths: Dict[str, str], memory_budget_bytes: int = 0,
+                 pinned: Sequence[str] = (), embedding_model: str = None):
+        """
+        Args:
+            paths: Collection name -> index directory
+            memory_budget_bytes: Total size of loaded collections (0 = no limit)
+            pinned: Collections that are never evicted
+            embedding_model: Shared encoder name (for mismatch warnings)
+        """
+        self.paths = dict(paths)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.pinned = set(pinned)
+        self.embedding_model = embedding_model
+        self._loaded: "OrderedDict[str, Collection]" = OrderedDict()  # oldest first
+        self._load_locks = {name: threading.Lock() for name in self.paths}
+        self._lock = threading.Lock()
+        self.stats = {
+            'loads': 0,
+            'evictions': 0,
+        }
+
+    @staticmethod
+    def discover(root: str) -> Dict[str, str]:
+        """Subdirectories of root that contain an index, by directory name"""
+        root_path = Path(root)
+        if not root_path.is_dir():
+            return {}
+        return {
+            path.name: str(path) for path in sorted(root_path.iterdir())
+            if (path / "faiss_index.bin").exists()
+        }
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.paths)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._loaded
+
+    def peek(self, name: str) -> Optional[Collection]:
+        """Loaded collection without loading it or touching the LRU order"""
+        return self._loaded.get(name)
+
+    def get(self, name: str) -> Collection:
+        """
+        Loaded collection, reading it from disk on first use
+
+        Raises:
+            KeyError: Unknown collection name
+        """
+        if name not in self.paths:
+            raise KeyError(name)
+        with self._lock:
+            collection = self._loaded.get(name)
+            if collection is not None:
+                self._loaded.move_to_end(name)
+                return collection
+
+        # One load per collection at a time; other collections stay usable
+        with self._load_locks[name]:
+            collection = self._loaded.get(name)
+            if collection is None:
+                collection = Collection(name, self.paths[name]).load(self.embedding_model)
+                with self._lock:
+                    self._loaded[name] = collection
+                    self.stats['loads'] += 1
+                    self._evict(keep=name)
+        return collection
+
+    def reload(self, name: str) -> Collection:
+        """Drop a collection and read it again (e.g. after re-ingestion)"""
+        with self._lock:
+            self._loaded.pop(name, None)
+        return self.get(name)
+
+    def _evict(self, keep: str) -> None:
+        """Unload least recently used collections until under the budget"""
+        if self.memory_budget_bytes <= 0:
+            return
+        for name in list(self._loaded):
+            if self.memory_bytes <= self.memory_budget_bytes:
+                break
+            if name == keep or name in self.pinned:
+                continue
+            # Requests still holding the collection keep it alive until they finish
+            del self._loaded[name]
+            self.stats['evictions'] += 1
+            print(f"Unloaded collection '{name}' (memory budget)")
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(collection.memory_bytes for collection in self._loaded.values())
+
+    def metrics(self) -> Dict[str, Any]:
+        """Loaded collections and memory use"""
+        loaded = dict(self._loaded)
+        return {
+            'collections': {
+                name: {
+                    'loaded': name in loaded,
+                    'num_chunks': len(loaded[name].chunks) if name in loaded else None,
+                    'memory_mb': round(loaded[name].memory_bytes / 2**20, 1) if name in loaded else 0.0,
+                }
+                for name in self.paths
+            },
+            'memory_mb': round(self.memory_bytes / 2**20, 1),
+            'memory_budget_mb': round(self.memory_budget_bytes / 2**20, 1),
+            'loads': self.stats['loads'],
+            'evictions': self.stats['evictions'],
+        }
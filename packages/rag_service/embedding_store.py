@@ -0,0 +1,91 @@
+"""
+On-disk store of normalised chunk embeddings
+
+ingest.py writes the L2-normalised embedding matrix next to the FAISS index:
+
+    embeddings.npy      float32 (num_chunks, dim), row i = chunk position i
+    embedding_ids.npy   int64 chunk ids, row-aligned with embeddings.npy
+    embeddings.json     manifest (format, model, dim, count, created_at)
+
+The matrix is opened memory-mapped, so `ingest.py rebuild-index` can build
+any FAISS index type from it without re-running the embedding model, and the
+server can re-score candidates exactly whatever the index type.
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+EMBEDDINGS_FILE = "embeddings.npy"
+IDS_FILE = "embedding_ids.npy"
+MANIFEST_FILE = "embeddings.json"
+STORE_FORMAT = 1
+
+
+def save_embeddings(directory: str, embeddings: np.ndarray, chunk_ids: np.ndarray,
+                    embedding_model: str) -> Dict:
+    """
+    Write the embedding matrix, chunk ids and manifest
+
+    Args:
+        directory: Index directory
+        embeddings: L2-normalised float32 matrix (num_chunks, dim)
+        chunk_ids: Chunk id of each row
+        embedding_model: Model that produced the embeddings
+
+    Returns:
+        The manifest
+    """
+    if len(embeddings) != len(chunk_ids):
+        raise ValueError(f"{len(embeddings)} embeddings for {len(chunk_ids)} chunk ids")
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = {
+        'format': STORE_FORMAT,
+        'embedding_model': embedding_model,
+        'dim': int(embeddings.shape[1]),
+        'count': int(embeddings.shape[0]),
+        'dtype': 'float32',
+        'normalized': True,
+        'created_at': datetime.now().isoformat(),
+    }
+    # Temp files + rename, manifest last: readers never see a half-written store
+    for name, array in ((EMBEDDINGS_FILE, np.asarray(embeddings, dtype=np.float32)),
+                        (IDS_FILE, np.asarray(chunk_ids, dtype=np.int64))):
+        tmp_path = path / f"{name}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array)
+        tmp_path.replace(path / name)
+    tmp_path = path / f"{MANIFEST_FILE}.tmp"
+    tmp_path.write_text(json.dumps(manifest, indent=2), encoding='utf-8')
+    tmp_path.replace(path / MANIFEST_FILE)
+    return manifest
+
+
+def load_embeddings(directory: str, mmap: bool = True
+                    ) -> Optional[Tuple[np.ndarray, np.ndarray, Dict]]:
+    """
+    Open a saved embedding store
+
+    Args:
+        directory: Index directory
+        mmap: Memory-map the matrix instead of reading it
+
+    Returns:
+        (embeddings, chunk_ids, manifest), or None when there is no usable store
+    """
+    path = Path(directory)
+    manifest_file = path / MANIFEST_FILE
+    if not manifest_file.exists():
+        return None
+    manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+    if manifest.get('format') != STORE_FORMAT:
+        return None
+    embeddings = np.load(path / EMBEDDINGS_FILE, mmap_mode='r' if mmap else None)
+    chunk_ids = np.load(path / IDS_FILE)
+    if embeddings.shape != (manifest['count'], manifest['dim']) or len(chunk_ids) != manifest['count']:
+        raise ValueError(f"Embedding store in {path} does not match its manifest")
+    return embeddings, chunk_ids, manifest
@@ -0,0 +1,155 @@
+"""
+On-disk time-series cache for historical OHLCV data
+
+Stores one compressed .npz file per symbol and interval with columnar
+arrays (timestamps in UTC nanoseconds plus open/high/low/close/volume).
+Later requests only fetch the missing tail from the upstream source and
+merge it in, instead of re-downloading the whole period.
+"""
+
+import re
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# yfinance periods, smallest to largest ('max' covers everything)
+PERIOD_ORDER = ['1d', '5d', '1mo', '3mo', '6mo', 'ytd', '1y', '2y', '5y', '10y', 'max']
+
+# Calendar span of month/year periods (day periods count trading days)
+PERIOD_OFFSETS = {
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_covers(cached_period: str, requested_period: str) -> bool:
+    """Whether data fetched for cached_period includes requested_period"""
+    if cached_period not in PERIOD_ORDER or requested_period not in PERIOD_ORDER:
+        return False
+    return PERIOD_ORDER.index(cached_period) >= PERIOD_ORDER.index(requested_period)
+
+
+def slice_period(hist: pd.DataFrame, period: str) -> pd.DataFrame:
+    """
+    Keep only the rows belonging to `period`, counted back from the last row
+
+    Args:
+        hist: OHLCV frame with a sorted DatetimeIndex
+        period: yfinance period string
+
+    Returns:
+        Sliced frame
+    """
+    if hist.empty or period == 'max':
+        return hist
+
+    last = hist.index[-1]
+    if period.endswith('d'):
+        # Trading days: last N distinct session dates
+        days = int(period[:-1])
+        dates = hist.index.normalize()
+        keep = dates.unique()[-days:]
+        return hist[dates.isin(keep)]
+    if period == 'ytd':
+        return hist[hist.index >= last.replace(month=1, day=1, hour=0, minute=0,
+                                               second=0, microsecond=0, nanosecond=0)]
+    offset = PERIOD_OFFSETS.get(period)
+    if offset is None:
+        return hist
+    return hist[hist.index > last - offset]
+
+
+def min_refresh_seconds(interval: str) -> float:
+    """How long a cached series is considered current before fetching the tail"""
+    if (interval.endswith('m') and not interval.endswith('mo')) or interval.endswith('h'):
+        return 60.0
+    return 900.0
+
+
+class HistoryCache:
+    """Columnar .npz cache of OHLCV series keyed by symbol and interval"""
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory for cache files (created if missing)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, symbol: str, interval: str) -> Path:
+        """Cache file for a normalized symbol and interval"""
+        safe_symbol = re.sub(r'[^A-Za-z0-9_.-]', '_', symbol)
+        return self.cache_dir / f"{safe_symbol}__{interval}.npz"
+
+    def load(self, symbol: str, interval: str) -> Optional[Dict]:
+        """
+        Load a cached series
+
+        Returns:
+            Dict with 'frame' (DataFrame), 'period' and 'fetched_at', or None
+        """
+        path = self.path(symbol, interval)
+        if not path.exists():
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                index = pd.DatetimeIndex(data['ts'].astype('datetime64[ns]'), tz='UTC')
+                tz = str(data['tz'])
+                if tz:
+                    index = index.tz_convert(tz)
+                frame = pd.DataFrame(
+                    {col: data[col.lower()] for col in OHLCV_COLUMNS},
+                    index=index,
+                )
+                return {
+                    'frame': frame,
+                    'period': str(data['period']),
+                    'fetched_at': float(data['fetched_at']),
+                }
+        except Exception:
+            # Corrupt or old-format file: treat as a miss
+            return None
+
+    def save(self, symbol: str, interval: str, frame: pd.DataFrame, period: str) -> None:
+        """Write a series atomically (temp file + rename)"""
+        index = frame.index
+        tz = str(index.tz) if index.tz is not None else ''
+        if tz:
+            index = index.tz_convert('UTC').tz_localize(None)
+        # Pin the unit: pandas may hold the index at us/ms resolution
+        ts = index.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        path = self.path(symbol, interval)
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez_compressed(
+            tmp_path,
+            ts=ts,
+            tz=np.array(tz),
+            period=np.array(period),
+            fetched_at=np.array(time.time()),
+            **{col.lower(): frame[col].to_numpy(dtype=np.float64) for col in OHLCV_COLUMNS},
+        )
+        tmp_path.replace(path)
+
+    @staticmethod
+    def merge(cached: pd.DataFrame, fresh: pd.DataFrame) -> pd.DataFrame:
+        """Combine cached rows with newly fetched ones (fresh rows win)"""
+        if cached is None or cached.empty:
+            return fresh
+        if fresh.empty:
+            return cached
+        if fresh.index.tz is not None and cached.index.tz is not None:
+            cached = cached.tz_convert(fresh.index.tz)
+        combined = pd.concat([cached[OHLCV_COLUMNS], fresh[OHLCV_COLUMNS]])
+        combined = combined[~combined.index.duplicated(keep='last')]
+        return combined.sort_index()
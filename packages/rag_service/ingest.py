@@ -8,11 +8,17 @@ and builds a FAISS vector index for semantic search.
 Usage:
     python ingest.py --data-dir ../../data --output-dir ./index
     python ingest.py --data-dir ../../data --chunk-size 700 --overlap 100
+    python ingest.py --data-dir ../../data --no-text-cache   # force re-extraction
+    python ingest.py --data-dir ../../data --ocr-dpi 400 --ocr-workers 2
+    python ingest.py --data-dir ../../data --coarse-dim 128   # two-stage search
+    python ingest.py rebuild-index --index-dir ./index --index-type HNSW32
+    python ingest.py rebuild-index --index-dir ./index --index-type IVF256,SQ8 --shards 4 --output-dir ./collections
 
 Author: Shankh.ai Team
 """
 
 import os
+import sys
 import json
 import argparse
 import pickle
@@ -29,21 +35,35 @@ from dotenv import load_dotenv
 try:
     import pdfplumber
     PDFPLUMBER_AVAILABLE = True
+    PDFPLUMBER_VERSION = getattr(pdfplumber, '__version__', 'unknown')
 except ImportError:
     PDFPLUMBER_AVAILABLE = False
     print("Warning: pdfplumber not available, falling back to pypdf")
 
 try:
+    import pypdf as _pypdf_module
     from pypdf import PdfReader
     PYPDF_AVAILABLE = True
 except ImportError:
     try:
+        import PyPDF2 as _pypdf_module
         from PyPDF2 import PdfReader
         PYPDF_AVAILABLE = True
     except ImportError:
         PYPDF_AVAILABLE = False
         print("Error: No PDF library available. Install pypdf or PyPDF2.")
 
+from adjacency import build_adjacency
+from lang_detect import classify_by_script
+from page_cache import PageTextCache, file_hash
+from text_quality import HEURISTICS_VERSION, MIN_PAGE_CHARS, text_quality_issues
+from cascade import PROJECTION_METHODS, CascadeIndex
+from embedding_store import load_embeddings, save_embeddings
+from ocr import OCR_AVAILABLE, DEFAULT_DPI, DEFAULT_LANG, PageOCR, page_count
+
+# adaptive: pypdf first, pdfplumber only for pages that fail quality checks
+EXTRACTION_MODES = ("adaptive", "pdfplumber", "pypdf")
+
 # Load environment variables
 load_dotenv()
 
@@ -51,7 +71,8 @@ load_dotenv()
 class DocumentChunk:
     """Represents a text chunk with metadata"""
     def __init__(self, text: str, filename: str, page_num: int, 
-                 chunk_id: int, char_start: int, char_end: int):
+                 chunk_id: int, char_start: int, char_end: int,
+                 extractor: str = None):
         self.text = text.strip()
         self.filename = filename
         self.page_num = page_num
@@ -59,6 +80,8 @@ class DocumentChunk:
         self.char_start = char_start
         self.char_end = char_end
         self.excerpt = self.text[:100] + "..." if len(self.text) > 100 else self.text
+        self.language = classify_by_script(self.text, short_query_chars=None)
+        self.extractor = extractor
     
     def to_dict(self) -> Dict:
         """Convert to dictionary for JSON serialization"""
@@ -69,7 +92,9 @@ class DocumentChunk:
             "chunk_id": self.chunk_id,
             "char_start": self.char_start,
             "char_end": self.char_end,
-            "excerpt": self.excerpt
+            "excerpt": self.excerpt,
+            "language": self.language,
+            "extractor": self.extractor
         }
 
 
@@ -79,7 +104,10 @@ class PDFIngestionPipeline:
     def __init__(self, 
                  embedding_model: str = None,
                  chunk_size: int = 700,
-                 chunk_overlap: int = 100):
+                 chunk_overlap: int = 100,
+                 text_cache_dir: str = None,
+                 extraction_mode: str = "adaptive",
+                 ocr: PageOCR = None):
         """
         Initialize the ingestion pipeline
         
@@ -87,6 +115,10 @@ class PDFIngestionPipeline:
             embedding_model: Name of sentence-transformer model (default from env)
             chunk_size: Maximum characters per chunk
             chunk_overlap: Overlap between consecutive chunks
+            text_cache_dir: Directory for cached page text (None disables it)
+            extraction_mode: adaptive | pdfplumber | pypdf (falls back to
+                whichever library is installed)
+            ocr: OCR engine for pages without a text layer (None disables it)
         """
         self.embedding_model_name = embedding_model or os.getenv(
             "EMBEDDING_MODEL", 
@@ -94,6 +126,13 @@ class PDFIngestionPipeline:
         )
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.text_cache = PageTextCache(text_cache_dir) if text_cache_dir else None
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode: {extraction_mode}")
+        self.extraction_mode = extraction_mode
+        self.ocr = ocr
+        # Per-page OCR timings by filename, for the ingest report
+        self.ocr_report: Dict[str, List[Dict]] = {}
         
         print(f"Initializing embedding model: {self.embedding_model_name}")
         print(f"This may take a few minutes on first run (downloading model)...")
@@ -108,37 +147,94 @@ class PDFIngestionPipeline:
         
         print(f"✓ Model loaded (embedding dimension: {self.embedding_dim})")
     
-    def extract_text_from_pdf(self, pdf_path: str) -> List[Tuple[int, str]]:
+    def resolve_extraction_mode(self) -> str:
+        """Requested extraction mode, limited to the installed libraries"""
+        if self.extraction_mode == "adaptive" and PDFPLUMBER_AVAILABLE and PYPDF_AVAILABLE:
+            return "adaptive"
+        if self.extraction_mode == "pypdf" and PYPDF_AVAILABLE:
+            return "pypdf"
+        if PDFPLUMBER_AVAILABLE:
+            return "pdfplumber"
+        if PYPDF_AVAILABLE:
+            return "pypdf"
+        return "none"
+    
+    def extractor_tag(self) -> Tuple[str, str]:
+        """Name and version of the extraction setup (page-text cache key)"""
+        mode = self.resolve_extraction_mode()
+        pypdf_version = f"{_pypdf_module.__name__}-{getattr(_pypdf_module, '__version__', 'unknown')}" if PYPDF_AVAILABLE else ""
+        if mode == "adaptive":
+            version = f"{pypdf_version}+pdfplumber-{PDFPLUMBER_VERSION}+h{HEURISTICS_VERSION}"
+        elif mode == "pdfplumber":
+            version = PDFPLUMBER_VERSION
+        elif mode == "pypdf":
+            version = pypdf_version
+        else:
+            version = "0"
+        if self.ocr is not None:
+            version += f"+{self.ocr.version_tag}"
+        return mode, version
+    
+    def extract_text_from_pdf(self, pdf_path: str) -> List[Tuple[int, str, str]]:
         """
-        Extract text from PDF file, returns list of (page_num, text) tuples
+        Extract text from PDF file, returns list of (page_num, text, extractor) tuples
+        
+        Pages come from the page-text cache when the same file was already
+        extracted with the same library version. Files with a failed OCR page
+        are not cached, so the next run retries the page.
         
         Args:
             pdf_path: Path to PDF file
             
         Returns:
-            List of (page_number, page_text) tuples
+            List of (page_number, page_text, extractor) tuples
         """
+        filename = Path(pdf_path).name
+        extractor, version = self.extractor_tag()
+        
+        content_hash = None
+        if self.text_cache is not None:
+            content_hash = file_hash(pdf_path)
+            pages = self.text_cache.load(content_hash, extractor, version)
+            if pages is not None:
+                print(f"  ✓ Loaded {len(pages)} pages of {filename} from text cache")
+                return pages
+        
+        pages = self._extract_pages(pdf_path)
+        ocr_failed = False
+        if self.ocr is not None:
+            pages, ocr_failed = self._ocr_missing_pages(pdf_path, pages)
+        if pages and content_hash is not None and not ocr_failed:
+            self.text_cache.save(content_hash, extractor, version, pages, filename)
+        return pages
+    
+    def _extract_pages(self, pdf_path: str) -> List[Tuple[int, str, str]]:
+        """Parse a PDF, returning (page_number, page_text, extractor) tuples"""
         pages = []
         filename = Path(pdf_path).name
+        mode = self.resolve_extraction_mode()
         
         try:
-            # Try pdfplumber first (better text extraction)
-            if PDFPLUMBER_AVAILABLE:
+            if mode == "adaptive":
+                pages = self._extract_adaptive(pdf_path)
+            
+            # Layout-aware extraction for every page
+            elif mode == "pdfplumber":
                 print(f"  Using pdfplumber for {filename}")
                 with pdfplumber.open(pdf_path) as pdf:
                     for page_num, page in enumerate(pdf.pages, start=1):
                         text = page.extract_text()
                         if text:
-                            pages.append((page_num, text))
+                            pages.append((page_num, text, "pdfplumber"))
             
-            # Fallback to pypdf/PyPDF2
-            elif PYPDF_AVAILABLE:
+            # Fast extraction only
+            elif mode == "pypdf":
                 print(f"  Using pypdf for {filename}")
                 reader = PdfReader(pdf_path)
                 for page_num, page in enumerate(reader.pages, start=1):
                     text = page.extract_text()
                     if text:
-                        pages.append((page_num, text))
+                        pages.append((page_num, text, "pypdf"))
             else:
                 raise RuntimeError("No PDF library available")
             
@@ -149,8 +245,91 @@ class PDFIngestionPipeline:
             print(f"  ✗ Error extracting text from {filename}: {e}")
             return []
     
+    def _extract_adaptive(self, pdf_path: str) -> List[Tuple[int, str, str]]:
+        """
+        Read every page with pypdf and re-read only suspicious pages with pdfplumber
+        
+        The pdfplumber text is kept unless it shows more quality issues than
+        the pypdf text.
+        """
+        pages = []
+        reasons: Dict[str, int] = {}
+        slow_pdf = None
+        reader = PdfReader(pdf_path)
+        try:
+            for page_num, page in enumerate(reader.pages, start=1):
+                text = page.extract_text() or ""
+                extractor = "pypdf"
+                issues = text_quality_issues(text)
+                if issues:
+                    if slow_pdf is None:
+                        slow_pdf = pdfplumber.open(pdf_path)
+                    slow_text = slow_pdf.pages[page_num - 1].extract_text() or ""
+                    if len(text_quality_issues(slow_text)) <= len(issues):
+                        text, extractor = slow_text, "pdfplumber"
+                        for issue in issues:
+                            reasons[issue] = reasons.get(issue, 0) + 1
+                if text:
+                    pages.append((page_num, text, extractor))
+        finally:
+            if slow_pdf is not None:
+                slow_pdf.close()
+        
+        slow_pages = sum(1 for _, _, extractor in pages if extractor == "pdfplumber")
+        detail = ", ".join(f"{issue}={count}" for issue, count in sorted(reasons.items()))
+        print(f"  Adaptive extraction for {Path(pdf_path).name}: "
+              f"{len(pages) - slow_pages} pypdf, {slow_pages} pdfplumber"
+              + (f" ({detail})" if detail else ""))
+        return pages
+    
+    def _ocr_missing_pages(self, pdf_path: str,
+                           pages: List[Tuple[int, str, str]]) -> Tuple[List[Tuple[int, str, str]], bool]:
+        """
+        OCR the pages that came back without usable text
+        
+        Args:
+            pdf_path: Path to PDF file
+            pages: Output of _extract_pages
+            
+        Returns:
+            Tuple of (pages in order with OCR text for image-only pages,
+            whether OCR failed for any page)
+        """
+        filename = Path(pdf_path).name
+        by_page = {page[0]: page for page in pages}
+        try:
+            total = page_count(pdf_path)
+        except Exception as e:
+            print(f"  ✗ Could not open {filename} for OCR: {e}")
+            return pages, True
+        
+        missing = [
+            page_num for page_num in range(1, total + 1)
+            if page_num not in by_page or len(by_page[page_num][1].strip()) < MIN_PAGE_CHARS
+        ]
+        if not missing:
+            return pages, False
+        
+        print(f"  Running OCR on {len(missing)} image-only pages of {filename} "
+              f"({self.ocr.workers} workers, {self.ocr.dpi} dpi)")
+        report = self.ocr_report.setdefault(filename, [])
+        failed = False
+        for page_num, text, timing in self.ocr.run(pdf_path, missing):
+            report.append({"page": page_num, **timing})
+            if "error" in timing:
+                print(f"    ✗ Page {page_num}: OCR failed ({timing['error']}), keeping extracted text")
+                failed = True
+                continue
+            source = "cache" if timing["cached"] else f"{timing['ocr_ms'] / 1000:.2f}s"
+            print(f"    Page {page_num}: OCR {source} (render {timing['render_ms'] / 1000:.2f}s, "
+                  f"{len(text.strip())} chars)")
+            if len(text.strip()) > len(by_page.get(page_num, (0, ""))[1].strip()):
+                by_page[page_num] = (page_num, text, "ocr")
+        
+        return [by_page[page_num] for page_num in sorted(by_page)], failed
+    
     def chunk_text(self, text: str, filename: str, page_num: int, 
-                   chunk_offset: int = 0) -> List[DocumentChunk]:
+                   chunk_offset: int = 0, extractor: str = None) -> List[DocumentChunk]:
         """
         Split text into overlapping chunks
         
@@ -159,6 +338,7 @@ class PDFIngestionPipeline:
             filename: Source filename
             page_num: Page number
             chunk_offset: Starting chunk ID offset
+            extractor: Library that produced the page text
             
         Returns:
             List of DocumentChunk objects
@@ -198,7 +378,8 @@ class PDFIngestionPipeline:
                     page_num=page_num,
                     chunk_id=chunk_id,
                     char_start=start,
-                    char_end=end
+                    char_end=end,
+                    extractor=extractor
                 )
                 chunks.append(chunk)
                 chunk_id += 1
@@ -241,12 +422,13 @@ class PDFIngestionPipeline:
             print(f"\nProcessing: {pdf_path.name}")
             pages = self.extract_text_from_pdf(str(pdf_path))
             
-            for page_num, page_text in pages:
+            for page_num, page_text, extractor in pages:
                 chunks = self.chunk_text(
                     page_text, 
                     pdf_path.name, 
                     page_num,
-                    chunk_offset=chunk_id_offset
+                    chunk_offset=chunk_id_offset,
+                    extractor=extractor
                 )
                 all_chunks.extend(chunks)
                 chunk_id_offset += len(chunks)
@@ -303,8 +485,27 @@ class PDFIngestionPipeline:
         print(f"✓ FAISS index built with {index.ntotal} vectors")
         return index
     
+    def build_coarse_index(self, embeddings: np.ndarray, dim: int,
+                           method: str = "pca") -> CascadeIndex:
+        """
+        Build the reduced-dimension index for two-stage search
+        
+        Args:
+            embeddings: Normalized embeddings (as indexed by build_faiss_index)
+            dim: Reduced dimension
+            method: pca | truncate (Matryoshka-trained models)
+            
+        Returns:
+            CascadeIndex over the same chunks
+        """
+        print(f"\nBuilding {dim}-dim coarse index ({method})...")
+        cascade = CascadeIndex.build(embeddings, dim, method)
+        print(f"✓ Coarse index built with {cascade.ntotal} vectors")
+        return cascade
+    
     def save_index(self, index: faiss.Index, chunks: List[DocumentChunk], 
-                   output_dir: str):
+                   output_dir: str, cascade: CascadeIndex = None,
+                   embeddings: np.ndarray = None):
         """
         Save FAISS index and metadata to disk
         
@@ -312,6 +513,8 @@ class PDFIngestionPipeline:
             index: FAISS index
             chunks: List of DocumentChunk objects
             output_dir: Directory to save index and metadata
+            cascade: Coarse index for two-stage search (optional)
+            embeddings: Normalized embeddings, kept for rebuild-index (optional)
         """
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
@@ -321,14 +524,35 @@ class PDFIngestionPipeline:
         faiss.write_index(index, str(index_file))
         print(f"✓ Saved FAISS index to {index_file}")
         
+        # Coarse index must match this index; drop any earlier one
+        if cascade is not None:
+            cascade.save(str(output_path))
+            print(f"✓ Saved {cascade.dim}-dim coarse index")
+        else:
+            CascadeIndex.remove(str(output_path))
+        
+        # Embedding matrix, so the index can be rebuilt without re-encoding
+        if embeddings is not None:
+            save_embeddings(
+                str(output_path), embeddings,
+                np.array([chunk.chunk_id for chunk in chunks], dtype=np.int64),
+                self.embedding_model_name
+            )
+            print(f"✓ Saved {embeddings.shape[0]} x {embeddings.shape[1]} embedding matrix")
+        
         # Save metadata (chunks info)
         metadata_file = output_path / "metadata.pkl"
+        chunk_dicts = [chunk.to_dict() for chunk in chunks]
         metadata = {
-            "chunks": [chunk.to_dict() for chunk in chunks],
+            "chunks": chunk_dicts,
+            # Neighbour links and page/document ranges for context windows
+            "adjacency": build_adjacency(chunk_dicts),
             "embedding_model": self.embedding_model_name,
             "embedding_dim": self.embedding_dim,
             "chunk_size": self.chunk_size,
             "chunk_overlap": self.chunk_overlap,
+            "coarse_dim": cascade.dim if cascade is not None else None,
+            "index_type": "Flat",
             "created_at": datetime.now().isoformat(),
             "num_chunks": len(chunks)
         }
@@ -361,13 +585,231 @@ class PDFIngestionPipeline:
         for doc in summary["documents"].values():
             doc["pages"] = sorted(list(doc["pages"]))
         
+        # Per-page OCR timings (render / OCR milliseconds, cache hits)
+        for filename, timings in self.ocr_report.items():
+            if filename in summary["documents"]:
+                summary["documents"][filename]["ocr_pages"] = timings
+        
         with open(summary_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False)
         print(f"✓ Saved summary to {summary_file}")
 
 
+def build_index_from_factory(vectors: np.ndarray, index_type: str,
+                             train_size: int = 100_000, nprobe: int = 16) -> faiss.Index:
+    """
+    Build any FAISS index type over normalized vectors (inner product)
+    
+    Args:
+        vectors: Normalized embeddings (may be memory-mapped)
+        index_type: FAISS index factory string, e.g. "Flat", "HNSW32", "IVF256,SQ8"
+        train_size: Vectors sampled for training (IVF / PQ / SQ types)
+        nprobe: Inverted lists searched per query (IVF types)
+        
+    Returns:
+        Populated FAISS index
+    """
+    index = faiss.index_factory(vectors.shape[1], index_type, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        sample = vectors
+        if len(vectors) > train_size:
+            picks = np.sort(np.random.default_rng(0).choice(len(vectors), train_size, replace=False))
+            sample = vectors[picks]
+        print(f"  Training {index_type} on {len(sample)} vectors...")
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    
+    # Add in batches so a memory-mapped matrix is never fully copied
+    batch_size = 65536
+    for start in range(0, len(vectors), batch_size):
+        index.add(np.ascontiguousarray(vectors[start:start + batch_size], dtype=np.float32))
+    
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    return index
+
+
+def shard_ranges(chunks: List[Dict], shards: int) -> List[Tuple[int, int]]:
+    """
+    Split chunk positions into contiguous [start, end) ranges of similar size
+    
+    Boundaries fall between documents so context windows stay within a shard.
+    """
+    n = len(chunks)
+    doc_starts = [0] + [i for i in range(1, n) if chunks[i]['filename'] != chunks[i - 1]['filename']]
+    bounds = [0]
+    for s in range(1, shards):
+        target = s * n // shards
+        # First document start at or after the target
+        start = next((d for d in doc_starts if d >= target), n)
+        if bounds[-1] < start < n:
+            bounds.append(start)
+    bounds.append(n)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def rebuild_index(index_dir: str, output_dir: str = None, index_type: str = "Flat",
+                  shards: int = 1, coarse_dim: int = 0, coarse_method: str = "pca",
+                  train_size: int = 100_000, nprobe: int = 16) -> List[str]:
+    """
+    Rebuild the FAISS index from the saved embedding matrix (no re-encoding)
+    
+    Args:
+        index_dir: Directory written by ingest (embedding store + metadata.pkl)
+        output_dir: Where to write (default: index_dir, replacing the index)
+        index_type: FAISS index factory string
+        shards: Number of shards; each becomes a collection directory
+            (shard-00, shard-01, ...) under output_dir
+        coarse_dim: Also build a coarse index of this dimension (0 = none)
+        coarse_method: pca | truncate
+        train_size: Training sample size for trained index types
+        nprobe: IVF lists searched per query
+        
+    Returns:
+        Directories written
+    """
+    index_path = Path(index_dir)
+    store = load_embeddings(str(index_path))
+    if store is None:
+        raise RuntimeError(
+            f"No embedding store in {index_path}; re-run 'python ingest.py' once to create it"
+        )
+    vectors, chunk_ids, manifest = store
+    
+    with open(index_path / "metadata.pkl", 'rb') as f:
+        metadata = pickle.load(f)
+    chunks = metadata['chunks']
+    if not np.array_equal(chunk_ids, [chunk['chunk_id'] for chunk in chunks]):
+        raise RuntimeError("Embedding store and metadata.pkl list different chunks")
+    
+    output_path = Path(output_dir) if output_dir else index_path
+    written = []
+    for shard, (lo, hi) in enumerate(shard_ranges(chunks, shards)):
+        shard_path = output_path / f"shard-{shard:02d}" if shards > 1 else output_path
+        shard_path.mkdir(parents=True, exist_ok=True)
+        shard_vectors = vectors[lo:hi]
+        print(f"\nBuilding {index_type} index for chunks {lo}-{hi - 1} -> {shard_path}")
+        
+        start = datetime.now()
+        index = build_index_from_factory(shard_vectors, index_type, train_size, nprobe)
+        tmp_file = shard_path / "faiss_index.bin.tmp"
+        faiss.write_index(index, str(tmp_file))
+        tmp_file.replace(shard_path / "faiss_index.bin")
+        print(f"✓ Built {index.ntotal} vectors in {(datetime.now() - start).total_seconds():.1f}s")
+        
+        cascade = None
+        if coarse_dim:
+            cascade = CascadeIndex.build(np.asarray(shard_vectors), coarse_dim, coarse_method)
+            cascade.save(str(shard_path))
+        else:
+            CascadeIndex.remove(str(shard_path))
+        
+        if shard_path.resolve() != index_path.resolve():
+            save_embeddings(str(shard_path), shard_vectors, chunk_ids[lo:hi],
+                            manifest['embedding_model'])
+        
+        shard_chunks = chunks[lo:hi]
+        shard_metadata = dict(
+            metadata,
+            chunks=shard_chunks,
+            adjacency=build_adjacency(shard_chunks),
+            index_type=index_type,
+            coarse_dim=coarse_dim or None,
+            num_chunks=len(shard_chunks),
+            rebuilt_at=datetime.now().isoformat(),
+        )
+        tmp_file = shard_path / "metadata.pkl.tmp"
+        with open(tmp_file, 'wb') as f:
+            pickle.dump(shard_metadata, f)
+        tmp_file.replace(shard_path / "metadata.pkl")
+        written.append(str(shard_path))
+    return written
+
+
+def rebuild_main(argv: List[str]) -> int:
+    """CLI for `ingest.py rebuild-index`"""
+    parser = argparse.ArgumentParser(
+        prog="ingest.py rebuild-index",
+        description="Rebuild the FAISS index from the saved embeddings (no re-encoding)"
+    )
+    parser.add_argument(
+        "--index-dir",
+        type=str,
+        default="./index",
+        help="Index directory written by ingest (default: ./index)"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=None,
+        help="Output directory (default: replace the index in --index-dir)"
+    )
+    parser.add_argument(
+        "--index-type",
+        type=str,
+        default="Flat",
+        help="FAISS index factory string, e.g. Flat, HNSW32, IVF1024,SQ8, IVF256,PQ48 (default: Flat)"
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        help="Split into this many shard collections (shard-00, ...) split at document boundaries"
+    )
+    parser.add_argument(
+        "--coarse-dim",
+        type=int,
+        default=0,
+        help="Also build a reduced-dimension coarse index (default: off)"
+    )
+    parser.add_argument(
+        "--coarse-method",
+        choices=PROJECTION_METHODS,
+        default="pca",
+        help="pca, or truncate for Matryoshka-trained models (default: pca)"
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=100_000,
+        help="Vectors sampled to train IVF/PQ/SQ indexes (default: 100000)"
+    )
+    parser.add_argument(
+        "--nprobe",
+        type=int,
+        default=16,
+        help="IVF lists searched per query (default: 16)"
+    )
+    args = parser.parse_args(argv)
+    if args.shards > 1 and not args.output_dir:
+        parser.error("--shards needs --output-dir (shards are written as collection directories)")
+    
+    try:
+        written = rebuild_index(
+            args.index_dir,
+            output_dir=args.output_dir,
+            index_type=args.index_type,
+            shards=args.shards,
+            coarse_dim=args.coarse_dim,
+            coarse_method=args.coarse_method,
+            train_size=args.train_size,
+            nprobe=args.nprobe,
+        )
+    except Exception as e:
+        print(f"\n✗ Error rebuilding index: {e}")
+        return 1
+    
+    print("\n" + "=" * 70)
+    print(f"  ✓ Rebuilt {len(written)} index(es): {', '.join(written)}")
+    print("=" * 70)
+    return 0
+
+
 def main():
     """Main CLI entry point"""
+    if sys.argv[1:2] == ["rebuild-index"]:
+        return rebuild_main(sys.argv[2:])
+    
     parser = argparse.ArgumentParser(
         description="Ingest PDFs and build FAISS vector index for RAG"
     )
@@ -401,6 +843,64 @@ def main():
         default=100,
         help="Overlap between chunks in characters (default: 100)"
     )
+    parser.add_argument(
+        "--text-cache-dir",
+        type=str,
+        default="./cache/pages",
+        help="Cache for extracted page text, reused across runs (default: ./cache/pages)"
+    )
+    parser.add_argument(
+        "--no-text-cache",
+        action="store_true",
+        help="Always re-extract text from the PDFs"
+    )
+    parser.add_argument(
+        "--extraction-mode",
+        choices=EXTRACTION_MODES,
+        default="adaptive",
+        help="adaptive: pypdf, with pdfplumber only for pages failing quality checks (default)"
+    )
+    parser.add_argument(
+        "--coarse-dim",
+        type=int,
+        default=0,
+        help="Also build a reduced-dimension coarse index for two-stage search, e.g. 128 (default: off)"
+    )
+    parser.add_argument(
+        "--coarse-method",
+        choices=PROJECTION_METHODS,
+        default="pca",
+        help="pca, or truncate for Matryoshka-trained models (default: pca)"
+    )
+    parser.add_argument(
+        "--no-ocr",
+        action="store_true",
+        help="Skip OCR of image-only pages (OCR needs pytesseract, pypdfium2 and tesseract)"
+    )
+    parser.add_argument(
+        "--ocr-dpi",
+        type=int,
+        default=DEFAULT_DPI,
+        help=f"Page rendering resolution for OCR (default: {DEFAULT_DPI})"
+    )
+    parser.add_argument(
+        "--ocr-lang",
+        type=str,
+        default=DEFAULT_LANG,
+        help=f"Tesseract languages (default: {DEFAULT_LANG})"
+    )
+    parser.add_argument(
+        "--ocr-workers",
+        type=int,
+        default=None,
+        help="OCR worker processes (default: CPU count, at most 4)"
+    )
+    parser.add_argument(
+        "--ocr-cache-dir",
+        type=str,
+        default="./cache/ocr",
+        help="Cache for OCR text keyed by page image hash (default: ./cache/ocr)"
+    )
     
     args = parser.parse_args()
     
@@ -408,12 +908,28 @@ def main():
     print("  Shankh.ai PDF Ingestion Pipeline")
     print("=" * 70)
     
+    ocr = None
+    if not args.no_ocr:
+        if OCR_AVAILABLE:
+            ocr = PageOCR(
+                dpi=args.ocr_dpi,
+                lang=args.ocr_lang,
+                workers=args.ocr_workers,
+                cache_dir=None if args.no_text_cache else args.ocr_cache_dir
+            )
+        else:
+            print("Warning: OCR not available (install pytesseract and pypdfium2), "
+                  "image-only pages will be skipped")
+    
     try:
         # Initialize pipeline
         pipeline = PDFIngestionPipeline(
             embedding_model=args.embedding_model,
             chunk_size=args.chunk_size,
-            chunk_overlap=args.chunk_overlap
+            chunk_overlap=args.chunk_overlap,
+            text_cache_dir=None if args.no_text_cache else args.text_cache_dir,
+            extraction_mode=args.extraction_mode,
+            ocr=ocr
         )
         
         # Process PDFs
@@ -429,8 +945,14 @@ def main():
         # Build FAISS index
         index = pipeline.build_faiss_index(embeddings)
         
+        # Coarse index for two-stage search (optional)
+        cascade = None
+        if args.coarse_dim:
+            cascade = pipeline.build_coarse_index(embeddings, args.coarse_dim, args.coarse_method)
+        
         # Save everything
-        pipeline.save_index(index, chunks, args.output_dir)
+        pipeline.save_index(index, chunks, args.output_dir, cascade=cascade,
+                            embeddings=embeddings)
         
         print("\n" + "=" * 70)
         print("  ✓ Ingestion Complete!")
@@ -447,6 +969,9 @@ def main():
         import traceback
         traceback.print_exc()
         return 1
+    finally:
+        if ocr is not None:
+            ocr.close()
 
 
 if __name__ == "__main__":
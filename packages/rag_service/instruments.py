@@ -0,0 +1,299 @@
+"""
+Instrument master and in-memory symbol search for the stock service
+
+Loads NSE/BSE instrument lists (CSV) and builds two indexes at startup:
+
+    prefix trie   -> symbol / company-name / word / alias prefixes
+    trigram index -> fuzzy matches for typos and partial words
+
+Lookups touch only the trie path for the query and the trigram postings
+it shares, so search time does not grow with the length of the list.
+"""
+
+import bisect
+import csv
+import unicodedata
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Column names accepted for each field (NSE EQUITY_L.csv, BSE scrip list, ours)
+SYMBOL_COLUMNS = ('SYMBOL', 'Security Id', 'TRADINGSYMBOL')
+NAME_COLUMNS = ('NAME OF COMPANY', 'Security Name', 'NAME', 'Issuer Name')
+EXCHANGE_COLUMNS = ('EXCHANGE',)
+ALIAS_COLUMNS = ('ALIASES',)
+ALIAS_SEPARATOR = '|'
+
+# Match kinds, best first (lower rank sorts first)
+MATCH_RANKS = {
+    'symbol': 0,
+    'symbol_prefix': 1,
+    'name_prefix': 2,
+    'alias_prefix': 3,
+    'word_prefix': 4,
+    'fuzzy': 5,
+}
+
+# Instrument ids kept per trie node; deeper nodes narrow the result set.
+# Each exchange has its own trie as well, so a filtered search is not starved
+# by another exchange's entries.
+TRIE_NODE_CAPACITY = 64
+
+# Minimum share of query trigrams an instrument must contain to match fuzzily
+FUZZY_THRESHOLD = 0.5
+
+# Words that do not help to tell companies apart
+STOP_WORDS = {'ltd', 'limited', 'the', 'of', 'and', 'india', 'co', 'company', 'corporation'}
+
+
+def normalize_text(text: str) -> str:
+    """Casefold, strip accents/punctuation and collapse whitespace (keeps Devanagari)"""
+    text = unicodedata.normalize('NFKC', text).casefold()
+    text = text.replace('&', ' and ')
+    # Drop punctuation/symbols by category so Devanagari vowel signs survive
+    text = ''.join(' ' if unicodedata.category(c)[0] in 'PS' else c for c in text)
+    return ' '.join(text.split())
+
+
+def trigrams(text: str) -> List[str]:
+    """Padded character trigrams of normalized text"""
+    padded = f"  {text} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class Instrument:
+    """One tradable instrument from the master list"""
+    __slots__ = ('symbol', 'name', 'exchange', 'aliases', 'series')
+
+    def __init__(self, symbol: str, name: str, exchange: str = 'NSE',
+                 aliases: Iterable[str] = (), series: str = ''):
+        self.symbol = symbol.strip().upper()
+        self.name = ' '.join(name.split())
+        self.exchange = exchange.strip().upper() or 'NSE'
+        self.aliases = [a.strip() for a in aliases if a.strip()]
+        self.series = series.strip()
+
+    def to_dict(self) -> Dict:
+        """Convert to dictionary for JSON serialization"""
+        return {
+            'symbol': self.symbol,
+            'name': self.name,
+            'exchange': self.exchange,
+        }
+
+
+class _TrieNode:
+    __slots__ = ('children', 'entries')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.entries: List[Tuple[int, int, int]] = []  # (rank, key length, instrument id)
+
+
+def _first(row: Dict[str, str], columns: Tuple[str, ...]) -> str:
+    """Value of the first present column (headers are matched case-insensitively)"""
+    for column in columns:
+        value = row.get(column.upper())
+        if value:
+            return value
+    return ''
+
+
+def load_instrument_master(path: str, default_exchange: str = 'NSE') -> List[Instrument]:
+    """
+    Load an instrument master CSV
+
+    Args:
+        path: CSV file (NSE EQUITY_L.csv, BSE scrip list or the bundled format
+            with an optional EXCHANGE column and '|'-separated ALIASES)
+        default_exchange: Exchange for rows without an EXCHANGE column
+
+    Returns:
+        List of instruments
+    """
+    instruments = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for raw in csv.DictReader(f):
+            row = {(k or '').strip().upper(): (v or '').strip() for k, v in raw.items()}
+            symbol = _first(row, SYMBOL_COLUMNS)
+            if not symbol:
+                continue
+            aliases = _first(row, ALIAS_COLUMNS)
+            instruments.append(Instrument(
+                symbol=symbol,
+                name=_first(row, NAME_COLUMNS) or symbol,
+                exchange=_first(row, EXCHANGE_COLUMNS) or default_exchange,
+                aliases=aliases.split(ALIAS_SEPARATOR) if aliases else (),
+                series=row.get('SERIES', ''),
+            ))
+    return instruments
+
+
+class InstrumentIndex:
+    """Prefix trie plus trigram index over symbols, names and aliases"""
+
+    def __init__(self, instruments: Iterable[Instrument] = ()):
+        """
+        Args:
+            instruments: Instruments to index (duplicates by exchange:symbol are dropped)
+        """
+        self.instruments: List[Instrument] = []
+        self._by_symbol: Dict[str, List[int]] = {}
+        self._seen = set()
+        self._root = _TrieNode()
+        self._exchange_roots: Dict[str, _TrieNode] = {}
+        self._trigrams: Dict[str, List[int]] = {}
+        self._trigram_counts: List[int] = []
+        for instrument in instruments:
+            self.add(instrument)
+
+    def __len__(self) -> int:
+        return len(self.instruments)
+
+    @classmethod
+    def from_files(cls, paths: Iterable[str],
+                   extra: Iterable[Instrument] = ()) -> 'InstrumentIndex':
+        """Build an index from master CSVs (missing files are skipped) plus extras"""
+        instruments = []
+        for path in paths:
+            if path and Path(path).exists():
+                instruments.extend(load_instrument_master(path))
+        instruments.extend(extra)
+        return cls(instruments)
+
+    def add(self, instrument: Instrument) -> None:
+        """Index one instrument"""
+        key = (instrument.exchange, instrument.symbol)
+        if key in self._seen:
+            return
+        self._seen.add(key)
+
+        idx = len(self.instruments)
+        self.instruments.append(instrument)
+        self._by_symbol.setdefault(instrument.symbol.casefold(), []).append(idx)
+
+        symbol = normalize_text(instrument.symbol)
+        name = normalize_text(instrument.name)
+        aliases = [normalize_text(a) for a in instrument.aliases]
+
+        keys = [(symbol, MATCH_RANKS['symbol_prefix'])]
+        keys.append((name, MATCH_RANKS['name_prefix']))
+        keys.extend((alias, MATCH_RANKS['alias_prefix']) for alias in aliases)
+        for text in [name] + aliases:
+            words = text.split()
+            for word in words[1:]:
+                if word not in STOP_WORDS:
+                    keys.append((word, MATCH_RANKS['word_prefix']))
+        exchange_root = self._exchange_roots.setdefault(instrument.exchange, _TrieNode())
+        for key, rank in keys:
+            self._insert(self._root, key, rank, idx)
+            self._insert(exchange_root, key, rank, idx)
+
+        grams = set()
+        for text in [symbol, name] + aliases:
+            grams.update(trigrams(text))
+        for gram in grams:
+            self._trigrams.setdefault(gram, []).append(idx)
+        self._trigram_counts.append(len(grams))
+
+    @staticmethod
+    def _insert(root: _TrieNode, key: str, rank: int, idx: int) -> None:
+        """Add key to the trie under root, recording idx on every node of its path"""
+        node = root
+        entry = (rank, len(key), idx)
+        for char in key:
+            node = node.children.setdefault(char, _TrieNode())
+            entries = node.entries
+            # Kept sorted; full nodes drop their worst entry
+            if len(entries) < TRIE_NODE_CAPACITY or entry < entries[-1]:
+                bisect.insort(entries, entry)
+                if len(entries) > TRIE_NODE_CAPACITY:
+                    entries.pop()
+
+    def _prefix(self, query: str, exchange: Optional[str] = None) -> List[Tuple[int, int, int]]:
+        """Entries for all keys starting with query (on one exchange if given)"""
+        node = self._exchange_roots.get(exchange) if exchange else self._root
+        if node is None:
+            return []
+        for char in query:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.entries
+
+    def _fuzzy(self, query: str, exclude: set, limit: int,
+               exchange: Optional[str] = None) -> List[Tuple[float, int]]:
+        """Instruments containing enough of the query's trigrams (on one exchange if given)"""
+        query_grams = set(trigrams(query))
+        shared = Counter()
+        for gram in query_grams:
+            shared.update(self._trigrams.get(gram, ()))
+
+        scored = []
+        for idx, count in shared.items():
+            if idx in exclude:
+                continue
+            if exchange and self.instruments[idx].exchange != exchange:
+                continue
+            similarity = count / len(query_grams)
+            if similarity >= FUZZY_THRESHOLD:
+                scored.append((similarity, idx))
+        # Ties go to instruments with less text (more specific matches)
+        scored.sort(key=lambda item: (-item[0], self._trigram_counts[item[1]], item[1]))
+        return scored[:limit]
+
+    def lookup(self, symbol: str) -> List[Instrument]:
+        """Exact symbol matches across exchanges"""
+        return [self.instruments[i] for i in self._by_symbol.get(symbol.strip().casefold(), [])]
+
+    def search(self, query: str, limit: int = 10, exchange: Optional[str] = None) -> List[Dict]:
+        """
+        Ranked search by symbol, company name or alias
+
+        Args:
+            query: Search text (Latin or Devanagari, typos tolerated)
+            limit: Maximum number of results
+            exchange: Restrict to one exchange (NSE/BSE)
+
+        Returns:
+            List of dicts with symbol, name, exchange, match and score
+        """
+        normalized = normalize_text(query)
+        if not normalized:
+            return []
+        exchange = exchange.upper() if exchange else None
+
+        # Best (rank, length) per instrument; exact symbol matches first
+        best: Dict[int, Tuple[int, int]] = {}
+        for idx in self._by_symbol.get(query.strip().casefold(), []):
+            if exchange and self.instruments[idx].exchange != exchange:
+                continue
+            best[idx] = (MATCH_RANKS['symbol'], 0)
+        for rank, key_len, idx in self._prefix(normalized, exchange):
+            candidate = (rank, key_len)
+            if idx not in best or candidate < best[idx]:
+                best[idx] = candidate
+
+        kinds = {rank: kind for kind, rank in MATCH_RANKS.items()}
+        ordered = sorted(best.items(), key=lambda item: (item[1], item[0]))
+        results = []
+        for idx, (rank, key_len) in ordered:
+            instrument = self.instruments[idx]
+            result = instrument.to_dict()
+            result['match'] = kinds[rank]
+            result['score'] = round(1.0 - 0.1 * rank, 3)
+            results.append(result)
+            if len(results) >= limit:
+                return results
+
+        # No prefix match (typo or transliteration): fall back to trigrams
+        if not results and len(normalized) >= 3:
+            for similarity, idx in self._fuzzy(normalized, set(best), limit, exchange):
+                instrument = self.instruments[idx]
+                result = instrument.to_dict()
+                result['match'] = 'fuzzy'
+                result['score'] = round(0.5 * similarity, 3)
+                results.append(result)
+                if len(results) >= limit:
+                    break
+        return results
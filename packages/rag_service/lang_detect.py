@@ -0,0 +1,186 @@
+"""
+Fast query language detection for Shankh.ai RAG Service
+
+Classifies short queries from a Unicode script histogram and only falls back
+to the (slow, statistical) langdetect detector when the script alone is
+ambiguous, e.g. long Latin-script text or mixed-script queries.
+
+Resolution order:
+    1. Explicit language hint from the caller ("en", "hi-IN", ...)
+    2. Script histogram for short queries (Devanagari -> hi, Latin -> en, ...)
+    3. langdetect (seeded, so results are deterministic)
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Optional
+
+# Optional: statistical fallback detector
+try:
+    from langdetect import DetectorFactory, detect, LangDetectException
+    DetectorFactory.seed = 0  # langdetect is non-deterministic unless seeded
+    LANGDETECT_AVAILABLE = True
+except ImportError:
+    LANGDETECT_AVAILABLE = False
+
+
+# (first code point, last code point, script name)
+SCRIPT_RANGES = [
+    (0x0041, 0x024F, 'latin'),
+    (0x0600, 0x06FF, 'arabic'),
+    (0x0900, 0x097F, 'devanagari'),
+    (0x0980, 0x09FF, 'bengali'),
+    (0x0A00, 0x0A7F, 'gurmukhi'),
+    (0x0A80, 0x0AFF, 'gujarati'),
+    (0x0B00, 0x0B7F, 'oriya'),
+    (0x0B80, 0x0BFF, 'tamil'),
+    (0x0C00, 0x0C7F, 'telugu'),
+    (0x0C80, 0x0CFF, 'kannada'),
+    (0x0D00, 0x0D7F, 'malayalam'),
+    (0xA8E0, 0xA8FF, 'devanagari'),
+]
+
+# Language assumed for a query written (almost) entirely in one script
+SCRIPT_LANGUAGES = {
+    'latin': 'en',
+    'arabic': 'ur',
+    'devanagari': 'hi',
+    'bengali': 'bn',
+    'gurmukhi': 'pa',
+    'gujarati': 'gu',
+    'oriya': 'or',
+    'tamil': 'ta',
+    'telugu': 'te',
+    'kannada': 'kn',
+    'malayalam': 'ml',
+}
+
+# Share of letters that must belong to the dominant script
+DOMINANT_SCRIPT_RATIO = 0.8
+
+# Latin-script text longer than this goes to the full detector, since it may
+# be any European language (or romanised Hindi) rather than English
+SHORT_QUERY_CHARS = 200
+
+
+def char_script(ch: str) -> Optional[str]:
+    """
+    Get the script name of a single character
+
+    Args:
+        ch: Single character
+
+    Returns:
+        Script name, or None for digits, punctuation and unknown scripts
+    """
+    code = ord(ch)
+    for first, last, script in SCRIPT_RANGES:
+        if first <= code <= last:
+            # Latin range also covers punctuation between the letter blocks
+            if script == 'latin' and not ch.isalpha():
+                return None
+            return script
+    return None
+
+
+def script_histogram(text: str) -> Dict[str, int]:
+    """
+    Count letters per Unicode script
+
+    Combining marks (matras, viramas) are counted with their script, so
+    Devanagari words are not under-counted relative to Latin ones.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Dict mapping script name to number of characters
+    """
+    counts: Dict[str, int] = {}
+    for ch in text:
+        if not (ch.isalpha() or unicodedata.category(ch).startswith('M')):
+            continue
+        script = char_script(ch)
+        if script is None:
+            script = 'other'
+        counts[script] = counts.get(script, 0) + 1
+    return counts
+
+
+def classify_by_script(text: str,
+                       short_query_chars: Optional[int] = SHORT_QUERY_CHARS) -> Optional[str]:
+    """
+    Guess language from the dominant script of the text
+
+    Args:
+        text: Input text
+        short_query_chars: Latin text longer than this is treated as
+            ambiguous (None disables the length check, e.g. for chunks)
+
+    Returns:
+        ISO 639-1 language code, or None when the script is ambiguous
+    """
+    counts = script_histogram(text)
+    total = sum(counts.values())
+    if total == 0:
+        return None
+
+    script, count = max(counts.items(), key=lambda item: item[1])
+    if count / total < DOMINANT_SCRIPT_RATIO:
+        return None  # Mixed script (e.g. Hinglish with Devanagari words)
+
+    if (script == 'latin' and short_query_chars is not None
+            and len(text) > short_query_chars):
+        return None
+
+    return SCRIPT_LANGUAGES.get(script)
+
+
+def normalize_lang_hint(lang_hint: Optional[str]) -> Optional[str]:
+    """
+    Normalize a caller language hint ("hi-IN", "EN", "auto") to a base code
+
+    Args:
+        lang_hint: Language hint from the request
+
+    Returns:
+        Lowercase base language code, or None if no usable hint
+    """
+    if not lang_hint:
+        return None
+    base = lang_hint.strip().lower().replace('_', '-').split('-')[0]
+    if not base or base in ('auto', 'unknown', 'und'):
+        return None
+    return base
+
+
+@lru_cache(maxsize=4096)
+def _detect_from_text(text: str) -> Optional[str]:
+    """Script classifier with langdetect fallback, memoised per query string"""
+    lang = classify_by_script(text)
+    if lang is not None:
+        return lang
+
+    if LANGDETECT_AVAILABLE:
+        try:
+            return detect(text)
+        except LangDetectException:
+            pass
+    return None
+
+
+def detect_language(text: str, lang_hint: Optional[str] = None) -> Optional[str]:
+    """
+    Detect query language using the cheapest reliable signal
+
+    Args:
+        text: Query text
+        lang_hint: Optional language hint from the caller
+
+    Returns:
+        ISO 639-1 language code, or None if it could not be determined
+    """
+    hint = normalize_lang_hint(lang_hint)
+    if hint is not None:
+        return hint
+    return _detect_from_text(text.strip())
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+"""
+Mixed-Workload Load Test for Shankh.ai RAG Service
+
+Replays the traffic the Node backend generates (/retrieve for every chat
+message, /stock/multiple when stock symbols are mentioned, /transcribe for
+voice notes, /status from its health checks) against the FastAPI app, so interference between endpoints
+shows up before a deploy.
+
+Arrivals are open-loop: request start times follow a Poisson process at
+--rate requests/second whatever the response times, and latency is measured
+from the scheduled start, so a stalled server shows up as queueing latency
+instead of silently lowering the offered load.
+
+By default the app runs in-process (httpx ASGI transport) with local
+stand-ins: a synthetic index and a CPU-bound stand-in encoder, a fake market
+data source with configurable upstream latency, and a stand-in STT engine fed
+synthetic audio. The server shares this process's event loop, so the reported
+event-loop lag is the server's. With --url the load goes to a running server
+instead (real models; lag is then only the client's).
+
+Usage:
+    python loadtest.py --rate 20 --duration 30
+    python loadtest.py --mix retrieve=6,stock=2,transcribe=1,retrieve_bulk=2 --rate 40
+    python loadtest.py --mix retrieve=6,stock=2,history=1,status=1 --rate 20
+    python loadtest.py --quote-ttl 0 --market-latency-ms 300 --output before.json
+    python loadtest.py --url http://localhost:8000 --rate 5
+
+Author: Shankh.ai Team
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import pickle
+import random
+import tempfile
+import threading
+import time
+import wave
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import faiss
+import httpx
+import numpy as np
+
+from bench_stt import synthetic_clip
+from stt_service import SAMPLE_RATE
+
+# Endpoint mix of the backend: every chat message retrieves, some mention
+# stocks, some arrive as voice notes
+DEFAULT_MIX = "retrieve=6,stock=2,transcribe=1,status=1"
+ENDPOINTS = ("retrieve", "retrieve_bulk", "stock", "history", "transcribe", "status")
+
+# Days of bars FakeMarketSource returns per history period
+PERIOD_DAYS = {"1d": 1, "5d": 5, "1mo": 30, "3mo": 90, "6mo": 180, "ytd": 365,
+               "1y": 365, "2y": 730, "5y": 1825, "10y": 3650, "max": 3650}
+
+STAND_IN_MODEL = "loadtest-stand-in"
+
+QUERIES = [
+    "What are the eligibility criteria for a home loan?",
+    "How is interest calculated on a savings account?",
+    "What is the penalty for early repayment of a personal loan?",
+    "Explain the KYC requirements for opening a demat account",
+    "What are the charges for a credit card cash withdrawal?",
+    "How do I report a fraudulent UPI transaction?",
+    "होम लोन के लिए पात्रता मानदंड क्या हैं?",
+    "बचत खाते पर ब्याज की गणना कैसे होती है?",
+    "म्यूचुअल फंड में निवेश के जोखिम क्या हैं?",
+    "fixed deposit interest rates for senior citizens",
+]
+
+
+class StandInEncoder:
+    """
+    Encoder stand-in: hashed bag of words plus a fixed amount of BLAS work
+
+    The matrix products release the GIL like a real forward pass does, so
+    the encoder competes for CPU (not for the interpreter) with the rest
+    of the server.
+    """
+
+    def __init__(self, dim: int = 384, encode_ms: float = 15.0):
+        self.dim = dim
+        self.encode_ms = encode_ms
+        rng = np.random.default_rng(0)
+        self._weights = rng.standard_normal((256, 256)).astype(np.float32) / 16
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dim
+
+    def encode(self, texts: List[str], convert_to_numpy: bool = True, **kwargs) -> np.ndarray:
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, zlib.crc32(word.encode()) % self.dim] += 1.0
+        hidden = np.ones((64, 256), dtype=np.float32)
+        end = time.perf_counter() + self.encode_ms / 1000 * len(texts)
+        while time.perf_counter() < end:
+            hidden = np.tanh(hidden @ self._weights)
+        return out
+
+
+class FakeMarketSource:
+    """Market data source stand-in: random-walk quotes after a simulated upstream delay"""
+
+    def __init__(self, latency_ms: float = 150.0, error_rate: float = 0.0, seed: int = 0):
+        """
+        Args:
+            latency_ms: Mean upstream latency (exponentially distributed)
+            error_rate: Fraction of fetches that fail like a dropped connection
+            seed: Random seed
+        """
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._prices: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _upstream_call(self, symbol: str) -> None:
+        """Simulated network delay and failure of one upstream request"""
+        with self._lock:
+            delay = self._rng.expovariate(1000 / self.latency_ms) if self.latency_ms else 0.0
+            failed = self._rng.random() < self.error_rate
+        time.sleep(delay)
+        if failed:
+            raise ConnectionError(f"simulated upstream error for {symbol}")
+
+    def get_info(self, symbol: str) -> Dict:
+        with self._lock:
+            previous = self._prices.setdefault(symbol, self._rng.uniform(100, 4000))
+            price = previous * (1 + self._rng.gauss(0, 0.002))
+            self._prices[symbol] = price
+        self._upstream_call(symbol)
+        return {
+            'currentPrice': price,
+            'previousClose': previous,
+            'open': previous,
+            'dayHigh': max(price, previous),
+            'dayLow': min(price, previous),
+            'volume': 1_000_000,
+            'longName': symbol,
+            'currency': 'INR',
+        }
+
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d",
+                    start=None):
+        """Random-walk daily OHLCV bars ending today (interval is not simulated)"""
+        import pandas as pd
+
+        end = pd.Timestamp.now(tz='Asia/Kolkata').normalize()
+        if start is not None:
+            start = pd.Timestamp(start)
+            start = start.tz_localize('Asia/Kolkata') if start.tzinfo is None else start.tz_convert('Asia/Kolkata')
+            index = pd.date_range(start=start.normalize(), end=end, freq='D')
+        else:
+            index = pd.date_range(end=end, periods=PERIOD_DAYS.get(period, 30), freq='D')
+        with self._lock:
+            last = self._prices.setdefault(symbol, self._rng.uniform(100, 4000))
+            seed = self._rng.getrandbits(32)
+        self._upstream_call(symbol)
+        steps = np.random.default_rng(seed).normal(0, 0.01, len(index))
+        close = last * np.exp(np.cumsum(steps[::-1]))[::-1]
+        return pd.DataFrame({
+            'Open': close * 0.998, 'High': close * 1.01, 'Low': close * 0.99,
+            'Close': close, 'Volume': np.full(len(index), 1_000_000.0),
+        }, index=index)
+
+
+class StandInSTT:
+    """STT engine pool stand-in: holds a slot for audio duration x RTF"""
+
+    backend = "stand-in"
+    model_name = "stand-in"
+
+    def __init__(self, rtf: float = 0.3, size: int = 1):
+        """
+        Args:
+            rtf: Real-time factor to simulate (processing time / audio duration)
+            size: Concurrent transcriptions (like EnginePool size)
+        """
+        self.rtf = rtf
+        self.size = size
+        self._slots = threading.BoundedSemaphore(size)
+
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                   beam_size: Optional[int] = None, **options) -> Dict[str, Any]:
+        duration = len(audio) / SAMPLE_RATE
+        with self._slots:
+            time.sleep(duration * self.rtf)
+        text = random.choice(QUERIES)
+        return {
+            'text': text,
+            'language': language or 'en',
+            'segments': [{'start': 0.0, 'end': duration, 'text': text, 'no_speech_prob': 0.05}],
+        }
+
+
+def wav_bytes(audio: np.ndarray) -> bytes:
+    """Encode float32 PCM as a 16-bit mono WAV file"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((np.clip(audio, -1, 1) * 32767).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+def build_synthetic_index(directory: str, num_chunks: int, dim: int) -> str:
+    """Write a random normalized index and matching metadata (ingest.py layout)"""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((num_chunks, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    faiss.write_index(index, str(Path(directory) / "faiss_index.bin"))
+    chunks = []
+    for i in range(num_chunks):
+        text = f"{QUERIES[i % len(QUERIES)]} (clause {i})"
+        chunks.append({
+            'chunk_id': i,
+            'filename': f"doc_{i // 50}.pdf",
+            'page_num': i % 50 // 5 + 1,
+            'text': text,
+            'excerpt': text[:100],
+            'char_start': 0,
+            'char_end': len(text),
+        })
+    with open(Path(directory) / "metadata.pkl", 'wb') as f:
+        pickle.dump({'chunks': chunks, 'embedding_model': STAND_IN_MODEL}, f)
+    return directory
+
+
+def install_stand_ins(server, args, directory: str) -> None:
+    """Point the server at the synthetic index and the stand-in components"""
+    server.settings.index_path = build_synthetic_index(directory, args.chunks, args.dim)
+    server.settings.collections_dir = ""
+    server.settings.embedding_model = STAND_IN_MODEL
+    server.state.model = StandInEncoder(args.dim, args.encode_ms)
+    server.load_index_and_metadata()
+    server.state.components.update(encoder="ready", index="ready")
+    server.state.ready = True
+
+    server.state.stt_pool = StandInSTT(args.stt_rtf, args.stt_pool_size)
+    server.state.components["stt"] = "ready"
+
+    if server.STOCK_SERVICE_AVAILABLE:
+        service = server.StockPriceService(
+            source=FakeMarketSource(args.market_latency_ms, args.market_error_rate, args.seed)
+        )
+        if args.quote_ttl is not None:
+            # Shorter TTLs send more fetches (mostly background refreshes) upstream
+            service.INDEX_TTL = service.EQUITY_TTL = (args.quote_ttl, args.quote_ttl)
+        server.state.stock_service = service
+        server.state.components["stock"] = "ready"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse 'retrieve=6,stock=2' into endpoint weights"""
+    weights = {}
+    for part in mix.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint in mix: {name} (choose from {', '.join(ENDPOINTS)})")
+        weights[name] = float(weight or 1)
+    if not any(weights.values()):
+        raise ValueError("Traffic mix has no weight")
+    return weights
+
+
+class LoopLagMonitor:
+    """Measures how late the event loop wakes a task that sleeps `interval`"""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.lags_ms: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.lags_ms.append(max(0.0, (loop.time() - start - self.interval) * 1000))
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+class LoadGenerator:
+    """Sends one endpoint's requests and records their outcomes"""
+
+    def __init__(self, client: httpx.AsyncClient, args):
+        self.client = client
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.symbols = ["RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "ITC", "SBIN",
+                        "BHARTIARTL", "WIPRO", "BAJFINANCE", "NIFTY", "SENSEX", "BANKNIFTY"]
+        self.clips = [wav_bytes(synthetic_clip(seconds)) for seconds in args.audio_seconds]
+        self.results: Dict[str, List[Dict]] = {name: [] for name in ENDPOINTS}
+
+    def build(self, endpoint: str) -> Dict[str, Any]:
+        """httpx request arguments for one request to `endpoint`"""
+        timeout_ms = str(int(self.args.timeout * 1000))
+        if endpoint in ("retrieve", "retrieve_bulk"):
+            priority = "interactive" if endpoint == "retrieve" else "bulk"
+            return {
+                'method': "POST", 'url': "/retrieve",
+                'json': {'query': self.rng.choice(QUERIES), 'k': 5, 'threshold': 0.0},
+                'headers': {"X-Priority": priority, "X-Timeout-Ms": timeout_ms},
+            }
+        if endpoint == "stock":
+            return {
+                'method': "POST", 'url': "/stock/multiple",
+                'json': {'symbols': self.rng.sample(self.symbols, self.rng.randint(1, 3))},
+            }
+        if endpoint == "history":
+            return {
+                'method': "POST", 'url': "/stock/history",
+                'json': {'symbol': self.rng.choice(self.symbols),
+                         'period': self.rng.choice(["1mo", "6mo", "1y"])},
+            }
+        if endpoint == "status":
+            return {'method': "GET", 'url': "/status"}
+        return {
+            'method': "POST", 'url': "/transcribe",
+            'files': {'audio': ("voice.wav", self.rng.choice(self.clips), "audio/wav")},
+            'data': {'language': self.rng.choice(["hi", "en"])},
+        }
+
+    async def fire(self, endpoint: str, scheduled: float) -> None:
+        """Send one request; latency counts from its scheduled start"""
+        request = self.build(endpoint)
+        loop = asyncio.get_running_loop()
+        status: Any
+        try:
+            # Whole-request deadline, like the backend's axios timeout
+            response = await asyncio.wait_for(self.client.request(**request), self.args.timeout)
+            status = response.status_code
+        except (asyncio.TimeoutError, httpx.TimeoutException):
+            status = "timeout"
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        self.results[endpoint].append({
+            'status': status,
+            'latency_ms': (loop.time() - scheduled) * 1000,
+        })
+
+
+async def run_load(client: httpx.AsyncClient, args) -> Dict:
+    """Drive Poisson arrivals for --duration seconds and collect the outcomes"""
+    weights = parse_mix(args.mix)
+    names = list(weights)
+    generator = LoadGenerator(client, args)
+    arrivals = random.Random(args.seed + 1)
+    monitor = LoopLagMonitor(args.lag_interval)
+    loop = asyncio.get_running_loop()
+
+    monitor.start()
+    tasks = []
+    start = loop.time()
+    offset = 0.0
+    while True:
+        offset += arrivals.expovariate(args.rate)
+        if offset >= args.duration:
+            break
+        await asyncio.sleep(max(0.0, start + offset - loop.time()))
+        endpoint = arrivals.choices(names, [weights[name] for name in names])[0]
+        tasks.append(asyncio.create_task(generator.fire(endpoint, start + offset)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - start
+    await monitor.stop()
+
+    return summarize(generator.results, monitor.lags_ms, elapsed, args)
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {'p50': None, 'p90': None, 'p99': None, 'max': None}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(max(values))}
+
+
+def summarize(results: Dict[str, List[Dict]], lags_ms: List[float], elapsed: float, args) -> Dict:
+    """Per-endpoint throughput, latency percentiles and errors, plus loop lag"""
+    endpoints = {}
+    for name, outcomes in results.items():
+        if not outcomes:
+            continue
+        ok = [o['latency_ms'] for o in outcomes if isinstance(o['status'], int) and o['status'] < 400]
+        errors: Dict[str, int] = {}
+        for o in outcomes:
+            if not (isinstance(o['status'], int) and o['status'] < 400):
+                errors[str(o['status'])] = errors.get(str(o['status']), 0) + 1
+        endpoints[name] = {
+            'requests': len(outcomes),
+            'throughput_rps': len(ok) / elapsed,
+            'error_rate': 1 - len(ok) / len(outcomes),
+            'errors': errors,
+            'latency_ms': percentiles(ok),
+        }
+    return {
+        'config': {key: value for key, value in vars(args).items()},
+        'elapsed_seconds': elapsed,
+        'endpoints': endpoints,
+        'loop_lag_ms': percentiles(lags_ms),
+    }
+
+
+def print_report(report: Dict) -> None:
+    def ms(value):
+        return f"{value:>8.1f}" if value is not None else f"{'-':>8}"
+
+    print("\n" + "=" * 78)
+    print(f"  {'endpoint':<14} {'reqs':>6} {'ok/s':>7} {'err%':>6} "
+          f"{'p50':>8} {'p90':>8} {'p99':>8} {'max':>8}")
+    for name, row in report['endpoints'].items():
+        latency = row['latency_ms']
+        print(f"  {name:<14} {row['requests']:>6} {row['throughput_rps']:>7.2f} "
+              f"{row['error_rate'] * 100:>6.1f} {ms(latency['p50'])} {ms(latency['p90'])} "
+              f"{ms(latency['p99'])} {ms(latency['max'])}")
+        if row['errors']:
+            print(f"  {'':<14} errors: {row['errors']}")
+    lag = report['loop_lag_ms']
+    print(f"  {'loop lag':<14} {'':>6} {'':>7} {'':>6} {ms(lag['p50'])} {ms(lag['p90'])} "
+          f"{ms(lag['p99'])} {ms(lag['max'])}")
+    print("=" * 78)
+
+
+async def run(args) -> Dict:
+    """Set up the target (in-process app or --url) and run the load"""
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return await run_load(client, args)
+
+    import server
+    with tempfile.TemporaryDirectory(prefix="loadtest_") as directory:
+        install_stand_ins(server, args, directory)
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadtest",
+                                     timeout=timeout) as client:
+            return await run_load(client, args)
+
+
+def main():
+    """Main CLI entry point"""
+    parser = argparse.ArgumentParser(description="Mixed-workload load test (open-loop Poisson arrivals)")
+    parser.add_argument("--rate", type=float, default=10.0, help="Requests per second (default: 10)")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds of arrivals (default: 30)")
+    parser.add_argument("--mix", default=DEFAULT_MIX,
+                        help=f"Endpoint weights, from {', '.join(ENDPOINTS)} (default: {DEFAULT_MIX})")
+    parser.add_argument("--timeout", type=float, default=10.0,
+                        help="Client timeout in seconds, as in the backend (default: 10)")
+    parser.add_argument("--url", default=None, help="Load a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: 0)")
+    parser.add_argument("--lag-interval", type=float, default=0.01,
+                        help="Event-loop lag probe interval in seconds (default: 0.01)")
+    parser.add_argument("--output", default=None, help="Write the report as JSON")
+    stand_ins = parser.add_argument_group("in-process stand-ins")
+    stand_ins.add_argument("--chunks", type=int, default=20000, help="Synthetic index size (default: 20000)")
+    stand_ins.add_argument("--dim", type=int, default=384, help="Embedding dimension (default: 384)")
+    stand_ins.add_argument("--encode-ms", type=float, default=15.0,
+                           help="CPU time per query encode (default: 15)")
+    stand_ins.add_argument("--market-latency-ms", type=float, default=150.0,
+                           help="Mean fake upstream quote latency (default: 150)")
+    stand_ins.add_argument("--market-error-rate", type=float, default=0.0,
+                           help="Fraction of failing upstream fetches (default: 0)")
+    stand_ins.add_argument("--quote-ttl", type=float, default=None,
+                           help="Quote cache TTL in seconds (default: production TTLs)")
+    stand_ins.add_argument("--stt-rtf", type=float, default=0.3,
+                           help="Simulated STT real-time factor (default: 0.3)")
+    stand_ins.add_argument("--stt-pool-size", type=int, default=1,
+                           help="Concurrent stand-in transcriptions (default: 1)")
+    stand_ins.add_argument("--audio-seconds", type=float, nargs="*", default=[3.0, 6.0, 12.0],
+                           help="Synthetic voice-note lengths (default: 3 6 12)")
+    args = parser.parse_args()
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return 1
+
+    print("=" * 78)
+    target = args.url or "in-process app with stand-ins"
+    print(f"  Load test: {args.rate:g} req/s for {args.duration:g}s, mix {args.mix} -> {target}")
+    print("=" * 78)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"✓ Report written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,82 @@
+"""
+Maximal marginal relevance (MMR) selection of retrieval hits
+
+Overlapping chunks (ingest.py chunks with 100 characters of overlap, and
+documents repeat clauses) make the top hits of a query near-duplicates of
+each other. MMR picks hits one at a time, each maximising
+
+    lambda * relevance - (1 - lambda) * max similarity to the hits already picked
+
+over a candidate pool, so the results cover more distinct content. An
+optional cap limits how many hits come from the same document.
+
+The candidate-candidate similarities are one matrix product; each pick then
+updates a running "closest picked hit" vector, so selecting k of n
+candidates costs O(n^2 d + k n) in NumPy.
+"""
+
+from typing import Optional
+
+import numpy as np
+
+
+def mmr_select(relevance: np.ndarray, vectors: Optional[np.ndarray], k: int,
+               lambda_mult: float = 0.7, groups: Optional[np.ndarray] = None,
+               max_per_group: Optional[int] = None) -> np.ndarray:
+    """
+    Choose up to k diverse candidates
+
+    Args:
+        relevance: Query similarity of each candidate (n,)
+        vectors: L2-normalised candidate vectors (n, dim); None selects by
+            relevance only (per-group cap still applied)
+        k: Number of candidates to select
+        lambda_mult: 1.0 = pure relevance, 0.0 = pure diversity
+        groups: Group id of each candidate (e.g. document), for max_per_group
+        max_per_group: Maximum selections from one group (None = no cap)
+
+    Returns:
+        Indices into the candidates, in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    if vectors is not None and lambda_mult < 1.0:
+        similarity = vectors @ vectors.T
+        # Closest already-selected candidate; nothing selected yet
+        closest = np.full(n, -np.inf, dtype=np.float32)
+    else:
+        similarity = None
+        closest = None
+
+    if max_per_group is not None and groups is not None:
+        _, group_index = np.unique(groups, return_inverse=True)
+        group_counts = np.zeros(group_index.max() + 1, dtype=np.int64)
+    else:
+        group_index = None
+
+    available = np.ones(n, dtype=bool)
+    selected = []
+    for _ in range(k):
+        if similarity is None or not selected:
+            marginal = relevance.copy()
+        else:
+            marginal = lambda_mult * relevance - (1.0 - lambda_mult) * closest
+        marginal[~available] = -np.inf
+        best = int(np.argmax(marginal))
+        if not available[best]:
+            # Every remaining candidate is capped out
+            break
+        selected.append(best)
+        available[best] = False
+        if similarity is not None:
+            np.maximum(closest, similarity[best], out=closest)
+        if group_index is not None:
+            group = group_index[best]
+            group_counts[group] += 1
+            if group_counts[group] >= max_per_group:
+                available &= group_index != group
+    return np.array(selected, dtype=np.int64)
@@ -0,0 +1,224 @@
+"""
+OCR fallback for image-only PDF pages
+
+Scanned circulars have no text layer, so both pdfplumber and pypdf return
+nothing for them. Those pages are rendered to images (pypdfium2, which
+pdfplumber already depends on) and read with Tesseract (Hindi + English by
+default).
+
+OCR costs seconds per page, so:
+    - pages run in a bounded process pool (one page per task)
+    - results are cached by a hash of the rendered page image, so re-ingesting
+      a file, or the same scan inside another file, skips Tesseract
+    - every page reports its render / OCR time for the ingest report
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import pypdfium2 as pdfium
+    PDFIUM_AVAILABLE = True
+except ImportError:
+    PDFIUM_AVAILABLE = False
+
+try:
+    import pytesseract
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+OCR_AVAILABLE = PDFIUM_AVAILABLE and TESSERACT_AVAILABLE
+
+DEFAULT_DPI = 300
+DEFAULT_LANG = "hin+eng"
+# Seconds Tesseract may spend on one page before it is skipped
+DEFAULT_PAGE_TIMEOUT = 120
+
+
+def tesseract_version() -> str:
+    """Installed Tesseract version ('unknown' when it cannot be queried)"""
+    try:
+        return str(pytesseract.get_tesseract_version())
+    except Exception:
+        return "unknown"
+
+
+def page_count(pdf_path: str) -> int:
+    """Number of pages in a PDF"""
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        return len(pdf)
+    finally:
+        pdf.close()
+
+
+class OCRCache:
+    """OCR text keyed by rendered page hash (one small gzip JSON per page)"""
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory for cache records (created if missing)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, page_hash: str) -> Path:
+        """Record location (sharded by hash prefix)"""
+        return self.cache_dir / page_hash[:2] / f"{page_hash}.json.gz"
+
+    def load(self, page_hash: str) -> Optional[str]:
+        """Cached text, or None on a miss"""
+        path = self.path(page_hash)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)['text']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, page_hash: str, text: str) -> None:
+        """Write a record atomically (temp file + rename, safe across workers)"""
+        path = self.path(page_hash)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'text': text}, f, ensure_ascii=False)
+        tmp_path.replace(path)
+
+
+def ocr_page(pdf_path: str, page_num: int, dpi: int, lang: str,
+             engine_version: str, cache_dir: Optional[str] = None,
+             timeout: float = DEFAULT_PAGE_TIMEOUT) -> Tuple[int, str, Dict]:
+    """
+    Render and OCR one page (runs inside a pool worker)
+
+    Args:
+        pdf_path: Path to PDF file
+        page_num: 1-based page number
+        dpi: Rendering resolution
+        lang: Tesseract language string (e.g. "hin+eng")
+        engine_version: Tesseract version (part of the cache key)
+        cache_dir: OCR cache directory (None disables caching)
+        timeout: Seconds allowed for Tesseract
+
+    Returns:
+        (page_number, text, timing) where timing has render_ms, ocr_ms, cached
+        (and error, when Tesseract timed out)
+
+    Raises:
+        Rendering and Tesseract errors (PageOCR.run reports them per page)
+    """
+    start = time.perf_counter()
+    pdf = pdfium.PdfDocument(pdf_path)
+    try:
+        image = pdf[page_num - 1].render(scale=dpi / 72, grayscale=True).to_pil()
+    finally:
+        pdf.close()
+    render_ms = (time.perf_counter() - start) * 1000
+
+    digest = hashlib.sha256(image.tobytes())
+    digest.update(f"|{image.size}|{dpi}|{lang}|{engine_version}".encode())
+    page_hash = digest.hexdigest()
+
+    cache = OCRCache(cache_dir) if cache_dir else None
+    text = cache.load(page_hash) if cache is not None else None
+    timing = {'render_ms': round(render_ms, 1), 'ocr_ms': 0.0, 'cached': text is not None}
+    if text is not None:
+        return page_num, text, timing
+
+    start = time.perf_counter()
+    try:
+        text = pytesseract.image_to_string(image, lang=lang, timeout=timeout)
+    except RuntimeError as e:
+        # A timeout is a plain RuntimeError; TesseractError (e.g. missing
+        # traineddata) subclasses it and is not a timeout
+        if isinstance(e, pytesseract.TesseractError) or "timeout" not in str(e).lower():
+            raise
+        # Skip the page this time, but cache nothing so a later run retries
+        timing['ocr_ms'] = round((time.perf_counter() - start) * 1000, 1)
+        return page_num, "", dict(timing, error=f"timed out after {timeout}s")
+    timing['ocr_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    if cache is not None:
+        cache.save(page_hash, text)
+    return page_num, text, timing
+
+
+class PageOCR:
+    """Bounded process pool running ocr_page over selected pages"""
+
+    def __init__(self, dpi: int = DEFAULT_DPI, lang: str = DEFAULT_LANG,
+                 workers: int = None, cache_dir: str = None,
+                 page_timeout: float = DEFAULT_PAGE_TIMEOUT):
+        """
+        Args:
+            dpi: Page rendering resolution
+            lang: Tesseract languages
+            workers: Pool size (default: CPU count, at most 4)
+            cache_dir: OCR cache directory (None disables caching)
+            page_timeout: Seconds Tesseract may spend on one page
+        """
+        if not OCR_AVAILABLE:
+            raise RuntimeError("OCR needs pypdfium2 and pytesseract (plus the tesseract binary)")
+        self.dpi = dpi
+        self.lang = lang
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.cache_dir = cache_dir
+        self.page_timeout = page_timeout
+        self.engine_version = tesseract_version()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def version_tag(self) -> str:
+        """Settings that change OCR output (part of the page-text cache key)"""
+        return f"ocr-{self.engine_version}-{self.lang}-{self.dpi}dpi"
+
+    def run(self, pdf_path: str, page_nums: Sequence[int]) -> List[Tuple[int, str, Dict]]:
+        """
+        OCR pages of one PDF
+
+        Args:
+            pdf_path: Path to PDF file
+            page_nums: 1-based page numbers
+
+        Returns:
+            List of (page_number, text, timing) in page order; a page that
+            failed has empty text and an 'error' in its timing
+        """
+        if not page_nums:
+            return []
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        futures = [
+            self._pool.submit(
+                ocr_page, pdf_path, page_num, self.dpi, self.lang,
+                self.engine_version, self.cache_dir, self.page_timeout
+            )
+            for page_num in page_nums
+        ]
+        results = []
+        for page_num, future in zip(page_nums, futures):
+            try:
+                results.append(future.result())
+            except Exception as e:
+                # One bad page (render failure, Tesseract error) must not
+                # abort the document
+                results.append((page_num, "", {
+                    'render_ms': 0.0, 'ocr_ms': 0.0, 'cached': False,
+                    'error': f"{type(e).__name__}: {e}",
+                }))
+        return results
+
+    def close(self) -> None:
+        """Shut the worker pool down"""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
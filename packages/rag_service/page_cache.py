@@ -0,0 +1,87 @@
+"""
+On-disk cache of extracted PDF page text
+
+One gzip-compressed JSON record per (file content hash, extractor,
+extractor version) holds the text of every page. Re-running ingestion with
+different chunking parameters or a different embedding model reuses the
+records instead of parsing the PDFs again; upgrading the extractor or
+changing the file produces a new key.
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+# (page_number, page_text, extractor that produced it)
+Page = Tuple[int, str, str]
+
+CACHE_FORMAT = 2
+
+
+def file_hash(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class PageTextCache:
+    """Extracted page text keyed by file hash and extractor version"""
+
+    def __init__(self, cache_dir: str):
+        """
+        Args:
+            cache_dir: Directory for cache records (created if missing)
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, content_hash: str, extractor: str, version: str) -> Path:
+        """Record location (sharded by hash prefix)"""
+        tag = re.sub(r'[^A-Za-z0-9_.-]', '_', f"{extractor}-{version}")
+        return self.cache_dir / content_hash[:2] / f"{content_hash}.{tag}.json.gz"
+
+    def load(self, content_hash: str, extractor: str,
+             version: str) -> Optional[List[Page]]:
+        """
+        Cached pages for a file
+
+        Returns:
+            List of (page_number, page_text, extractor) tuples, or None on a miss
+        """
+        path = self.path(content_hash, extractor, version)
+        if not path.exists():
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            # Truncated or corrupt record: extract again
+            return None
+        if record.get('format') != CACHE_FORMAT:
+            return None
+        return [tuple(page) for page in record['pages']]
+
+    def save(self, content_hash: str, extractor: str, version: str,
+             pages: List[Page], filename: str = '') -> None:
+        """Write a record atomically (temp file + rename)"""
+        path = self.path(content_hash, extractor, version)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            'format': CACHE_FORMAT,
+            'extractor': extractor,
+            'version': version,
+            'filename': filename,
+            'created_at': datetime.now().isoformat(),
+            'pages': [list(page) for page in pages],
+        }
+        tmp_path = path.with_name(path.name + '.tmp')
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        tmp_path.replace(path)
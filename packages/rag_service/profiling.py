@@ -0,0 +1,145 @@
+"""
+Per-request profiling for /retrieve
+
+An operator can profile a single request (see PROFILING_TOKEN in server.py).
+A profiled request records wall time per stage and, optionally, samples the
+Python stack of the thread running the search every millisecond. The samples
+are returned in collapsed-stack format, one "frame;frame;frame count" line
+per distinct stack, which flamegraph.pl and speedscope read directly.
+
+Requests that are not profiled get NO_PROFILE, whose hooks are shared no-op
+context managers.
+"""
+
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Optional
+
+DEFAULT_SAMPLE_INTERVAL = 0.001
+# Upper bound on samples kept for one request
+MAX_SAMPLES = 20000
+
+_NULL_CONTEXT = nullcontext()
+
+
+class SamplingProfiler:
+    """Samples one thread's Python stack at a fixed interval"""
+
+    def __init__(self, thread_id: int, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """
+        Args:
+            thread_id: threading.get_ident() of the thread to sample
+            interval: Seconds between samples
+        """
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval) and self.samples < MAX_SAMPLES:
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """Samples in collapsed-stack (flame graph) format"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+class RequestProfile:
+    """Stage timings (and optional stack samples) of one request"""
+
+    def __init__(self, collapsed: bool = False, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """
+        Args:
+            collapsed: Sample stacks and include a flame-graph dump
+            interval: Seconds between stack samples
+        """
+        self.collapsed = collapsed
+        self.interval = interval
+        self.stages_ms: Dict[str, float] = {}
+        self.profiler: Optional[SamplingProfiler] = None
+        self._open: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block; repeated stages (e.g. one search per collection) add up"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def add(self, name: str, ms: float) -> None:
+        self.stages_ms[name] = self.stages_ms.get(name, 0.0) + ms
+
+    def begin(self, name: str) -> None:
+        """Start a stage that ends elsewhere (e.g. in another thread)"""
+        self._open[name] = time.perf_counter()
+
+    def end(self, name: str) -> None:
+        start = self._open.pop(name, None)
+        if start is not None:
+            self.add(name, (time.perf_counter() - start) * 1000)
+
+    def sampling(self):
+        """Sample the calling thread's stack while the block runs (if requested)"""
+        if not self.collapsed:
+            return _NULL_CONTEXT
+        self.profiler = SamplingProfiler(threading.get_ident(), self.interval)
+        return self.profiler
+
+    def report(self) -> Dict[str, Any]:
+        """Stage breakdown, plus the collapsed stacks when sampled"""
+        report: Dict[str, Any] = {
+            'stages_ms': {name: round(ms, 3) for name, ms in self.stages_ms.items()},
+            'total_ms': round(sum(self.stages_ms.values()), 3),
+        }
+        if self.profiler is not None:
+            report['samples'] = self.profiler.samples
+            report['sample_interval_ms'] = self.interval * 1000
+            report['collapsed'] = self.profiler.collapsed()
+        return report
+
+
+class _NoProfile:
+    """Stand-in for unprofiled requests: every hook is a shared no-op"""
+
+    def stage(self, name: str):
+        return _NULL_CONTEXT
+
+    def add(self, name: str, ms: float) -> None:
+        pass
+
+    def begin(self, name: str) -> None:
+        pass
+
+    def end(self, name: str) -> None:
+        pass
+
+    def sampling(self):
+        return _NULL_CONTEXT
+
+
+NO_PROFILE = _NoProfile()
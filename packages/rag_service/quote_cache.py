@@ -0,0 +1,194 @@
+"""
+Thread-safe quote cache for the stock price service
+
+Bounded LRU cache with per-key TTLs, single-flight request coalescing and
+stale-while-revalidate:
+
+    fresh  (age < ttl)               -> served from memory
+    stale  (ttl <= age < ttl + grace) -> served from memory, refreshed in
+                                         the background
+    expired / missing                 -> fetched synchronously; concurrent
+                                         callers for the same key wait on
+                                         one upstream call
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, Optional
+
+
+class _Entry:
+    """Cached value with its freshness deadlines (monotonic seconds)"""
+    __slots__ = ('value', 'fetched_at', 'expires_at', 'stale_until')
+
+    def __init__(self, value: Any, fetched_at: float, ttl: float, stale_ttl: float):
+        self.value = value
+        self.fetched_at = fetched_at
+        self.expires_at = fetched_at + ttl
+        self.stale_until = self.expires_at + stale_ttl
+
+
+class QuoteCache:
+    """Bounded LRU/TTL cache with single-flight and stale-while-revalidate"""
+
+    def __init__(self,
+                 max_entries: int = 512,
+                 ttl: Callable[[str], float] = lambda key: 300.0,
+                 stale_ttl: float = 3600.0,
+                 executor: Optional[Executor] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            max_entries: Maximum number of cached keys (LRU eviction)
+            ttl: Function giving the fresh lifetime in seconds for a key
+            stale_ttl: How long past its TTL an entry may still be served
+                while it is refreshed in the background (0 disables)
+            executor: Executor for background refreshes (None disables them)
+            clock: Monotonic time source (overridable in tests)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.executor = executor
+        self.clock = clock
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'refreshes': 0,
+            'evictions': 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def put(self, key: str, value: Any) -> None:
+        """Store a freshly fetched value"""
+        entry = _Entry(value, self.clock(), self.ttl(key), self.stale_ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get(self, key: str, fetch: Optional[Callable[[], Any]] = None) -> Optional[Any]:
+        """
+        Return a fresh or stale value without blocking on upstream
+
+        Args:
+            key: Cache key
+            fetch: If given, stale entries are refreshed in the background
+
+        Returns:
+            Cached value, or None if missing/expired
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                return None
+            if self.clock() >= entry.expires_at:
+                self.stats['stale_hits'] += 1
+                if fetch is not None:
+                    self._refresh_in_background(key, fetch)
+            else:
+                self.stats['hits'] += 1
+            return entry.value
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any]) -> Any:
+        """
+        Return cached value, fetching it (once per key) if missing or expired
+
+        Args:
+            key: Cache key
+            fetch: Zero-argument function that fetches the value upstream
+
+        Returns:
+            Cached or freshly fetched value (fetch errors are re-raised)
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is not None:
+                if self.clock() < entry.expires_at:
+                    self.stats['hits'] += 1
+                else:
+                    self.stats['stale_hits'] += 1
+                    self._refresh_in_background(key, fetch)
+                return entry.value
+
+            flight = self._inflight.get(key)
+            if flight is not None:
+                self.stats['coalesced'] += 1
+                leader = False
+            else:
+                self.stats['misses'] += 1
+                flight = self._inflight[key] = Future()
+                leader = True
+
+        if not leader:
+            return flight.result()
+        return self._run_fetch(key, fetch, flight)
+
+    def time_to_expiry(self, key: str) -> Optional[float]:
+        """
+        Seconds until key stops being fresh (negative once stale)
+
+        Returns:
+            Remaining fresh lifetime, or None if the key is not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            return entry.expires_at - self.clock()
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        """Find a servable entry (caller holds the lock)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if self.clock() >= entry.stale_until:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _refresh_in_background(self, key: str, fetch: Callable[[], Any]) -> None:
+        """Start a single background refresh for key (caller holds the lock)"""
+        if self.executor is None or key in self._inflight:
+            return
+        flight = self._inflight[key] = Future()
+        self.stats['refreshes'] += 1
+        self.executor.submit(self._run_fetch, key, fetch, flight)
+
+    def _run_fetch(self, key: str, fetch: Callable[[], Any], flight: Future) -> Any:
+        """Fetch, store and publish the result to coalesced waiters"""
+        try:
+            value = fetch()
+        except BaseException as e:
+            flight.set_exception(e)
+            raise
+        else:
+            self.put(key, value)
+            flight.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
@@ -0,0 +1,262 @@
+"""
+Server-push quote streaming for the stock service
+
+One poll loop checks each subscribed symbol once per interval, no matter
+how many clients watch it, and fans the result out to every subscriber.
+Quotes still fresh in the service cache (kept warm by the prefetcher) are
+published from memory; only symbols about to expire go upstream.
+Each subscriber holds at most one pending update per symbol: if a client
+reads slower than quotes arrive, older updates are replaced (coalesced)
+rather than queued, so a slow consumer never grows memory or delays others.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set
+
+from stock_service import StockPriceService, is_market_open
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteSubscription:
+    """One client's view of the stream (latest pending quote per symbol)"""
+
+    def __init__(self, broadcaster: 'QuoteBroadcaster'):
+        self.broadcaster = broadcaster
+        self.symbols: Dict[str, str] = {}  # normalized symbol -> requested symbol
+        self._pending: Dict[str, Dict] = {}
+        self._event = asyncio.Event()
+        self.closed = False
+        self.delivered = 0
+        self.coalesced = 0
+
+    def push(self, normalized_symbol: str, quote: Dict) -> None:
+        """Queue an update, replacing any undelivered one for the same symbol"""
+        if normalized_symbol in self._pending:
+            self.coalesced += 1
+        self._pending[normalized_symbol] = quote
+        self._event.set()
+
+    async def get(self, timeout: Optional[float] = None) -> List[Dict]:
+        """
+        Wait for pending updates and take them all
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            List of quotes (empty on timeout or when closed)
+        """
+        if not self._pending and not self.closed:
+            try:
+                await asyncio.wait_for(self._event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        self._event.clear()
+        updates = []
+        for normalized_symbol, quote in self._pending.items():
+            requested = self.symbols.get(normalized_symbol)
+            if requested is not None:
+                updates.append({**quote, 'symbol': requested})
+        self._pending.clear()
+        self.delivered += len(updates)
+        return updates
+
+    def subscribe(self, symbols: Iterable[str]) -> None:
+        """Add symbols to this subscription"""
+        self.broadcaster.subscribe(self, symbols)
+
+    def unsubscribe(self, symbols: Iterable[str]) -> None:
+        """Remove symbols from this subscription"""
+        self.broadcaster.unsubscribe(self, symbols)
+
+    def close(self) -> None:
+        """Detach from the broadcaster and wake any waiting reader"""
+        if not self.closed:
+            self.broadcaster.unsubscribe(self, list(self.symbols.values()))
+            self.closed = True
+            self._event.set()
+
+
+class QuoteBroadcaster:
+    """
+    Polls subscribed symbols once per interval and fans quotes out
+
+    A symbol is fetched upstream only when its cached quote is missing or
+    expires before the next poll; refreshed quotes are written to the
+    service cache, so REST lookups for streamed symbols are served from
+    memory.
+    """
+
+    def __init__(self, service: StockPriceService,
+                 interval: float = 5.0,
+                 closed_interval: float = 60.0,
+                 max_symbols: int = 200):
+        """
+        Args:
+            service: Stock service used for upstream fetches
+            interval: Seconds between polls during market hours
+            closed_interval: Seconds between polls when the market is closed
+            max_symbols: Cap on distinct symbols streamed at once
+        """
+        self.service = service
+        self.interval = interval
+        self.closed_interval = closed_interval
+        self.max_symbols = max_symbols
+        self.latest: Dict[str, Dict] = {}
+        self._subscribers: Dict[str, Set[QuoteSubscription]] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'polls': 0,
+            'fetched': 0,
+            'cached': 0,
+            'errors': 0,
+            'pushed': 0,
+        }
+
+    @property
+    def symbols(self) -> List[str]:
+        """Symbols with at least one subscriber"""
+        return list(self._subscribers)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len({sub for subs in self._subscribers.values() for sub in subs})
+
+    def open(self, symbols: Iterable[str] = ()) -> QuoteSubscription:
+        """Create a subscription (starts the poll loop if needed)"""
+        subscription = QuoteSubscription(self)
+        self.subscribe(subscription, symbols)
+        self.start()
+        return subscription
+
+    def subscribe(self, subscription: QuoteSubscription, symbols: Iterable[str]) -> None:
+        """
+        Add symbols to a subscription
+
+        Last known quotes are pushed immediately; new symbols are polled
+        right away instead of waiting for the next cycle.
+
+        Raises:
+            ValueError: If the distinct symbol cap would be exceeded
+        """
+        new_symbols = False
+        for symbol in symbols:
+            symbol = symbol.strip().upper()
+            if not symbol:
+                continue
+            normalized = self.service.normalize_symbol(symbol)
+            if normalized not in self._subscribers and len(self._subscribers) >= self.max_symbols:
+                raise ValueError(f"Too many streamed symbols (max {self.max_symbols})")
+            subscription.symbols[normalized] = symbol
+            subscribers = self._subscribers.setdefault(normalized, set())
+            new_symbols = new_symbols or not subscribers
+            subscribers.add(subscription)
+            if normalized in self.latest:
+                subscription.push(normalized, self.latest[normalized])
+        if new_symbols:
+            self._wakeup.set()
+
+    def unsubscribe(self, subscription: QuoteSubscription, symbols: Iterable[str]) -> None:
+        """Remove symbols from a subscription (symbols nobody watches stop polling)"""
+        for symbol in symbols:
+            normalized = self.service.normalize_symbol(symbol.strip().upper())
+            subscription.symbols.pop(normalized, None)
+            subscribers = self._subscribers.get(normalized)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[normalized]
+                    self.latest.pop(normalized, None)
+
+    def publish(self, normalized_symbol: str, quote: Dict) -> int:
+        """
+        Fan a quote out to the symbol's subscribers if it changed
+
+        Returns:
+            Number of subscribers notified
+        """
+        previous = self.latest.get(normalized_symbol)
+        self.latest[normalized_symbol] = quote
+        if previous is not None and previous.get('current_price') == quote.get('current_price'):
+            return 0
+        subscribers = list(self._subscribers.get(normalized_symbol, ()))
+        for subscription in subscribers:
+            subscription.push(normalized_symbol, quote)
+        self.stats['pushed'] += len(subscribers)
+        return len(subscribers)
+
+    async def poll_once(self) -> int:
+        """
+        Publish every subscribed symbol once, refreshing those about to expire
+
+        Returns:
+            Number of symbols fetched upstream
+        """
+        loop = asyncio.get_running_loop()
+        due = []
+        for symbol in list(self._subscribers):
+            remaining = self.service.seconds_until_stale(symbol)
+            cached = self.service.cache.get(symbol) if remaining is not None else None
+            if cached is None or remaining <= self.interval:
+                due.append(symbol)
+            else:
+                self.stats['cached'] += 1
+                self.publish(symbol, {**cached, 'streamed_at': datetime.now().isoformat()})
+
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self.service._executor, self.service.refresh_quote, symbol)
+            for symbol in due
+        ], return_exceptions=True)
+
+        fetched = 0
+        for symbol, result in zip(due, results):
+            if isinstance(result, Exception):
+                self.stats['errors'] += 1
+                logger.warning(f"Stream refresh failed for {symbol}: {result}")
+                continue
+            fetched += 1
+            if symbol in self._subscribers:
+                self.publish(symbol, {**result, 'streamed_at': datetime.now().isoformat()})
+
+        self.stats['polls'] += 1
+        self.stats['fetched'] += fetched
+        return fetched
+
+    async def run(self):
+        """Poll loop (runs until cancelled)"""
+        while True:
+            self._wakeup.clear()
+            if self._subscribers:
+                try:
+                    await self.poll_once()
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Stream poll failed: {e}")
+            delay = self.interval if is_market_open() else self.closed_interval
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        """Start the poll loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+
+    async def stop(self):
+        """Cancel the poll loop and release waiting subscribers"""
+        for subscribers in list(self._subscribers.values()):
+            for subscription in list(subscribers):
+                subscription.close()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,123 @@
+"""
+Semantic query cache for /retrieve
+
+Keeps the embeddings of recent queries in a small matrix next to their
+search results. A new query whose embedding is close enough (cosine
+similarity >= min_similarity) to a cached one, searched with the same
+parameters, reuses that result list instead of searching the index.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import numpy as np
+
+
+class SemanticCache:
+    """Bounded LRU cache keyed by query embedding similarity"""
+
+    def __init__(self, dim: int, max_entries: int = 256, min_similarity: float = 0.95):
+        """
+        Args:
+            dim: Embedding dimension
+            max_entries: Maximum number of cached queries (LRU eviction)
+            min_similarity: Cosine similarity needed to reuse a cached result
+        """
+        self.dim = dim
+        self.max_entries = max_entries
+        self.min_similarity = min_similarity
+        self._embeddings = np.zeros((max_entries, dim), dtype=np.float32)
+        self._params: list = [None] * max_entries
+        self._values: list = [None] * max_entries
+        self._lru: "OrderedDict[int, None]" = OrderedDict()  # used slots, oldest first
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'saved_ms': 0.0,
+        }
+        self._search_ms_total = 0.0
+        self._searches = 0
+
+    def __len__(self) -> int:
+        return len(self._lru)
+
+    def lookup(self, embedding: np.ndarray, params: Hashable) -> Optional[Any]:
+        """
+        Find a cached result for a similar query
+
+        Args:
+            embedding: L2-normalized query embedding (dim,) or (1, dim)
+            params: Search parameters the result depends on (must match exactly)
+
+        Returns:
+            Cached value, or None on a miss
+        """
+        query = embedding.reshape(-1)
+        with self._lock:
+            if self._lru:
+                slots = np.fromiter(self._lru, dtype=np.int64, count=len(self._lru))
+                similarities = self._embeddings[slots] @ query
+                for i in np.argsort(-similarities):
+                    if similarities[i] < self.min_similarity:
+                        break
+                    slot = int(slots[i])
+                    if self._params[slot] == params:
+                        self._lru.move_to_end(slot)
+                        self.stats['hits'] += 1
+                        self.stats['saved_ms'] += self.average_search_ms
+                        return self._values[slot]
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, embedding: np.ndarray, params: Hashable, value: Any,
+              search_ms: float = 0.0) -> None:
+        """
+        Cache the result of a search
+
+        Args:
+            embedding: L2-normalized query embedding
+            params: Search parameters the result depends on
+            value: Result to reuse
+            search_ms: Time the search took (for saved-time estimates)
+        """
+        with self._lock:
+            self._search_ms_total += search_ms
+            self._searches += 1
+            if len(self._lru) < self.max_entries:
+                slot = len(self._lru)
+            else:
+                slot, _ = self._lru.popitem(last=False)
+                self.stats['evictions'] += 1
+            self._embeddings[slot] = embedding.reshape(-1)
+            self._params[slot] = params
+            self._values[slot] = value
+            self._lru[slot] = None
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after the index is reloaded)"""
+        with self._lock:
+            self._lru.clear()
+            self._params = [None] * self.max_entries
+            self._values = [None] * self.max_entries
+
+    @property
+    def average_search_ms(self) -> float:
+        """Mean duration of the searches that were cached"""
+        return self._search_ms_total / self._searches if self._searches else 0.0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Hit rate and saved search time"""
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            'entries': len(self._lru),
+            'max_entries': self.max_entries,
+            'min_similarity': self.min_similarity,
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'evictions': self.stats['evictions'],
+            'hit_rate': round(self.stats['hits'] / lookups, 4) if lookups else 0.0,
+            'saved_ms': round(self.stats['saved_ms'], 2),
+        }
@@ -8,7 +8,10 @@ Loads FAISS index and metadata on startup for fast retrieval.
 Endpoints:
     POST /retrieve - Semantic search with query text
     GET /status - Health check and service info
+    GET /chunks/{id}, POST /chunks - Fetch stored chunks by id
+    GET /collections - Named collections and their memory use
     POST /transcribe - (Optional) Whisper STT endpoint
+    POST /transcribe/stream - (Optional) Streaming Whisper STT (SSE)
 
 Example curl:
     curl -X POST http://localhost:8000/retrieve \
@@ -19,37 +22,59 @@ Author: Shankh.ai Team
 """
 
 import os
-import pickle
+import hmac
+import json
+import time
+import asyncio
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Literal, Optional, Dict, Any
 from datetime import datetime
 
 import numpy as np
 import faiss
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel, Field
 from pydantic_settings import BaseSettings
+import torch
 from sentence_transformers import SentenceTransformer
+from sentence_transformers.util import batch_to_device
 from dotenv import load_dotenv
 
-# Optional: Whisper for local STT
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
+# Priority classes, weighted dispatch and load shedding for /retrieve
+from admission import PRIORITIES, AdmissionController, AdmissionRejected
+# Operator-only per-request profiling (stage breakdown, stack samples)
+from profiling import NO_PROFILE, RequestProfile
+# Diverse hit selection (maximal marginal relevance, per-document cap)
+from mmr import mmr_select
+# Named collections (lazy loading, LRU eviction), shared encoder
+from collection_manager import Collection, CollectionManager
+# Language detection (script histogram, optional langdetect fallback)
+from lang_detect import detect_language, LANGDETECT_AVAILABLE
+
+# Local STT (optional Whisper engines), in-memory decoding, VAD windowing
+from stt_service import (
+    EnginePool,
+    available_backends,
+    decode_audio,
+    default_pool_size,
+    iter_transcription,
+    SAMPLE_RATE,
+)
 
-# Optional: Language detection
+# Faster JSON encoding for the hot endpoints (optional)
 try:
-    from langdetect import detect, LangDetectException
-    LANGDETECT_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    LANGDETECT_AVAILABLE = False
+    ORJSON_AVAILABLE = False
 
 # Stock service
 try:
-    from stock_service import StockPriceService
+    from stock_service import MarketDataPrefetcher, StockPriceService, YFinanceSource
+    from quote_stream import QuoteBroadcaster
     STOCK_SERVICE_AVAILABLE = True
 except ImportError:
     STOCK_SERVICE_AVAILABLE = False
@@ -67,7 +92,60 @@ class Settings(BaseSettings):
         env="EMBEDDING_MODEL"
     )
     index_path: str = Field(default="./index", env="INDEX_PATH")
+    # Named collections: the index at INDEX_PATH is DEFAULT_COLLECTION; every
+    # subdirectory of COLLECTIONS_DIR holding an index is another collection
+    default_collection: str = Field(default="default", env="DEFAULT_COLLECTION")
+    collections_dir: str = Field(default="", env="COLLECTIONS_DIR")
+    # Memory budget for loaded collections in MB (0 = unlimited); least
+    # recently used collections are unloaded, the default one never
+    collection_memory_mb: int = Field(default=0, env="COLLECTION_MEMORY_MB")
     whisper_model: str = Field(default="base", env="WHISPER_MODEL")
+    # STT engine: "openai-whisper" or "faster-whisper" (CTranslate2, int8)
+    stt_backend: str = Field(default="openai-whisper", env="STT_BACKEND")
+    # Number of engine instances (0 = sized to CPU cores)
+    stt_pool_size: int = Field(default=0, env="STT_POOL_SIZE")
+    stt_compute_type: str = Field(default="int8", env="STT_COMPUTE_TYPE")
+    stt_cpu_threads: int = Field(default=0, env="STT_CPU_THREADS")
+    # Load STT engines in the background at startup instead of on first use
+    stt_preload: bool = Field(default=False, env="STT_PRELOAD")
+    # Stock data upstream limits
+    stock_max_concurrency: int = Field(default=4, env="STOCK_MAX_CONCURRENCY")
+    stock_connect_timeout: float = Field(default=3.0, env="STOCK_CONNECT_TIMEOUT")
+    stock_read_timeout: float = Field(default=5.0, env="STOCK_READ_TIMEOUT")
+    # Background refresh of a watchlist of quotes (comma-separated symbols;
+    # empty = indices + common stocks)
+    stock_prefetch: bool = Field(default=True, env="STOCK_PREFETCH")
+    stock_watchlist: str = Field(default="", env="STOCK_WATCHLIST")
+    stock_prefetch_interval: float = Field(default=15.0, env="STOCK_PREFETCH_INTERVAL")
+    stock_prefetch_rpm: int = Field(default=60, env="STOCK_PREFETCH_RPM")
+    # Semantic query cache for /retrieve (0 disables)
+    semantic_cache_size: int = Field(default=256, env="SEMANTIC_CACHE_SIZE")
+    semantic_cache_min_similarity: float = Field(default=0.95, env="SEMANTIC_CACHE_MIN_SIMILARITY")
+    # Two-stage search when an index has a coarse index (ingest --coarse-dim):
+    # candidates taken from the reduced-dimension pass before exact re-ranking
+    cascade_search: bool = Field(default=True, env="CASCADE_SEARCH")
+    cascade_pool: int = Field(default=100, env="CASCADE_POOL")
+    # Candidates per requested hit when /retrieve diversifies or caps hits
+    # per document (request fetch_k overrides)
+    mmr_fetch_factor: int = Field(default=4, env="MMR_FETCH_FACTOR")
+    # /retrieve admission: concurrent encode + search workers, dispatch
+    # weights per priority class, queue bound per class, and the queueing
+    # delay above which bulk requests are shed
+    retrieve_workers: int = Field(default=2, env="RETRIEVE_WORKERS")
+    retrieve_interactive_weight: int = Field(default=4, env="RETRIEVE_INTERACTIVE_WEIGHT")
+    retrieve_bulk_weight: int = Field(default=1, env="RETRIEVE_BULK_WEIGHT")
+    retrieve_max_queue: int = Field(default=100, env="RETRIEVE_MAX_QUEUE")
+    retrieve_queue_target_ms: float = Field(default=250.0, env="RETRIEVE_QUEUE_TARGET_MS")
+    # Operator-only profiling: /retrieve requests carrying X-Profile: <token>
+    # (or ?profile=<token>) return a stage breakdown; empty disables it
+    profiling_token: str = Field(default="", env="PROFILING_TOKEN")
+    # Streaming quotes: seconds between upstream polls per subscribed symbol
+    stock_stream_interval: float = Field(default=5.0, env="STOCK_STREAM_INTERVAL")
+    stock_stream_max_symbols: int = Field(default=200, env="STOCK_STREAM_MAX_SYMBOLS")
+    # Instrument master CSVs for /stock/search (comma-separated)
+    stock_instrument_files: str = Field(default="./data/instruments.csv", env="STOCK_INSTRUMENT_FILES")
+    # On-disk OHLCV cache for /stock/history (empty disables it)
+    stock_history_cache_dir: str = Field(default="./cache/history", env="STOCK_HISTORY_CACHE_DIR")
     host: str = Field(default="0.0.0.0", env="HOST")
     port: int = Field(default=8000, env="PORT")
     
@@ -79,6 +157,13 @@ settings = Settings()
 
 
 # Request/Response Models
+# Fields a /retrieve result can carry, and the stored chunk fields
+ResultField = Literal["chunk_id", "filename", "page_num", "text", "excerpt",
+                      "score", "char_start", "char_end", "context", "collection"]
+ChunkField = Literal["chunk_id", "filename", "page_num", "text", "excerpt",
+                     "char_start", "char_end", "language"]
+
+
 class RetrievalRequest(BaseModel):
     """Request schema for /retrieve endpoint"""
     query: str = Field(..., description="Search query text", min_length=1)
@@ -93,6 +178,82 @@ class RetrievalRequest(BaseModel):
         ge=0.0,
         le=1.0
     )
+    language_filter: bool = Field(
+        default=False,
+        description="Only return chunks in the hinted/detected query language"
+    )
+    adaptive: bool = Field(
+        default=False,
+        description="Treat k as an upper bound and return only hits close to the best one"
+    )
+    score_gap: float = Field(
+        default=0.15,
+        description="Adaptive mode: drop hits scoring more than this fraction below the top hit",
+        ge=0.0,
+        le=1.0
+    )
+    min_top_score: Optional[float] = Field(
+        default=None,
+        description="Adaptive mode: return nothing when the best hit scores below this",
+        ge=0.0,
+        le=1.0
+    )
+    fields: Optional[List[ResultField]] = Field(
+        default=None,
+        description="Only include these result fields (e.g. ['chunk_id', 'score'])"
+    )
+    window: int = Field(
+        default=0,
+        description="Add a 'context' field stitching this many neighbouring chunks on each side",
+        ge=0,
+        le=5
+    )
+    window_scope: Literal["document", "page"] = Field(
+        default="document",
+        description="Do not extend the context window past this boundary"
+    )
+    use_cache: bool = Field(
+        default=True,
+        description="Allow reusing the hits of a near-identical recent query"
+    )
+    diversify: bool = Field(
+        default=False,
+        description="Pick hits by maximal marginal relevance, skipping near-duplicates of earlier hits"
+    )
+    mmr_lambda: float = Field(
+        default=0.7,
+        description="Diversify: weight of relevance against novelty (1 = plain top-k)",
+        ge=0.0,
+        le=1.0
+    )
+    max_per_document: Optional[int] = Field(
+        default=None,
+        description="At most this many hits from one document",
+        ge=1
+    )
+    fetch_k: Optional[int] = Field(
+        default=None,
+        description="Diversify / max_per_document: candidates to choose from "
+                    "(default: MMR_FETCH_FACTOR x k)",
+        ge=1,
+        le=200
+    )
+    collections: Optional[List[str]] = Field(
+        default=None,
+        description="Collections to search, hits merged by score (default: the default collection)",
+        min_length=1,
+        max_length=8
+    )
+    priority: Optional[Literal["interactive", "bulk"]] = Field(
+        default=None,
+        description="Scheduling class (default: X-Priority header, else interactive)"
+    )
+    timeout_ms: Optional[int] = Field(
+        default=None,
+        description="Client timeout; the request is dropped if it cannot start in time "
+                    "(default: X-Timeout-Ms header)",
+        ge=1
+    )
 
 
 class DocumentResult(BaseModel):
@@ -105,6 +266,30 @@ class DocumentResult(BaseModel):
     score: float = Field(description="Similarity score (higher = more relevant)")
     char_start: int
     char_end: int
+    context: Optional[str] = Field(
+        default=None,
+        description="Hit plus neighbouring chunks, overlap removed (window > 0)"
+    )
+    collection: Optional[str] = Field(
+        default=None,
+        description="Collection the chunk belongs to (when collections are requested)"
+    )
+
+
+RESULT_FIELDS = tuple(f for f in DocumentResult.model_fields if f not in ("context", "collection"))
+
+
+class ChunksRequest(BaseModel):
+    """Request schema for bulk chunk fetch"""
+    ids: List[int] = Field(..., description="Chunk ids", min_length=1, max_length=500)
+    collection: Optional[str] = Field(
+        default=None,
+        description="Collection the ids belong to (default: the default collection)"
+    )
+    fields: Optional[List[ChunkField]] = Field(
+        default=None,
+        description="Only include these chunk fields (default: all)"
+    )
 
 
 class RetrievalResponse(BaseModel):
@@ -114,6 +299,10 @@ class RetrievalResponse(BaseModel):
     num_results: int
     detected_language: Optional[str] = None
     processing_time_ms: float
+    profile: Optional[Dict[str, Any]] = Field(
+        default=None,
+        description="Stage breakdown (operator profiling only)"
+    )
 
 
 class StatusResponse(BaseModel):
@@ -125,8 +314,16 @@ class StatusResponse(BaseModel):
     index_loaded: bool
     num_chunks: int
     whisper_available: bool
+    stt_backend: Optional[str] = None
+    stt_pool_size: int = 0
     langdetect_available: bool
     uptime_seconds: float
+    components: Dict[str, str] = {}
+    load_times_seconds: Dict[str, float] = {}
+    cold_start_seconds: Optional[float] = None
+    semantic_cache: Optional[Dict[str, Any]] = None
+    collections: Optional[Dict[str, Any]] = None
+    admission: Optional[Dict[str, Any]] = None
 
 
 class TranscriptionResponse(BaseModel):
@@ -141,11 +338,30 @@ class TranscriptionResponse(BaseModel):
 class ServerState:
     """Global server state"""
     def __init__(self):
-        self.index: Optional[faiss.Index] = None
-        self.metadata: Optional[Dict] = None
+        # Indexes by collection name; all share the one encoder below
+        self.collections: Optional[CollectionManager] = None
         self.model: Optional[SentenceTransformer] = None
-        self.whisper_model: Optional[Any] = None
+        self.admission: Optional[AdmissionController] = None
+        self.stt_pool: Optional[EnginePool] = None
+        self.stt_lock = asyncio.Lock()
+        self.stock_service: Optional[Any] = None
+        self.prefetcher: Optional[Any] = None
+        self.broadcaster: Optional[Any] = None
+        # Background startup loads by name (referenced so they are not
+        # garbage-collected mid-run)
+        self.background_tasks: Dict[str, asyncio.Task] = {}
+        # Component -> not_loaded | loading | ready | unavailable | failed
+        self.components: Dict[str, str] = {
+            "encoder": "not_loaded",
+            "index": "not_loaded",
+            "stt": "not_loaded" if settings.stt_backend in available_backends() else "unavailable",
+            "stock": "not_loaded" if STOCK_SERVICE_AVAILABLE else "unavailable",
+            "instruments": "not_loaded" if STOCK_SERVICE_AVAILABLE else "unavailable",
+        }
+        self.load_times: Dict[str, float] = {}
+        self.cold_start_seconds: Optional[float] = None
         self.start_time: datetime = datetime.now()
+        # Retrieval is ready once encoder and index are loaded
         self.ready: bool = False
 
 
@@ -170,39 +386,78 @@ app.add_middleware(
 
 
 def load_index_and_metadata():
-    """Load FAISS index and metadata on startup"""
-    index_dir = Path(settings.index_path)
-    
-    if not index_dir.exists():
-        raise RuntimeError(
-            f"Index directory not found: {index_dir}\n"
-            f"Run 'python ingest.py' first to create the index."
-        )
-    
-    # Load FAISS index
-    index_file = index_dir / "faiss_index.bin"
-    if not index_file.exists():
-        raise RuntimeError(f"FAISS index file not found: {index_file}")
+    """Register the collections and load the default one on startup"""
+    paths = CollectionManager.discover(settings.collections_dir) if settings.collections_dir else {}
+    paths[settings.default_collection] = settings.index_path
+    state.collections = CollectionManager(
+        paths,
+        memory_budget_bytes=settings.collection_memory_mb * 2**20,
+        pinned=[settings.default_collection],
+        embedding_model=settings.embedding_model,
+    )
+    state.collections.get(settings.default_collection)
+    if len(paths) > 1:
+        print(f"✓ Collections: {', '.join(paths)} (others load on first use)")
+
+
+def default_collection() -> Optional[Collection]:
+    """Default collection if it is loaded"""
+    if state.collections is None:
+        return None
+    return state.collections.peek(settings.default_collection)
+
+
+async def get_collections(names: List[str]) -> List[Collection]:
+    """
+    Requested collections, loading the ones not in memory yet
     
-    print(f"Loading FAISS index from {index_file}...")
-    state.index = faiss.read_index(str(index_file))
-    print(f"✓ Loaded index with {state.index.ntotal} vectors")
+    Raises:
+        HTTPException: 404 for unknown names, 503 when an index cannot be read
+    """
+    if state.collections is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    manager = state.collections
+    unknown = [name for name in names if name not in manager.paths]
+    if unknown:
+        raise HTTPException(status_code=404, detail=f"Unknown collection: {', '.join(unknown)}")
     
-    # Load metadata
-    metadata_file = index_dir / "metadata.pkl"
-    if not metadata_file.exists():
-        raise RuntimeError(f"Metadata file not found: {metadata_file}")
+    async def load(name: str) -> Collection:
+        if manager.is_loaded(name):
+            return manager.get(name)
+        # Reading an index from disk blocks; keep the event loop free
+        return await run_in_threadpool(manager.get, name)
     
-    print(f"Loading metadata from {metadata_file}...")
-    with open(metadata_file, 'rb') as f:
-        state.metadata = pickle.load(f)
-    print(f"✓ Loaded metadata for {len(state.metadata['chunks'])} chunks")
+    try:
+        return list(await asyncio.gather(*(load(name) for name in dict.fromkeys(names))))
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+def json_response(payload: Dict[str, Any]) -> Response:
+    """
+    Serialise a pre-built payload directly
     
-    # Verify embedding model matches
-    stored_model = state.metadata.get('embedding_model')
-    if stored_model and stored_model != settings.embedding_model:
-        print(f"Warning: Index was built with {stored_model}, "
-              f"but configured to use {settings.embedding_model}")
+    Returning a Response skips FastAPI's response_model validation; payloads
+    passed here are built from plain dicts already in the right shape.
+    """
+    if ORJSON_AVAILABLE:
+        return Response(content=orjson.dumps(payload), media_type="application/json")
+    return JSONResponse(payload)
+
+
+def get_admission() -> AdmissionController:
+    """Admission controller for /retrieve (created on first use)"""
+    if state.admission is None:
+        state.admission = AdmissionController(
+            workers=settings.retrieve_workers,
+            weights={
+                "interactive": settings.retrieve_interactive_weight,
+                "bulk": settings.retrieve_bulk_weight,
+            },
+            max_queue=settings.retrieve_max_queue,
+            target_queue_ms=settings.retrieve_queue_target_ms,
+        )
+    return state.admission
 
 
 def load_embedding_model():
@@ -214,17 +469,89 @@ def load_embedding_model():
 
 
 def load_whisper_model():
-    """Load Whisper model for STT (optional)"""
-    if not WHISPER_AVAILABLE:
-        print("Whisper not available - STT endpoint will be disabled")
+    """Load a pool of Whisper STT engines (optional)"""
+    if settings.stt_backend not in available_backends():
+        print(f"STT backend '{settings.stt_backend}' not available - STT endpoints will be disabled")
+        state.components["stt"] = "unavailable"
         return
     
     try:
-        print(f"Loading Whisper model: {settings.whisper_model}...")
-        state.whisper_model = whisper.load_model(settings.whisper_model)
+        pool_size = settings.stt_pool_size or default_pool_size(settings.stt_cpu_threads)
+        print(f"Loading {pool_size} x {settings.stt_backend} model: {settings.whisper_model}...")
+        state.stt_pool = EnginePool(
+            settings.stt_backend,
+            settings.whisper_model,
+            size=pool_size,
+            compute_type=settings.stt_compute_type,
+            cpu_threads=settings.stt_cpu_threads,
+        )
         print(f"✓ Whisper model loaded")
     except Exception as e:
         print(f"Warning: Could not load Whisper model: {e}")
+        state.components["stt"] = "failed"
+
+
+async def load_component(name: str, loader) -> None:
+    """Run a blocking loader in a worker thread, tracking status and timing"""
+    state.components[name] = "loading"
+    start = time.perf_counter()
+    try:
+        await run_in_threadpool(loader)
+    except Exception:
+        state.components[name] = "failed"
+        raise
+    state.load_times[name] = round(time.perf_counter() - start, 2)
+    if state.components[name] == "loading":
+        state.components[name] = "ready"
+
+
+def start_background(name: str, coro) -> asyncio.Task:
+    """Run a startup load in the background, keeping a reference and reporting failures"""
+    task = asyncio.create_task(coro, name=name)
+    state.background_tasks[name] = task
+    
+    def report(done: asyncio.Task) -> None:
+        if not done.cancelled() and done.exception() is not None:
+            print(f"✗ Background load of {name} failed: {done.exception()}")
+    
+    task.add_done_callback(report)
+    return task
+
+
+async def ensure_stt_pool() -> Optional[EnginePool]:
+    """Load the STT engine pool on first use (concurrent callers share one load)"""
+    if state.stt_pool is None and state.components["stt"] in ("not_loaded", "loading"):
+        async with state.stt_lock:
+            if state.stt_pool is None and state.components["stt"] == "not_loaded":
+                await load_component("stt", load_whisper_model)
+    return state.stt_pool
+
+
+def get_stock_service():
+    """Create the stock price service on first use"""
+    if state.stock_service is None and STOCK_SERVICE_AVAILABLE:
+        state.stock_service = StockPriceService(
+            source=YFinanceSource(
+                max_concurrency=settings.stock_max_concurrency,
+                connect_timeout=settings.stock_connect_timeout,
+                read_timeout=settings.stock_read_timeout,
+            ),
+            history_cache_dir=settings.stock_history_cache_dir or None,
+            instrument_files=[p.strip() for p in settings.stock_instrument_files.split(",") if p.strip()],
+        )
+        state.components["stock"] = "ready"
+    return state.stock_service
+
+
+def get_broadcaster():
+    """Create the streaming quote broadcaster on first use"""
+    if state.broadcaster is None:
+        state.broadcaster = QuoteBroadcaster(
+            get_stock_service(),
+            interval=settings.stock_stream_interval,
+            max_symbols=settings.stock_stream_max_symbols,
+        )
+    return state.broadcaster
 
 
 @app.on_event("startup")
@@ -235,13 +562,37 @@ async def startup_event():
     print("=" * 70)
     
     try:
-        load_embedding_model()
-        load_index_and_metadata()
-        load_whisper_model()
+        start = time.perf_counter()
+        
+        # Encoder and index are independent; load them concurrently.
+        # Whisper is loaded lazily on the first /transcribe request unless
+        # STT_PRELOAD is set, and never delays readiness.
+        if settings.stt_preload:
+            start_background("stt", ensure_stt_pool())
+        if settings.stock_prefetch and STOCK_SERVICE_AVAILABLE:
+            watchlist = [s.strip() for s in settings.stock_watchlist.split(",") if s.strip()]
+            state.prefetcher = MarketDataPrefetcher(
+                get_stock_service(),
+                watchlist=watchlist or None,
+                interval=settings.stock_prefetch_interval,
+                max_requests_per_minute=settings.stock_prefetch_rpm,
+            )
+            state.prefetcher.start()
+        if STOCK_SERVICE_AVAILABLE:
+            # Build the symbol search index in the background
+            start_background(
+                "instruments", load_component("instruments", lambda: get_stock_service().instruments)
+            )
+        await asyncio.gather(
+            load_component("encoder", load_embedding_model),
+            load_component("index", load_index_and_metadata),
+        )
         
         state.ready = True
+        state.cold_start_seconds = round(time.perf_counter() - start, 2)
+        timings = ", ".join(f"{name} {secs}s" for name, secs in state.load_times.items())
         print("=" * 70)
-        print("  ✓ RAG Service Ready!")
+        print(f"  ✓ RAG Service Ready in {state.cold_start_seconds}s ({timings})")
         print("=" * 70)
         
     except Exception as e:
@@ -251,6 +602,17 @@ async def startup_event():
         raise
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background tasks"""
+    for task in state.background_tasks.values():
+        task.cancel()
+    if state.prefetcher is not None:
+        await state.prefetcher.stop()
+    if state.broadcaster is not None:
+        await state.broadcaster.stop()
+
+
 @app.get("/", response_model=Dict[str, str])
 async def root():
     """Root endpoint"""
@@ -269,29 +631,77 @@ async def get_status():
     Returns information about the service, loaded index, and capabilities.
     """
     uptime = (datetime.now() - state.start_time).total_seconds()
+    default = default_collection()
     
     return StatusResponse(
         status="ready" if state.ready else "initializing",
         service="RAG Retrieval Service",
         version="1.0.0",
         embedding_model=settings.embedding_model,
-        index_loaded=state.index is not None,
-        num_chunks=len(state.metadata['chunks']) if state.metadata else 0,
-        whisper_available=WHISPER_AVAILABLE and state.whisper_model is not None,
+        index_loaded=default is not None,
+        num_chunks=len(default.chunks) if default is not None else 0,
+        whisper_available=state.components["stt"] in ("not_loaded", "loading", "ready"),
+        stt_backend=state.stt_pool.backend if state.stt_pool else None,
+        stt_pool_size=state.stt_pool.size if state.stt_pool else 0,
         langdetect_available=LANGDETECT_AVAILABLE,
-        uptime_seconds=uptime
+        uptime_seconds=uptime,
+        components=state.components,
+        load_times_seconds=state.load_times,
+        cold_start_seconds=state.cold_start_seconds,
+        semantic_cache=(
+            default.semantic_cache.metrics()
+            if default is not None and default.semantic_cache is not None else None
+        ),
+        collections=state.collections.metrics() if state.collections is not None else None,
+        admission=state.admission.metrics() if state.admission is not None else None
     )
 
 
+@app.get("/collections")
+async def list_collections():
+    """Configured collections, which are loaded, and memory use against the budget"""
+    if state.collections is None:
+        raise HTTPException(status_code=503, detail="Service not ready")
+    metrics = state.collections.metrics()
+    metrics["default"] = settings.default_collection
+    return metrics
+
+
+def result_cutoff(scores: np.ndarray, request: RetrievalRequest) -> int:
+    """
+    Number of leading hits to keep (scores are sorted, best first)
+    
+    Applies the absolute threshold and, in adaptive mode, the minimum top
+    score and the gap relative to the top score, before any result objects
+    are built.
+    """
+    keep = np.ones(len(scores), dtype=bool)
+    if request.threshold is not None:
+        keep &= scores >= request.threshold
+    if request.adaptive and len(scores):
+        top = scores[0]
+        if request.min_top_score is not None and top < request.min_top_score:
+            return 0
+        keep &= scores >= top - request.score_gap * abs(top)
+    # Hits are sorted, so the first rejected one ends the list
+    rejected = np.flatnonzero(~keep)
+    return int(rejected[0]) if len(rejected) else len(scores)
+
+
 @app.post("/retrieve", response_model=RetrievalResponse)
-async def retrieve(request: RetrievalRequest):
+async def retrieve(request: RetrievalRequest, http_request: Request):
     """
     Semantic search endpoint
     
     Performs vector similarity search and returns top-k most relevant document chunks.
+    Encoding and search run in admission-controlled workers: interactive
+    requests are dispatched ahead of bulk ones, bulk requests are refused
+    (503) while the queue is backed up, and requests whose client timeout
+    passes while queued are dropped (504).
     
     Args:
         request: RetrievalRequest with query text and parameters
+        http_request: Raw request (X-Priority / X-Timeout-Ms / X-Profile headers)
         
     Returns:
         RetrievalResponse with ranked results and metadata
@@ -307,63 +717,318 @@ async def retrieve(request: RetrievalRequest):
         raise HTTPException(status_code=503, detail="Service not ready")
     
     start_time = datetime.now()
+    arrived = time.monotonic()
+    priority = request.priority or http_request.headers.get("x-priority", "interactive")
+    if priority not in PRIORITIES:
+        raise HTTPException(status_code=422, detail=f"Unknown priority: {priority}")
+    timeout_ms = request.timeout_ms or http_request.headers.get("x-timeout-ms")
+    try:
+        deadline = arrived + float(timeout_ms) / 1000 if timeout_ms else None
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid X-Timeout-Ms: {timeout_ms}")
     
-    # Detect language (optional)
-    detected_lang = None
-    if LANGDETECT_AVAILABLE:
-        try:
-            detected_lang = detect(request.query)
-        except LangDetectException:
-            pass
+    profile = request_profile(http_request)
     
-    # Generate query embedding
-    query_embedding = state.model.encode([request.query], convert_to_numpy=True)
+    collections = await get_collections(request.collections or [settings.default_collection])
     
-    # Normalize for cosine similarity
-    faiss.normalize_L2(query_embedding)
+    # Detect language (hint first, then script histogram, then langdetect)
+    with profile.stage("language_detection"):
+        detected_lang = detect_language(request.query, request.lang_hint)
     
-    # Search index
-    distances, indices = state.index.search(query_embedding, request.k)
+    # Restrict the search to chunks in the query language if requested
+    if request.language_filter and detected_lang:
+        collections = [c for c in collections if detected_lang in c.language_selectors]
+        if not collections:
+            # No chunks in this language
+            return retrieval_response(request, [], detected_lang, start_time,
+                                      None if profile is NO_PROFILE else profile)
     
-    # Build results
-    results = []
-    for idx, (distance, chunk_idx) in enumerate(zip(distances[0], indices[0])):
-        if chunk_idx == -1:  # FAISS returns -1 for missing results
-            continue
-            
-        chunk_data = state.metadata['chunks'][chunk_idx]
-        score = float(distance)  # Cosine similarity (higher = better)
-        
-        # Apply threshold filter if specified
-        if request.threshold is not None and score < request.threshold:
-            continue
-        
-        result = DocumentResult(
-            chunk_id=chunk_data['chunk_id'],
-            filename=chunk_data['filename'],
-            page_num=chunk_data['page_num'],
-            text=chunk_data['text'],
-            excerpt=chunk_data['excerpt'],
-            score=score,
-            char_start=chunk_data['char_start'],
-            char_end=chunk_data['char_end']
+    try:
+        profile.begin("queue_wait")
+        results = await get_admission().run(
+            priority, run_retrieval, request, collections, detected_lang, profile,
+            deadline=deadline
+        )
+    except AdmissionRejected as e:
+        raise HTTPException(
+            status_code=504 if e.reason == "deadline" else 503,
+            detail=e.detail,
+            headers={"Retry-After": str(int(e.retry_after + 0.5))},
         )
-        results.append(result)
     
-    # Calculate processing time
-    processing_time = (datetime.now() - start_time).total_seconds() * 1000
+    return retrieval_response(request, results, detected_lang, start_time,
+                              None if profile is NO_PROFILE else profile)
+
+
+def request_profile(http_request: Request):
+    """
+    Profile for this request: NO_PROFILE unless an operator asked for one
+    
+    X-Profile / ?profile must carry PROFILING_TOKEN; X-Profile-Dump: collapsed
+    (or ?profile_dump=collapsed) adds stack samples in flame-graph format.
+    """
+    if not settings.profiling_token:
+        return NO_PROFILE
+    token = http_request.headers.get("x-profile") or http_request.query_params.get("profile")
+    if token is None:
+        return NO_PROFILE
+    if not hmac.compare_digest(token.encode(), settings.profiling_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    dump = http_request.headers.get("x-profile-dump") or http_request.query_params.get("profile_dump")
+    return RequestProfile(collapsed=dump == "collapsed")
+
+
+def encode_query(query: str, profile) -> np.ndarray:
+    """
+    Query embedding (1, dim)
+    
+    Profiled requests run tokenisation and the forward pass as separate
+    steps (what SentenceTransformer.encode does for one sentence) to time them.
+    """
+    model = state.model
+    if profile is NO_PROFILE or not hasattr(model, "tokenize"):
+        with profile.stage("encode"):
+            return model.encode([query], convert_to_numpy=True)
+    with profile.stage("tokenisation"):
+        features = batch_to_device(model.tokenize([query]), model.device)
+    with profile.stage("forward_pass"):
+        with torch.no_grad():
+            embedding = model(features)["sentence_embedding"]
+    return embedding.float().cpu().numpy()
+
+
+def run_retrieval(request: RetrievalRequest, collections: List[Collection],
+                  detected_lang: Optional[str], profile=NO_PROFILE) -> List[Dict[str, Any]]:
+    """
+    Encode the query, search the collections and build result dicts
     
-    return RetrievalResponse(
-        query=request.query,
-        results=results,
-        num_results=len(results),
-        detected_language=detected_lang,
-        processing_time_ms=round(processing_time, 2)
+    Blocking; runs in an admission worker thread.
+    """
+    profile.end("queue_wait")
+    with profile.sampling():
+        return _run_retrieval(request, collections, detected_lang, profile)
+
+
+def _run_retrieval(request: RetrievalRequest, collections: List[Collection],
+                   detected_lang: Optional[str], profile) -> List[Dict[str, Any]]:
+    # Generate query embedding (once, shared by all collections)
+    query_embedding = encode_query(request.query, profile)
+    
+    with profile.stage("faiss_search"):
+        # Normalize for cosine similarity
+        faiss.normalize_L2(query_embedding)
+        
+        # Search each collection; one encoder means scores are comparable, so
+        # hits are merged by score
+        k = candidate_count(request)
+        hits = [search_collection(c, query_embedding, request, detected_lang, k) for c in collections]
+        scores = np.concatenate([h[0] for h in hits])
+        positions = np.concatenate([h[1] for h in hits])
+        owners = np.repeat(np.arange(len(hits)), [len(h[0]) for h in hits])
+        if len(hits) > 1:
+            order = np.argsort(-scores, kind="stable")[:k]
+            scores, positions, owners = scores[order], positions[order], owners[order]
+    
+    if request.diversify or request.max_per_document:
+        with profile.stage("mmr"):
+            scores, positions, owners = diversify_hits(
+                request, collections, query_embedding, scores, positions, owners
+            )
+    
+    with profile.stage("metadata_lookup"):
+        return build_results(request, collections, scores, positions, owners)
+
+
+def candidate_count(request: RetrievalRequest) -> int:
+    """Hits to fetch: k, or a larger pool when hits are diversified or capped per document"""
+    if not (request.diversify or request.max_per_document):
+        return request.k
+    return max(request.k, request.fetch_k or min(request.k * settings.mmr_fetch_factor, 200))
+
+
+def diversify_hits(request: RetrievalRequest, collections: List[Collection],
+                   query_embedding: np.ndarray, scores: np.ndarray, positions: np.ndarray,
+                   owners: np.ndarray):
+    """
+    Choose request.k hits from the candidate pool by MMR and the per-document cap
+    
+    The threshold / adaptive cut-off is applied to the pool first; the first
+    pick is always the best hit, so applying it again afterwards keeps
+    every selected hit.
+    
+    Returns:
+        (scores, positions, owners) in selection order
+    """
+    n = result_cutoff(scores, request)
+    scores, positions, owners = scores[:n], positions[:n], owners[:n]
+    
+    vectors = None
+    if request.diversify and n:
+        try:
+            vectors = np.empty((n, query_embedding.shape[1]), dtype=np.float32)
+            for owner in np.unique(owners):
+                mask = owners == owner
+                vectors[mask] = collections[owner].vectors_at(positions[mask])
+        except RuntimeError:
+            # Index type without reconstruction and no embedding store:
+            # only the per-document cap applies
+            vectors = None
+    
+    documents = None
+    if request.max_per_document:
+        documents = np.array([
+            f"{owner}/{collections[owner].chunks[position]['filename']}"
+            for owner, position in zip(owners.tolist(), positions.tolist())
+        ])
+    
+    order = mmr_select(
+        scores, vectors, request.k,
+        lambda_mult=request.mmr_lambda if request.diversify else 1.0,
+        groups=documents, max_per_group=request.max_per_document,
     )
+    return scores[order], positions[order], owners[order]
+
+
+def build_results(request: RetrievalRequest, collections: List[Collection],
+                  scores: np.ndarray, positions: np.ndarray,
+                  owners: np.ndarray) -> List[Dict[str, Any]]:
+    """Apply the cut-off and turn hits into dicts with the requested fields"""
+    n_keep = result_cutoff(scores, request)
+    
+    # Build results as plain dicts with only the requested fields
+    fields = request.fields or (
+        RESULT_FIELDS
+        + (("collection",) if request.collections else ())
+        + (("context",) if request.window else ())
+    )
+    results = []
+    for score, owner, position in zip(scores[:n_keep].tolist(), owners[:n_keep].tolist(),
+                                      positions[:n_keep].tolist()):
+        collection = collections[owner]
+        chunk_data = collection.chunks[position]
+        # Score is the cosine similarity (higher = better)
+        computed = {"score": score, "collection": collection.name}
+        if "context" in fields:
+            computed["context"] = (
+                collection.context(position, request.window, request.window_scope)
+                if request.window else None
+            )
+        results.append({f: computed[f] if f in computed else chunk_data[f] for f in fields})
+    
+    return results
+
+
+def search_collection(collection: Collection, query_embedding: np.ndarray,
+                      request: RetrievalRequest, detected_lang: Optional[str], k: int):
+    """
+    Top-k hits of one collection, reusing the semantic cache when possible
+    
+    Returns:
+        (scores, positions), best first
+    """
+    search_params = collection.search_params(
+        detected_lang if request.language_filter else None
+    )
+    
+    # Reuse the hits of a near-identical recent query when possible
+    cache = collection.get_semantic_cache(
+        settings.semantic_cache_size, settings.semantic_cache_min_similarity
+    ) if request.use_cache else None
+    cache_params = (k, detected_lang if search_params is not None else None)
+    cached = cache.lookup(query_embedding, cache_params) if cache is not None else None
+    rescored = collection.rescore(query_embedding, cached[1]) if cached else None
+    
+    if rescored is not None:
+        return rescored
+    if cached is not None:
+        return cached
+    
+    search_start = time.perf_counter()
+    if (collection.cascade is not None and settings.cascade_search
+            and collection.index.ntotal > settings.cascade_pool):
+        # Reduced-dimension candidate pass, exact re-rank of the pool
+        scores, positions = collection.cascade.search(
+            collection.vectors_at, query_embedding, k,
+            settings.cascade_pool, params=search_params
+        )
+    else:
+        # Search index
+        distances, indices = collection.index.search(
+            query_embedding, k, params=search_params
+        )
+        
+        # FAISS pads with -1 when fewer than k vectors match
+        found = indices[0] != -1
+        scores, positions = distances[0][found], indices[0][found]
+    if cache is not None:
+        cache.store(query_embedding, cache_params, (scores, positions),
+                    search_ms=(time.perf_counter() - search_start) * 1000)
+    return scores, positions
+
+
+def retrieval_response(request: RetrievalRequest, results: List[Dict[str, Any]],
+                       detected_lang: Optional[str], start_time: datetime,
+                       profile: Optional[RequestProfile] = None) -> Response:
+    """Wrap /retrieve results (shape of RetrievalResponse) without re-validation"""
+    processing_time = (datetime.now() - start_time).total_seconds() * 1000
+    payload = {
+        "query": request.query,
+        "results": results,
+        "num_results": len(results),
+        "detected_language": detected_lang,
+        "processing_time_ms": round(processing_time, 2),
+    }
+    if profile is not None:
+        # Time the normal encoding, then send the payload with the profile
+        with profile.stage("serialisation"):
+            json_response(payload)
+        payload["profile"] = profile.report()
+    return json_response(payload)
+
+
+def chunk_fields_payload(collection: Collection, position: int,
+                         fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Stored chunk as a dict with the requested fields"""
+    chunk_data = collection.chunks[position]
+    return {f: chunk_data.get(f) for f in (fields or ChunkField.__args__)}
+
+
+@app.get("/chunks/{chunk_id}")
+async def get_chunk(chunk_id: int, collection: Optional[str] = None):
+    """Fetch one stored chunk by id"""
+    [source] = await get_collections([collection or settings.default_collection])
+    position = source.chunk_positions.get(chunk_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail=f"Chunk not found: {chunk_id}")
+    return json_response(chunk_fields_payload(source, position, None))
+
+
+@app.post("/chunks")
+async def get_chunks(request: ChunksRequest):
+    """
+    Bulk fetch of stored chunks by id
+    
+    Pairs with /retrieve fields=["chunk_id", "score"]: callers rank on ids and
+    only fetch the text they end up using. Unknown ids are listed in "missing".
+    """
+    [source] = await get_collections([request.collection or settings.default_collection])
+    chunks = []
+    missing = []
+    for chunk_id in request.ids:
+        position = source.chunk_positions.get(chunk_id)
+        if position is None:
+            missing.append(chunk_id)
+        else:
+            chunks.append(chunk_fields_payload(source, position, request.fields))
+    return json_response({"chunks": chunks, "missing": missing})
 
 
 @app.post("/transcribe", response_model=TranscriptionResponse)
-async def transcribe_audio(audio: UploadFile = File(...)):
+async def transcribe_audio(
+    audio: UploadFile = File(...),
+    language: Optional[str] = Form(default=None),
+    beam_size: Optional[int] = Form(default=None, ge=1, le=10)
+):
     """
     Transcribe audio using Whisper (optional endpoint)
     
@@ -371,6 +1036,8 @@ async def transcribe_audio(audio: UploadFile = File(...)):
     
     Args:
         audio: Audio file (wav, mp3, etc.)
+        language: Optional language code (e.g. 'hi'), skips detection
+        beam_size: Optional beam width (greedy decoding if omitted)
         
     Returns:
         TranscriptionResponse with text and metadata
@@ -381,25 +1048,20 @@ async def transcribe_audio(audio: UploadFile = File(...)):
           -F "audio=@recording.wav"
         ```
     """
-    if not WHISPER_AVAILABLE or state.whisper_model is None:
+    if await ensure_stt_pool() is None:
         raise HTTPException(
             status_code=501,
             detail="Whisper STT not available. Install with: pip install openai-whisper"
         )
     
     try:
-        # Save uploaded file temporarily
-        import tempfile
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_file:
-            content = await audio.read()
-            temp_file.write(content)
-            temp_path = temp_file.name
-        
-        # Transcribe with Whisper
-        result = state.whisper_model.transcribe(temp_path)
-        
-        # Clean up temp file
-        os.unlink(temp_path)
+        # Decode in memory (no temp file), then transcribe off the event loop
+        content = await audio.read()
+        samples = await run_in_threadpool(decode_audio, content)
+        result = await run_in_threadpool(
+            state.stt_pool.transcribe, samples,
+            language=language, beam_size=beam_size
+        )
         
         # Calculate average confidence from segments
         segments = result.get('segments', [])
@@ -426,6 +1088,81 @@ async def transcribe_audio(audio: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}")
 
 
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format a Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.post("/transcribe/stream")
+async def transcribe_audio_stream(
+    audio: UploadFile = File(...),
+    language: Optional[str] = Form(default=None),
+    beam_size: Optional[int] = Form(default=None, ge=1, le=10)
+):
+    """
+    Streaming transcription using Whisper (Server-Sent Events)
+    
+    Decodes the upload in memory, splits it into speech windows with VAD and
+    emits a `segment` event as soon as each window is transcribed, followed
+    by a final `done` event with the full text.
+    
+    Args:
+        audio: Audio file (wav, mp3, webm, etc.)
+        language: Optional language code (e.g. 'hi'), skips detection
+        beam_size: Optional beam width (greedy decoding if omitted)
+        
+    Example:
+        ```bash
+        curl -N -X POST http://localhost:8000/transcribe/stream \
+          -F "audio=@voice_note.webm" -F "language=hi"
+        ```
+    """
+    if await ensure_stt_pool() is None:
+        raise HTTPException(
+            status_code=501,
+            detail="Whisper STT not available. Install with: pip install openai-whisper"
+        )
+    
+    content = await audio.read()
+    try:
+        samples = await run_in_threadpool(decode_audio, content)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Could not decode audio: {str(e)}")
+    
+    async def event_stream():
+        texts = []
+        detected_lang = language
+        no_speech_probs = []
+        segments = iter_transcription(
+            state.stt_pool, samples, language=language, beam_size=beam_size
+        )
+        try:
+            async for seg in iterate_in_threadpool(segments):
+                texts.append(seg['text'])
+                no_speech_probs.append(seg.pop('no_speech_prob'))
+                detected_lang = seg['language']
+                yield sse_event("segment", seg)
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Transcription failed: {str(e)}"})
+            return
+        
+        confidence = None
+        if no_speech_probs:
+            confidence = 1.0 - (sum(no_speech_probs) / len(no_speech_probs))
+        yield sse_event("done", {
+            "text": " ".join(texts),
+            "language": detected_lang or "unknown",
+            "confidence": confidence,
+            "duration_seconds": round(len(samples) / SAMPLE_RATE, 2),
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.get("/health")
 async def health():
     """Simple health check"""
@@ -450,8 +1187,6 @@ if __name__ == "__main__":
 # =============================================================================
 
 if STOCK_SERVICE_AVAILABLE:
-    stock_service = StockPriceService()
-    
     class StockPriceRequest(BaseModel):
         """Request schema for stock price endpoint"""
         symbol: str = Field(..., description="Stock symbol (e.g., RELIANCE, TCS, INFY)")
@@ -459,15 +1194,40 @@ if STOCK_SERVICE_AVAILABLE:
     class MultipleStocksRequest(BaseModel):
         """Request schema for multiple stocks"""
         symbols: List[str] = Field(..., description="List of stock symbols")
+        timeout: Optional[float] = Field(
+            default=None,
+            description="Deadline in seconds; symbols not fetched in time return null",
+            gt=0,
+            le=30
+        )
+    
+    class StockHistoryRequest(BaseModel):
+        """Request schema for historical prices"""
+        symbol: str = Field(..., description="Stock symbol (e.g., RELIANCE, NIFTY)")
+        period: str = Field(
+            default="1mo",
+            description="Period (1d, 5d, 1mo, 3mo, 6mo, ytd, 1y, 2y, 5y, 10y, max)"
+        )
+        interval: str = Field(
+            default="1d",
+            description="Bar interval (1m, 5m, 15m, 30m, 60m, 1h, 1d, 1wk, 1mo)"
+        )
+        format: str = Field(
+            default="rows",
+            description="'rows' (one object per bar) or 'columnar' (one array per field)",
+            pattern="^(rows|columnar)$"
+        )
     
     class StockSearchRequest(BaseModel):
         """Request schema for stock search"""
-        query: str = Field(..., description="Search query (company name or symbol)")
+        query: str = Field(..., description="Search query (company name, symbol or Hindi alias)")
+        limit: int = Field(default=10, ge=1, le=50, description="Maximum number of results")
+        exchange: Optional[str] = Field(default=None, description="Restrict to NSE, BSE or INDEX")
     
     @app.post("/stock/price")
     async def get_stock_price(request: StockPriceRequest):
         """Get current stock price for Indian market"""
-        data = stock_service.get_stock_price(request.symbol)
+        data = await get_stock_service().get_stock_price_async(request.symbol)
         if not data:
             raise HTTPException(status_code=404, detail=f"Stock not found: {request.symbol}")
         return data
@@ -475,18 +1235,129 @@ if STOCK_SERVICE_AVAILABLE:
     @app.post("/stock/multiple")
     async def get_multiple_stocks(request: MultipleStocksRequest):
         """Get prices for multiple stocks"""
-        return stock_service.get_multiple_stocks(request.symbols)
+        return await get_stock_service().get_multiple_stocks_async(
+            request.symbols, timeout=request.timeout
+        )
+    
+    @app.post("/stock/history")
+    async def get_stock_history(request: StockHistoryRequest):
+        """Get historical OHLCV prices"""
+        data = await get_stock_service().get_historical_data_async(
+            request.symbol, request.period, request.interval, request.format
+        )
+        if not data:
+            raise HTTPException(status_code=404, detail=f"No history for: {request.symbol}")
+        return data
     
     @app.post("/stock/search")
     async def search_stocks(request: StockSearchRequest):
         """Search for stocks by name or symbol"""
-        return {"results": stock_service.search_stock(request.query)}
+        service = get_stock_service()
+        if not service.instruments_loaded:
+            # Index still building: wait for it off the event loop
+            await run_in_threadpool(lambda: service.instruments)
+        return {"results": service.search_stock(request.query, request.limit, request.exchange)}
+    
+    @app.get("/stock/watchlist")
+    async def get_watchlist():
+        """Symbols kept warm by the background prefetcher"""
+        if state.prefetcher is None:
+            return {"enabled": False, "symbols": [], "stats": {}}
+        return {
+            "enabled": True,
+            "symbols": state.prefetcher.watchlist,
+            "stats": state.prefetcher.stats,
+        }
+    
+    def parse_symbols(symbols: str) -> List[str]:
+        """Split a comma-separated symbol list"""
+        return [s.strip() for s in symbols.split(",") if s.strip()]
+    
+    @app.websocket("/stock/stream")
+    async def stream_quotes_ws(websocket: WebSocket, symbols: str = ""):
+        """
+        Streaming quotes over WebSocket
+        
+        Connect with ?symbols=TCS,INFY and/or send
+        {"action": "subscribe" | "unsubscribe", "symbols": [...]}.
+        Server sends {"type": "quotes", "data": [...]} on price changes and
+        {"type": "ping"} when idle.
+        """
+        await websocket.accept()
+        try:
+            subscription = get_broadcaster().open(parse_symbols(symbols))
+        except ValueError as e:
+            await websocket.close(code=1008, reason=str(e))
+            return
+        
+        async def receive_commands():
+            while True:
+                message = await websocket.receive_json()
+                action = message.get("action")
+                try:
+                    if action == "subscribe":
+                        subscription.subscribe(message.get("symbols", []))
+                    elif action == "unsubscribe":
+                        subscription.unsubscribe(message.get("symbols", []))
+                    else:
+                        await websocket.send_json({"type": "error", "detail": f"Unknown action: {action}"})
+                except ValueError as e:
+                    await websocket.send_json({"type": "error", "detail": str(e)})
+        
+        receiver = asyncio.create_task(receive_commands())
+        try:
+            while not receiver.done():
+                updates = await subscription.get(timeout=15.0)
+                if subscription.closed:
+                    break
+                if updates:
+                    await websocket.send_json({"type": "quotes", "data": updates})
+                else:
+                    await websocket.send_json({"type": "ping"})
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+            try:
+                await receiver
+            except (asyncio.CancelledError, WebSocketDisconnect):
+                pass
+            except Exception as e:
+                print(f"Warning: Quote stream command handler failed: {e}")
+            subscription.close()
+    
+    @app.get("/stock/stream/sse")
+    async def stream_quotes_sse(request: Request, symbols: str):
+        """Streaming quotes over Server-Sent Events (?symbols=TCS,INFY)"""
+        try:
+            subscription = get_broadcaster().open(parse_symbols(symbols))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        async def events():
+            try:
+                while not subscription.closed:
+                    updates = await subscription.get(timeout=15.0)
+                    if await request.is_disconnected():
+                        break
+                    if updates:
+                        yield sse_event("quotes", {"data": updates})
+                    else:
+                        yield ": keep-alive\n\n"
+            finally:
+                subscription.close()
+        
+        return StreamingResponse(
+            events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
     
     @app.get("/stock/indices")
     async def get_indian_indices():
         """Get major Indian market indices"""
         indices = ['NIFTY', 'SENSEX', 'BANKNIFTY']
-        return stock_service.get_multiple_stocks(indices)
+        return await get_stock_service().get_multiple_stocks_async(indices)
 
 
 # Unit test examples:
@@ -4,12 +4,109 @@ Fetches real-time stock prices for Indian market symbols
 """
 
 import yfinance as yf
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import logging
 
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+
+from instruments import Instrument, InstrumentIndex
+from history_cache import HistoryCache, min_refresh_seconds, period_covers, slice_period
+from quote_cache import QuoteCache
+
 logger = logging.getLogger(__name__)
 
+# NSE/BSE trading session (Indian Standard Time, Monday-Friday)
+IST = timezone(timedelta(hours=5, minutes=30))
+MARKET_OPEN = (9, 15)
+MARKET_CLOSE = (15, 30)
+
+
+def is_market_open(now: Optional[datetime] = None) -> bool:
+    """
+    Check whether the Indian equity market is in its regular session
+    
+    Args:
+        now: Time to check (default: current time)
+        
+    Returns:
+        True between 09:15 and 15:30 IST on weekdays (holidays not handled)
+    """
+    now = (now or datetime.now(IST)).astimezone(IST)
+    if now.weekday() >= 5:
+        return False
+    return MARKET_OPEN <= (now.hour, now.minute) < MARKET_CLOSE
+
+
+class TimeoutSession(requests.Session):
+    """requests session that applies default connect/read timeouts"""
+    
+    def __init__(self, timeout: Tuple[float, float]):
+        super().__init__()
+        self.timeout = timeout
+    
+    def request(self, *args, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return super().request(*args, **kwargs)
+
+
+class YFinanceSource:
+    """Market data source backed by the Yahoo Finance API (network I/O)"""
+    
+    def __init__(self, max_concurrency: int = 4,
+                 connect_timeout: float = 3.0,
+                 read_timeout: float = 5.0):
+        """
+        Args:
+            max_concurrency: Maximum simultaneous requests to Yahoo Finance
+            connect_timeout: TCP connect timeout in seconds
+            read_timeout: Response read timeout in seconds
+        """
+        # One pooled keep-alive session shared by every ticker request
+        self.session = TimeoutSession(timeout=(connect_timeout, read_timeout))
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+    
+    def get_info(self, symbol: str) -> Dict:
+        """
+        Fetch quote/info fields for a normalized symbol
+        
+        Args:
+            symbol: yfinance symbol (e.g., 'RELIANCE.NS', '^NSEI')
+            
+        Returns:
+            Dict of yfinance info fields
+        """
+        with self._slots:
+            return yf.Ticker(symbol, session=self.session).info
+    
+    def get_history(self, symbol: str, period: str = "1mo", interval: str = "1d",
+                    start: Optional[datetime] = None):
+        """
+        Fetch OHLCV history for a normalized symbol
+        
+        Args:
+            symbol: yfinance symbol
+            period: Period to fetch (ignored when start is given)
+            interval: Bar interval
+            start: Fetch from this time to now instead of a fixed period
+            
+        Returns:
+            pandas DataFrame indexed by timestamp
+        """
+        ticker = yf.Ticker(symbol, session=self.session)
+        with self._slots:
+            if start is not None:
+                return ticker.history(start=start, interval=interval)
+            return ticker.history(period=period, interval=interval)
+
 
 class StockPriceService:
     """Service for fetching Indian stock prices"""
@@ -21,10 +118,116 @@ class StockPriceService:
         'banknifty': '^NSEBANK',
     }
     
-    def __init__(self):
-        """Initialize the stock price service"""
-        self.cache = {}
-        self.cache_duration = timedelta(minutes=5)  # Cache for 5 minutes
+    INDEX_NAMES = {
+        'nifty': 'NIFTY 50',
+        'sensex': 'S&P BSE SENSEX',
+        'banknifty': 'NIFTY Bank',
+    }
+    
+    # Common Indian stocks (fallback when no instrument master is loaded)
+    COMMON_STOCKS = {
+        'RELIANCE': 'Reliance Industries',
+        'TCS': 'Tata Consultancy Services',
+        'HDFCBANK': 'HDFC Bank',
+        'INFY': 'Infosys',
+        'ICICIBANK': 'ICICI Bank',
+        'HINDUNILVR': 'Hindustan Unilever',
+        'ITC': 'ITC Limited',
+        'SBIN': 'State Bank of India',
+        'BHARTIARTL': 'Bharti Airtel',
+        'KOTAKBANK': 'Kotak Mahindra Bank',
+        'WIPRO': 'Wipro',
+        'BAJFINANCE': 'Bajaj Finance',
+        'ASIANPAINT': 'Asian Paints',
+        'MARUTI': 'Maruti Suzuki',
+        'AXISBANK': 'Axis Bank',
+        'LT': 'Larsen & Toubro',
+        'TITAN': 'Titan Company',
+        'SUNPHARMA': 'Sun Pharmaceutical',
+        'ULTRACEMCO': 'UltraTech Cement',
+        'NESTLEIND': 'Nestle India',
+    }
+    
+    # Quote cache lifetimes in seconds: (market open, market closed)
+    INDEX_TTL = (60, 1800)
+    EQUITY_TTL = (300, 1800)
+    # Expired quotes are still served (and refreshed in the background)
+    # for this long, so hot symbols never wait on a synchronous fetch
+    STALE_TTL = 3600
+    
+    def __init__(self, source=None, max_workers: int = 8, request_timeout: float = 8.0,
+                 cache_size: int = 512, history_cache_dir: Optional[str] = None,
+                 instrument_files: Optional[List[str]] = None):
+        """
+        Initialize the stock price service
+        
+        Args:
+            source: Market data source (default: YFinanceSource); any object
+                with get_info(symbol) and get_history(symbol, period, interval)
+            max_workers: Maximum concurrent upstream fetches for bulk requests
+            request_timeout: Default deadline in seconds for bulk requests
+            cache_size: Maximum number of cached quotes (LRU eviction)
+            history_cache_dir: Directory for the on-disk OHLCV cache
+                (None disables it)
+            instrument_files: Instrument master CSVs for search_stock
+                (missing files are skipped; COMMON_STOCKS is always included)
+        """
+        self.source = source or YFinanceSource()
+        self.request_timeout = request_timeout
+        # Shared, bounded pool so bulk requests cannot flood the upstream
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="stock-fetch"
+        )
+        # Separate pool for async callers, so a blocking request never holds
+        # a fetch worker while waiting on fetches it submitted itself
+        self._request_executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="stock-request"
+        )
+        self.cache = QuoteCache(
+            max_entries=cache_size,
+            ttl=self.cache_ttl,
+            stale_ttl=self.STALE_TTL,
+            executor=self._executor,
+        )
+        self.history_cache = HistoryCache(history_cache_dir) if history_cache_dir else None
+        self.instrument_files = list(instrument_files or [])
+        self._instruments: Optional[InstrumentIndex] = None
+        self._instruments_lock = threading.Lock()
+    
+    @property
+    def instruments_loaded(self) -> bool:
+        """Whether the symbol search index has been built"""
+        return self._instruments is not None
+    
+    @property
+    def instruments(self) -> InstrumentIndex:
+        """Symbol search index, built on first use"""
+        if self._instruments is None:
+            with self._instruments_lock:
+                if self._instruments is None:
+                    fallback = [Instrument(symbol, name) for symbol, name in self.COMMON_STOCKS.items()]
+                    fallback += [Instrument(key, self.INDEX_NAMES.get(key, key), exchange='INDEX')
+                                 for key in self.INDIAN_INDICES]
+                    self._instruments = InstrumentIndex.from_files(self.instrument_files, extra=fallback)
+                    logger.info(f"Indexed {len(self._instruments)} instruments")
+        return self._instruments
+    
+    def cache_ttl(self, normalized_symbol: str) -> float:
+        """
+        Cache lifetime for a symbol, by symbol class and market session
+        
+        Args:
+            normalized_symbol: yfinance symbol (indices start with '^')
+            
+        Returns:
+            TTL in seconds
+        """
+        open_ttl, closed_ttl = (
+            self.INDEX_TTL if normalized_symbol.startswith('^') else self.EQUITY_TTL
+        )
+        return open_ttl if is_market_open() else closed_ttl
     
     def normalize_symbol(self, symbol: str) -> str:
         """
@@ -60,87 +263,207 @@ class StockPriceService:
             Dict with price info or None if failed
         """
         try:
-            normalized_symbol = self.normalize_symbol(symbol)
-            
-            # Check cache
-            cache_key = normalized_symbol
-            if cache_key in self.cache:
-                cached_data, cached_time = self.cache[cache_key]
-                if datetime.now() - cached_time < self.cache_duration:
-                    logger.info(f"Returning cached data for {symbol}")
-                    return cached_data
-            
-            # Fetch from yfinance
-            ticker = yf.Ticker(normalized_symbol)
-            info = ticker.info
-            
-            # Get current price (try multiple fields)
-            current_price = (
-                info.get('currentPrice') or 
-                info.get('regularMarketPrice') or 
-                info.get('previousClose')
-            )
-            
-            if not current_price:
-                logger.error(f"Could not find price for {symbol}")
-                return None
-            
-            # Prepare response
-            data = {
-                'symbol': symbol,
-                'normalized_symbol': normalized_symbol,
-                'current_price': round(current_price, 2),
-                'currency': info.get('currency', 'INR'),
-                'company_name': info.get('longName', info.get('shortName', symbol)),
-                'previous_close': info.get('previousClose'),
-                'open': info.get('open'),
-                'day_high': info.get('dayHigh'),
-                'day_low': info.get('dayLow'),
-                'volume': info.get('volume'),
-                'market_cap': info.get('marketCap'),
-                'pe_ratio': info.get('trailingPE'),
-                'change': None,
-                'change_percent': None,
-                'timestamp': datetime.now().isoformat(),
-            }
-            
-            # Calculate change
-            if data['previous_close'] and data['current_price']:
-                change = data['current_price'] - data['previous_close']
-                change_percent = (change / data['previous_close']) * 100
-                data['change'] = round(change, 2)
-                data['change_percent'] = round(change_percent, 2)
-            
-            # Cache the result
-            self.cache[cache_key] = (data, datetime.now())
-            
-            logger.info(f"Fetched {symbol}: ₹{current_price}")
-            return data
-            
+            return self._get_quote(symbol)
         except Exception as e:
             logger.error(f"Error fetching {symbol}: {e}")
             return None
     
-    def get_multiple_stocks(self, symbols: List[str]) -> Dict[str, Optional[Dict]]:
+    def _get_cached(self, symbol: str) -> Optional[Dict]:
+        """Return cached quote (fresh or stale) without waiting on upstream"""
+        normalized_symbol = self.normalize_symbol(symbol)
+        return self.cache.get(
+            normalized_symbol,
+            lambda: self._fetch_quote(symbol, normalized_symbol)
+        )
+    
+    def _get_quote(self, symbol: str) -> Dict:
+        """
+        Get quote from cache or upstream, raising on failure
+        
+        Args:
+            symbol: Stock symbol (e.g., 'RELIANCE', 'TCS')
+            
+        Returns:
+            Dict with price info
+        """
+        normalized_symbol = self.normalize_symbol(symbol)
+        return self.cache.get_or_fetch(
+            normalized_symbol,
+            lambda: self._fetch_quote(symbol, normalized_symbol)
+        )
+    
+    def _fetch_quote(self, symbol: str, normalized_symbol: str) -> Dict:
+        """
+        Fetch a quote from the upstream data source (no caching)
+        
+        Args:
+            symbol: Stock symbol as requested
+            normalized_symbol: yfinance symbol
+            
+        Returns:
+            Dict with price info
+        """
+        info = self.source.get_info(normalized_symbol)
+        
+        # Get current price (try multiple fields)
+        current_price = (
+            info.get('currentPrice') or 
+            info.get('regularMarketPrice') or 
+            info.get('previousClose')
+        )
+        
+        if not current_price:
+            raise LookupError(f"Could not find price for {symbol}")
+        
+        # Prepare response
+        data = {
+            'symbol': symbol,
+            'normalized_symbol': normalized_symbol,
+            'current_price': round(current_price, 2),
+            'currency': info.get('currency', 'INR'),
+            'company_name': info.get('longName', info.get('shortName', symbol)),
+            'previous_close': info.get('previousClose'),
+            'open': info.get('open'),
+            'day_high': info.get('dayHigh'),
+            'day_low': info.get('dayLow'),
+            'volume': info.get('volume'),
+            'market_cap': info.get('marketCap'),
+            'pe_ratio': info.get('trailingPE'),
+            'change': None,
+            'change_percent': None,
+            'timestamp': datetime.now().isoformat(),
+        }
+        
+        # Calculate change
+        if data['previous_close'] and data['current_price']:
+            change = data['current_price'] - data['previous_close']
+            change_percent = (change / data['previous_close']) * 100
+            data['change'] = round(change, 2)
+            data['change_percent'] = round(change_percent, 2)
+        
+        logger.info(f"Fetched {symbol}: ₹{current_price}")
+        return data
+    
+    def refresh_quote(self, symbol: str) -> Dict:
+        """
+        Fetch a quote upstream and store it in the cache, ignoring freshness
+        
+        Args:
+            symbol: Stock symbol
+            
+        Returns:
+            Dict with price info (raises on failure)
+        """
+        normalized_symbol = self.normalize_symbol(symbol)
+        data = self._fetch_quote(symbol, normalized_symbol)
+        self.cache.put(normalized_symbol, data)
+        return data
+    
+    def seconds_until_stale(self, symbol: str) -> Optional[float]:
+        """Remaining fresh lifetime of a cached quote (None if not cached)"""
+        return self.cache.time_to_expiry(self.normalize_symbol(symbol))
+    
+    async def get_stock_price_async(self, symbol: str) -> Optional[Dict]:
+        """
+        Non-blocking get_stock_price for use from the event loop
+        
+        Cached quotes are returned without leaving the event loop; misses
+        are fetched on the service's own executor.
+        """
+        try:
+            cached_data = self._get_cached(symbol)
+        except Exception:
+            cached_data = None
+        if cached_data is not None:
+            return cached_data
+        
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._request_executor, self.get_stock_price, symbol
+        )
+    
+    async def get_multiple_stocks_async(self, symbols: List[str],
+                                        timeout: Optional[float] = None
+                                        ) -> Dict[str, Optional[Dict]]:
+        """Non-blocking get_multiple_stocks for use from the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._request_executor, self.get_multiple_stocks, symbols, timeout
+        )
+    
+    def get_multiple_stocks(self, symbols: List[str],
+                            timeout: Optional[float] = None) -> Dict[str, Optional[Dict]]:
         """
         Get prices for multiple stocks
         
         Args:
             symbols: List of stock symbols
+            timeout: Deadline in seconds for the whole batch
             
         Returns:
-            Dict mapping symbols to their data
+            Dict mapping symbols to their data (None for failed symbols)
         """
-        results = {}
-        for symbol in symbols:
-            results[symbol] = self.get_stock_price(symbol)
+        results, _ = self.fetch_quotes(symbols, timeout=timeout)
         return results
     
+    def fetch_quotes(self, symbols: List[str],
+                     timeout: Optional[float] = None
+                     ) -> Tuple[Dict[str, Optional[Dict]], Dict[str, str]]:
+        """
+        Fetch many quotes concurrently with a per-request deadline
+        
+        Cached symbols are answered inline; the rest are fetched on the
+        shared bounded pool. Symbols that fail or miss the deadline are
+        reported in the error map instead of failing the whole batch.
+        
+        Args:
+            symbols: List of stock symbols (duplicates are fetched once)
+            timeout: Deadline in seconds (default: request_timeout)
+            
+        Returns:
+            Tuple of (symbol -> data or None, symbol -> error message)
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+        results: Dict[str, Optional[Dict]] = {}
+        errors: Dict[str, str] = {}
+        futures = {}
+        
+        for symbol in dict.fromkeys(symbols):
+            try:
+                cached_data = self._get_cached(symbol)
+            except Exception as e:
+                results[symbol] = None
+                errors[symbol] = str(e)
+                continue
+            if cached_data is not None:
+                results[symbol] = cached_data
+            else:
+                futures[self._executor.submit(self._get_quote, symbol)] = symbol
+        
+        if futures:
+            done, _ = wait(futures, timeout=timeout)
+            for future, symbol in futures.items():
+                if future not in done:
+                    future.cancel()
+                    results[symbol] = None
+                    errors[symbol] = f"Timed out after {timeout}s"
+                    continue
+                try:
+                    results[symbol] = future.result()
+                except Exception as e:
+                    logger.error(f"Error fetching {symbol}: {e}")
+                    results[symbol] = None
+                    errors[symbol] = str(e)
+        
+        # Preserve request order
+        return {symbol: results[symbol] for symbol in dict.fromkeys(symbols)}, errors
+    
     def get_historical_data(
         self, 
         symbol: str, 
         period: str = "1mo",
-        interval: str = "1d"
+        interval: str = "1d",
+        format: str = "rows"
     ) -> Optional[Dict]:
         """
         Get historical price data
@@ -149,90 +472,228 @@ class StockPriceService:
             symbol: Stock symbol
             period: Period to fetch (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, max)
             interval: Data interval (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
+            format: 'rows' (list of dicts per bar) or 'columnar' (arrays per field)
             
         Returns:
             Dict with historical data
         """
         try:
             normalized_symbol = self.normalize_symbol(symbol)
-            ticker = yf.Ticker(normalized_symbol)
             
-            # Fetch historical data
-            hist = ticker.history(period=period, interval=interval)
+            # Fetch historical data (from the local cache when possible)
+            hist = self._load_history(normalized_symbol, period, interval)
             
-            if hist.empty:
+            if hist is None or hist.empty:
                 return None
             
-            # Convert to dict format
-            data = {
+            return {
                 'symbol': symbol,
                 'period': period,
                 'interval': interval,
-                'data': []
+                'format': format,
+                'data': self._history_payload(hist, format),
             }
             
-            for index, row in hist.iterrows():
-                data['data'].append({
-                    'date': index.isoformat(),
-                    'open': round(row['Open'], 2),
-                    'high': round(row['High'], 2),
-                    'low': round(row['Low'], 2),
-                    'close': round(row['Close'], 2),
-                    'volume': int(row['Volume']),
-                })
-            
-            return data
-            
         except Exception as e:
             logger.error(f"Error fetching historical data for {symbol}: {e}")
             return None
     
-    def search_stock(self, query: str) -> List[Dict]:
+    def _load_history(self, normalized_symbol: str, period: str, interval: str):
+        """
+        Get an OHLCV frame, fetching only the missing tail when cached
+        
+        Returns:
+            pandas DataFrame (possibly empty)
+        """
+        if self.history_cache is None:
+            return self.source.get_history(normalized_symbol, period=period, interval=interval)
+        
+        cached = self.history_cache.load(normalized_symbol, interval)
+        if cached is not None and period_covers(cached['period'], period) and not cached['frame'].empty:
+            frame = cached['frame']
+            age = datetime.now().timestamp() - cached['fetched_at']
+            if age >= min_refresh_seconds(interval):
+                # Re-fetch from the last cached bar (it may have been partial)
+                tail = self.source.get_history(
+                    normalized_symbol, interval=interval,
+                    start=frame.index[-1].to_pydatetime()
+                )
+                frame = HistoryCache.merge(frame, tail)
+                self.history_cache.save(normalized_symbol, interval,
+                                        slice_period(frame, cached['period']), cached['period'])
+            return slice_period(frame, period)
+        
+        fresh = self.source.get_history(normalized_symbol, period=period, interval=interval)
+        if not fresh.empty:
+            frame = HistoryCache.merge(cached['frame'] if cached else None, fresh)
+            self.history_cache.save(normalized_symbol, interval, frame, period)
+        return fresh
+    
+    @staticmethod
+    def _history_payload(hist, format: str = "rows"):
         """
-        Search for stocks by name or symbol
+        Convert an OHLCV frame to JSON-ready data with column operations
         
         Args:
-            query: Search query
+            hist: DataFrame with Open/High/Low/Close/Volume columns
+            format: 'rows' or 'columnar'
             
         Returns:
-            List of matching stocks
-        """
-        # Common Indian stocks (expand this list)
-        common_stocks = {
-            'RELIANCE': 'Reliance Industries',
-            'TCS': 'Tata Consultancy Services',
-            'HDFCBANK': 'HDFC Bank',
-            'INFY': 'Infosys',
-            'ICICIBANK': 'ICICI Bank',
-            'HINDUNILVR': 'Hindustan Unilever',
-            'ITC': 'ITC Limited',
-            'SBIN': 'State Bank of India',
-            'BHARTIARTL': 'Bharti Airtel',
-            'KOTAKBANK': 'Kotak Mahindra Bank',
-            'WIPRO': 'Wipro',
-            'BAJFINANCE': 'Bajaj Finance',
-            'ASIANPAINT': 'Asian Paints',
-            'MARUTI': 'Maruti Suzuki',
-            'AXISBANK': 'Axis Bank',
-            'LT': 'Larsen & Toubro',
-            'TITAN': 'Titan Company',
-            'SUNPHARMA': 'Sun Pharmaceutical',
-            'ULTRACEMCO': 'UltraTech Cement',
-            'NESTLEIND': 'Nestle India',
+            List of per-bar dicts, or dict of per-field lists
+        """
+        # ISO-8601 timestamps for the whole index at once
+        dates = hist.index.astype(str).str.replace(' ', 'T', n=1).tolist()
+        prices = np.round(hist[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64), 2)
+        volume = np.nan_to_num(hist['Volume'].to_numpy(dtype=np.float64)).astype(np.int64)
+        
+        columns = {
+            'date': dates,
+            'open': prices[:, 0].tolist(),
+            'high': prices[:, 1].tolist(),
+            'low': prices[:, 2].tolist(),
+            'close': prices[:, 3].tolist(),
+            'volume': volume.tolist(),
         }
+        if format == "columnar":
+            return columns
         
-        query_lower = query.lower()
-        results = []
+        return [
+            {'date': d, 'open': o, 'high': h, 'low': l, 'close': c, 'volume': v}
+            for d, o, h, l, c, v in zip(*columns.values())
+        ]
+    
+    async def get_historical_data_async(self, symbol: str, period: str = "1mo",
+                                        interval: str = "1d",
+                                        format: str = "rows") -> Optional[Dict]:
+        """Non-blocking get_historical_data for use from the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._request_executor, self.get_historical_data,
+            symbol, period, interval, format
+        )
+    
+    def search_stock(self, query: str, limit: int = 10,
+                     exchange: Optional[str] = None) -> List[Dict]:
+        """
+        Search for stocks by name, symbol or alias
         
-        for symbol, name in common_stocks.items():
-            if query_lower in symbol.lower() or query_lower in name.lower():
-                results.append({
-                    'symbol': symbol,
-                    'name': name,
-                    'exchange': 'NSE',
-                })
+        Args:
+            query: Search query
+            limit: Maximum number of results
+            exchange: Restrict to one exchange (NSE/BSE/INDEX)
+            
+        Returns:
+            List of matching stocks, best first
+        """
+        return self.instruments.search(query, limit=limit, exchange=exchange)
+
+
+class MarketDataPrefetcher:
+    """
+    Background refresher that keeps a watchlist of quotes warm in the cache
+    
+    Every `interval` seconds (or `closed_interval` outside market hours),
+    symbols whose cached quote is missing or will expire before the next
+    check are refreshed, one upstream request at a time and no faster than
+    `max_requests_per_minute`. Requests for watched symbols are then served
+    from memory.
+    """
+    
+    def __init__(self, service: StockPriceService,
+                 watchlist: Optional[List[str]] = None,
+                 interval: float = 15.0,
+                 closed_interval: float = 300.0,
+                 max_requests_per_minute: int = 60):
+        """
+        Args:
+            service: Stock service whose cache is kept warm
+            watchlist: Symbols to refresh (default: indices + common stocks)
+            interval: Seconds between checks during market hours
+            closed_interval: Seconds between checks when the market is closed
+            max_requests_per_minute: Upstream rate limit for the prefetcher
+        """
+        self.service = service
+        self.watchlist = watchlist or self.default_watchlist()
+        self.interval = interval
+        self.closed_interval = closed_interval
+        self.request_spacing = 60.0 / max(1, max_requests_per_minute)
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            'cycles': 0,
+            'refreshed': 0,
+            'errors': 0,
+            'last_cycle_at': None,
+        }
+    
+    @staticmethod
+    def default_watchlist() -> List[str]:
+        """Indices plus the common stocks the chat backend detects"""
+        return [name.upper() for name in StockPriceService.INDIAN_INDICES] + list(
+            StockPriceService.COMMON_STOCKS
+        )
+    
+    def due_symbols(self) -> List[str]:
+        """Watched symbols that are missing or will go stale before the next check"""
+        horizon = self.interval if is_market_open() else self.closed_interval
+        due = []
+        for symbol in self.watchlist:
+            remaining = self.service.seconds_until_stale(symbol)
+            if remaining is None or remaining <= horizon:
+                due.append(symbol)
+        return due
+    
+    async def refresh_once(self) -> int:
+        """
+        Refresh every due symbol, respecting the rate limit
         
-        return results[:10]  # Limit to 10 results
+        Returns:
+            Number of symbols refreshed
+        """
+        loop = asyncio.get_running_loop()
+        refreshed = 0
+        for i, symbol in enumerate(self.due_symbols()):
+            if i:
+                await asyncio.sleep(self.request_spacing)
+            try:
+                await loop.run_in_executor(
+                    self.service._executor, self.service.refresh_quote, symbol
+                )
+                refreshed += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.warning(f"Prefetch failed for {symbol}: {e}")
+        
+        self.stats['cycles'] += 1
+        self.stats['refreshed'] += refreshed
+        self.stats['last_cycle_at'] = datetime.now().isoformat()
+        return refreshed
+    
+    async def run(self):
+        """Refresh loop (runs until cancelled)"""
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Prefetch cycle failed: {e}")
+            await asyncio.sleep(self.interval if is_market_open() else self.closed_interval)
+    
+    def start(self):
+        """Start the refresh loop on the running event loop"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self.run())
+            logger.info(f"Prefetching {len(self.watchlist)} symbols")
+    
+    async def stop(self):
+        """Cancel the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
 
 
 # Example usage
@@ -0,0 +1,383 @@
+"""
+Speech-to-Text helpers for Shankh.ai RAG Service
+
+In-memory audio decoding, energy-based voice activity detection (VAD) and
+windowed Whisper transcription, so long voice notes can be streamed back
+segment by segment instead of after the whole clip has been processed.
+
+Two interchangeable STT engines are supported:
+    openai-whisper  - reference PyTorch implementation
+    faster-whisper  - CTranslate2 implementation with int8 quantization,
+                      several times faster on CPU
+
+Engines are held in a small pool so concurrent requests run in parallel
+instead of queueing behind a single shared model.
+"""
+
+import io
+import os
+import queue
+import shutil
+import subprocess
+import wave
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Optional: soundfile for decoding WAV/FLAC when ffmpeg is not installed
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
+# Optional STT engines
+try:
+    import whisper
+    WHISPER_AVAILABLE = True
+except ImportError:
+    WHISPER_AVAILABLE = False
+
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+# Whisper models expect 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+
+# Whisper processes audio in 30 second windows
+MAX_WINDOW_SECONDS = 30.0
+
+
+def decode_audio(data: bytes, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Decode an audio file held in memory to mono float32 PCM
+
+    Uses ffmpeg over stdin/stdout pipes (no temp files); falls back to
+    soundfile, or the standard library for PCM WAV, when ffmpeg is missing.
+
+    Args:
+        data: Raw bytes of the uploaded audio file (wav, mp3, webm, ...)
+        sample_rate: Target sample rate
+
+    Returns:
+        1-D float32 array in [-1, 1]
+    """
+    if shutil.which("ffmpeg"):
+        cmd = [
+            "ffmpeg", "-loglevel", "error", "-threads", "0",
+            "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le",
+            "-ar", str(sample_rate), "pipe:1",
+        ]
+        proc = subprocess.run(cmd, input=data, capture_output=True)
+        if proc.returncode != 0:
+            raise RuntimeError(f"Failed to decode audio: {proc.stderr.decode().strip()}")
+        return np.frombuffer(proc.stdout, np.int16).astype(np.float32) / 32768.0
+
+    if SOUNDFILE_AVAILABLE:
+        audio, file_rate = sf.read(io.BytesIO(data), dtype='float32', always_2d=True)
+        return _resample(audio.mean(axis=1), file_rate, sample_rate)
+
+    if data[:4] == b'RIFF':
+        with wave.open(io.BytesIO(data), 'rb') as wav:
+            if wav.getsampwidth() != 2:
+                raise RuntimeError("Only 16-bit PCM WAV is supported without ffmpeg")
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), np.int16)
+            audio = pcm.reshape(-1, wav.getnchannels()).mean(axis=1) / 32768.0
+            return _resample(audio.astype(np.float32), wav.getframerate(), sample_rate)
+
+    raise RuntimeError("No audio decoder available. Install ffmpeg or soundfile.")
+
+
+def _resample(audio: np.ndarray, source_rate: int, target_rate: int) -> np.ndarray:
+    """Linear resampling (good enough for speech recognition)"""
+    if source_rate == target_rate:
+        return audio
+    duration = len(audio) / source_rate
+    target = np.linspace(0, duration, int(duration * target_rate), endpoint=False)
+    source = np.arange(len(audio)) / source_rate
+    return np.interp(target, source, audio).astype(np.float32)
+
+
+def vad_segments(audio: np.ndarray,
+                 sample_rate: int = SAMPLE_RATE,
+                 frame_ms: int = 30,
+                 min_silence_ms: int = 400,
+                 min_speech_ms: int = 200,
+                 max_window_s: float = MAX_WINDOW_SECONDS,
+                 padding_ms: int = 150,
+                 min_energy: float = 0.003) -> List[Tuple[int, int]]:
+    """
+    Split audio into speech windows using frame energy
+
+    Frames louder than an adaptive threshold (derived from the noise floor,
+    but never above half the peak or below `min_energy`) count as speech.
+    Speech separated by at least `min_silence_ms` of silence starts a new
+    window, and windows longer than `max_window_s` are split so each fits
+    a single Whisper pass.
+
+    Args:
+        audio: Mono float32 samples
+        sample_rate: Sample rate of `audio`
+        frame_ms: Analysis frame length
+        min_silence_ms: Silence needed to end a window
+        min_speech_ms: Shorter bursts are dropped as noise
+        max_window_s: Maximum window length
+        padding_ms: Context kept on either side of each window
+        min_energy: Absolute RMS floor for speech (about -50 dBFS)
+
+    Returns:
+        List of (start_sample, end_sample) tuples
+    """
+    frame_len = int(sample_rate * frame_ms / 1000)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return []
+
+    frames = audio[:n_frames * frame_len].reshape(n_frames, frame_len)
+    energy = np.sqrt(np.mean(frames ** 2, axis=1))
+
+    noise_floor = np.percentile(energy, 10)
+    threshold = max(min(noise_floor * 3.0, 0.5 * energy.max()), min_energy)
+    speech = energy > threshold
+
+    # Bridge short silences so words are not split into separate windows
+    min_silence_frames = max(1, min_silence_ms // frame_ms)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+    runs = edges.reshape(-1, 2)  # [start_frame, end_frame) of each speech run
+
+    merged: List[List[int]] = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_silence_frames:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech_frames = max(1, min_speech_ms // frame_ms)
+    max_frames = int(max_window_s * 1000 / frame_ms)
+    pad = padding_ms // frame_ms
+
+    segments = []
+    for start, end in merged:
+        if end - start < min_speech_frames:
+            continue
+        start = max(0, start - pad)
+        end = min(n_frames, end + pad)
+        for window_start in range(start, end, max_frames):
+            window_end = min(end, window_start + max_frames)
+            segments.append((window_start * frame_len, window_end * frame_len))
+
+    return segments
+
+
+def iter_transcription(model: Any,
+                       audio: np.ndarray,
+                       language: Optional[str] = None,
+                       sample_rate: int = SAMPLE_RATE,
+                       **options) -> Iterator[Dict[str, Any]]:
+    """
+    Transcribe VAD windows one at a time, yielding segments as they finish
+
+    The language detected on the first window is reused for the rest of
+    the clip, and each window is prompted with the previous window's text
+    to keep wording consistent across window boundaries.
+
+    Args:
+        model: STT engine or EnginePool (anything with `transcribe`)
+        audio: Mono float32 samples at `sample_rate`
+        language: Optional language code (skips detection)
+        sample_rate: Sample rate of `audio`
+        **options: Extra options forwarded to `model.transcribe`
+
+    Yields:
+        Segment dicts with absolute 'start'/'end' times, 'text',
+        'language' and 'no_speech_prob'
+    """
+    previous_text = None
+
+    for start, end in vad_segments(audio, sample_rate=sample_rate):
+        offset = start / sample_rate
+        result = model.transcribe(
+            audio[start:end],
+            language=language,
+            initial_prompt=previous_text,
+            **options
+        )
+        language = language or result.get('language')
+
+        for seg in result.get('segments', []):
+            text = seg['text'].strip()
+            if not text:
+                continue
+            yield {
+                'start': round(offset + seg['start'], 2),
+                'end': round(offset + seg['end'], 2),
+                'text': text,
+                'language': language,
+                'no_speech_prob': seg.get('no_speech_prob', 0.0),
+            }
+
+        previous_text = result.get('text', '').strip() or previous_text
+
+
+class OpenAIWhisperEngine:
+    """STT engine backed by the openai-whisper PyTorch model"""
+
+    name = "openai-whisper"
+
+    def __init__(self, model_name: str = "base", **kwargs):
+        if not WHISPER_AVAILABLE:
+            raise RuntimeError("openai-whisper not installed. Install with: pip install openai-whisper")
+        self.model = whisper.load_model(model_name)
+        self.fp16 = self.model.device.type == "cuda"
+
+    def transcribe(self, audio: np.ndarray,
+                   language: Optional[str] = None,
+                   beam_size: Optional[int] = None,
+                   initial_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Transcribe decoded samples
+
+        Args:
+            audio: Mono float32 samples at 16 kHz
+            language: Optional language code (skips language detection)
+            beam_size: Optional beam width (greedy decoding if None)
+            initial_prompt: Optional text to condition the first window on
+
+        Returns:
+            Dict with 'text', 'language' and 'segments'
+        """
+        options = {}
+        if beam_size:
+            options['beam_size'] = beam_size
+        return self.model.transcribe(
+            audio,
+            language=language,
+            initial_prompt=initial_prompt,
+            fp16=self.fp16,
+            **options
+        )
+
+
+class FasterWhisperEngine:
+    """STT engine backed by faster-whisper (CTranslate2, int8 on CPU)"""
+
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str = "base",
+                 compute_type: str = "int8",
+                 cpu_threads: int = 0,
+                 **kwargs):
+        if not FASTER_WHISPER_AVAILABLE:
+            raise RuntimeError("faster-whisper not installed. Install with: pip install faster-whisper")
+        self.model = WhisperModel(
+            model_name,
+            device="cpu",
+            compute_type=compute_type,
+            cpu_threads=cpu_threads,
+        )
+
+    def transcribe(self, audio: np.ndarray,
+                   language: Optional[str] = None,
+                   beam_size: Optional[int] = None,
+                   initial_prompt: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe decoded samples (same contract as OpenAIWhisperEngine)"""
+        segments, info = self.model.transcribe(
+            audio,
+            language=language,
+            beam_size=beam_size or 1,
+            initial_prompt=initial_prompt,
+        )
+        # faster-whisper decodes lazily; consume the generator here
+        segments = [
+            {
+                'start': seg.start,
+                'end': seg.end,
+                'text': seg.text,
+                'no_speech_prob': seg.no_speech_prob,
+            }
+            for seg in segments
+        ]
+        return {
+            'text': "".join(seg['text'] for seg in segments),
+            'language': info.language,
+            'segments': segments,
+        }
+
+
+STT_ENGINES = {
+    OpenAIWhisperEngine.name: OpenAIWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+}
+
+
+def available_backends() -> List[str]:
+    """Names of STT engines whose libraries are installed"""
+    backends = []
+    if WHISPER_AVAILABLE:
+        backends.append(OpenAIWhisperEngine.name)
+    if FASTER_WHISPER_AVAILABLE:
+        backends.append(FasterWhisperEngine.name)
+    return backends
+
+
+def default_pool_size(cpu_threads: int = 0) -> int:
+    """
+    Number of engine instances to keep for this machine
+
+    Args:
+        cpu_threads: Threads each engine uses (0 = 4, the CTranslate2 default)
+
+    Returns:
+        Pool size, at least 1
+    """
+    threads_per_engine = cpu_threads or 4
+    return max(1, (os.cpu_count() or 1) // threads_per_engine)
+
+
+class EnginePool:
+    """
+    Fixed-size pool of STT engine instances
+
+    Each request (or streaming window) borrows one engine for the duration
+    of a single transcribe call, so up to `size` transcriptions run in
+    parallel and the rest wait for a free instance.
+    """
+
+    def __init__(self, backend: str, model_name: str, size: int = 1, **engine_kwargs):
+        """
+        Load `size` engine instances
+
+        Args:
+            backend: Engine name ('openai-whisper' or 'faster-whisper')
+            model_name: Whisper model size/name (e.g. 'base', 'small')
+            size: Number of instances
+            **engine_kwargs: Extra engine options (compute_type, cpu_threads)
+        """
+        if backend not in STT_ENGINES:
+            raise ValueError(f"Unknown STT backend: {backend} (choose from {list(STT_ENGINES)})")
+
+        self.backend = backend
+        self.model_name = model_name
+        self.size = size
+        self._engines: "queue.Queue[Any]" = queue.Queue()
+        for _ in range(size):
+            self._engines.put(STT_ENGINES[backend](model_name, **engine_kwargs))
+
+    @contextmanager
+    def acquire(self):
+        """Borrow an engine, returning it to the pool afterwards"""
+        engine = self._engines.get()
+        try:
+            yield engine
+        finally:
+            self._engines.put(engine)
+
+    def transcribe(self, audio: np.ndarray, **options) -> Dict[str, Any]:
+        """Transcribe on the next free engine"""
+        with self.acquire() as engine:
+            return engine.transcribe(audio, **options)
@@ -0,0 +1,35 @@
+"""
+Unit Tests for the /retrieve threshold and adaptive score-gap cut-off
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from server import RetrievalRequest, result_cutoff
+
+
+class TestAdaptiveCutoff:
+    """Test threshold / score-gap cut-off applied before results are built"""
+
+    def test_threshold_only(self):
+        """Absolute threshold truncates the sorted hit list"""
+        scores = np.array([0.9, 0.7, 0.4, 0.3], dtype=np.float32)
+        request = RetrievalRequest(query="q", threshold=0.5)
+        assert result_cutoff(scores, request) == 2
+
+    def test_adaptive_gap_and_min_top_score(self):
+        """Adaptive mode keeps hits near the top one and can return nothing"""
+        scores = np.array([0.80, 0.75, 0.70, 0.40], dtype=np.float32)
+        assert result_cutoff(scores, RetrievalRequest(query="q", k=4, adaptive=True, score_gap=0.15)) == 3
+        assert result_cutoff(scores, RetrievalRequest(query="q", adaptive=True, min_top_score=0.85)) == 0
+        assert result_cutoff(scores, RetrievalRequest(query="q")) == 4
+
+    def test_empty_hit_list(self):
+        """No hits: nothing to cut, in either mode"""
+        scores = np.empty(0, dtype=np.float32)
+        assert result_cutoff(scores, RetrievalRequest(query="q", adaptive=True, threshold=0.5)) == 0
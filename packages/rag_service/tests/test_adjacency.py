@@ -0,0 +1,50 @@
+"""
+Unit Tests for the chunk adjacency index and context stitching
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from adjacency import build_adjacency, stitch, window_range
+
+
+def make_chunks(layout):
+    """Chunk dicts from (filename, page_num) pairs"""
+    return [{'filename': f, 'page_num': p} for f, p in layout]
+
+
+class TestBuildAdjacency:
+    """Test neighbour links and ranges"""
+
+    def test_links_stop_at_document_boundaries(self):
+        """prev/next never cross into another document"""
+        adjacency = build_adjacency(make_chunks([('a', 1), ('a', 1), ('a', 2), ('b', 1)]))
+        assert adjacency['prev'].tolist() == [-1, 0, 1, -1]
+        assert adjacency['next'].tolist() == [1, 2, -1, -1]
+        assert adjacency['page_start'].tolist() == [0, 0, 2, 3]
+        assert adjacency['page_end'].tolist() == [2, 2, 3, 4]
+        assert adjacency['doc_end'].tolist() == [3, 3, 3, 4]
+
+    def test_window_range_scopes(self):
+        """Windows are clipped to the page or document"""
+        adjacency = build_adjacency(make_chunks([('a', 1), ('a', 1), ('a', 2), ('b', 1)]))
+        assert list(window_range(adjacency, 1, 2)) == [0, 1, 2]
+        assert list(window_range(adjacency, 1, 2, scope='page')) == [0, 1]
+        assert list(window_range(adjacency, 3, 1)) == [3]
+
+
+class TestStitch:
+    """Test overlap removal"""
+
+    def test_overlapping_chunks_rebuild_text(self):
+        """Consecutive overlapping chunks join without duplicated text"""
+        text = " ".join(f"Sentence {i} is about loans." for i in range(20))
+        parts = [text[0:200], text[150:350], text[300:]]
+        assert stitch(parts) == text
+
+    def test_non_overlapping_chunks_joined_with_newline(self):
+        """Chunks from different pages are kept apart"""
+        assert stitch(["first page text", "second page text"]) == "first page text\nsecond page text"
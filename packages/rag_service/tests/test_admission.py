@@ -0,0 +1,87 @@
+"""
+Unit Tests for /retrieve admission control (priorities, deadlines, shedding)
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from admission import AdmissionController, AdmissionRejected
+
+
+class TestAdmissionController:
+    """Test dispatch order and rejection rules"""
+
+    def test_weighted_dispatch_prefers_interactive(self):
+        """With both queues full, interactive gets 4 of every 5 slots"""
+        order = []
+        gate = threading.Event()
+
+        async def scenario():
+            controller = AdmissionController(workers=1, target_queue_ms=1e9)
+            blocker = asyncio.create_task(controller.run("bulk", gate.wait))
+            await asyncio.sleep(0.05)
+            tasks = [
+                asyncio.create_task(controller.run(priority, order.append, f"{priority[0]}{i}"))
+                for i in range(5) for priority in ("bulk", "interactive")
+            ]
+            await asyncio.sleep(0.05)
+            gate.set()
+            await asyncio.gather(blocker, *tasks)
+
+        asyncio.run(scenario())
+        assert [item[0] for item in order[:5]].count("i") == 4
+
+    def test_expired_request_is_dropped(self):
+        """A request whose deadline passes while queued never runs"""
+        ran = []
+        gate = threading.Event()
+
+        async def scenario():
+            controller = AdmissionController(workers=1, target_queue_ms=1e9)
+            blocker = asyncio.create_task(controller.run("interactive", gate.wait))
+            await asyncio.sleep(0.05)
+            late = asyncio.create_task(controller.run(
+                "interactive", ran.append, "late", deadline=time.monotonic() + 0.05
+            ))
+            await asyncio.sleep(0.1)
+            gate.set()
+            await blocker
+            with pytest.raises(AdmissionRejected) as info:
+                await late
+            return controller, info.value
+
+        controller, error = asyncio.run(scenario())
+        assert error.reason == "deadline"
+        assert ran == []
+        assert controller.stats["interactive"]["expired"] == 1
+
+    def test_bulk_shed_over_target_delay(self):
+        """Bulk is refused while the queue is backed up; interactive still queues"""
+        gate = threading.Event()
+
+        async def scenario():
+            controller = AdmissionController(workers=1, target_queue_ms=20)
+            blocker = asyncio.create_task(controller.run("interactive", gate.wait))
+            await asyncio.sleep(0.02)
+            waiting = asyncio.create_task(controller.run("interactive", lambda: "ok"))
+            await asyncio.sleep(0.05)
+            with pytest.raises(AdmissionRejected) as info:
+                await controller.run("bulk", lambda: "bulk")
+            gate.set()
+            await blocker
+            result = await waiting
+            # Backlog cleared: bulk is admitted again
+            bulk = await controller.run("bulk", lambda: "bulk")
+            return info.value, result, bulk
+
+        error, result, bulk = asyncio.run(scenario())
+        assert error.reason == "shed"
+        assert result == "ok" and bulk == "bulk"
@@ -0,0 +1,60 @@
+"""
+Unit Tests for two-stage (coarse + exact) cascade search
+"""
+
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from cascade import CascadeIndex, learn_projection
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    """Normalized vectors with most variance in a few directions, like embeddings"""
+    rng = np.random.default_rng(1)
+    basis = rng.normal(size=(16, 96))
+    weights = rng.normal(size=(2000, 16)) * np.linspace(3, 0.3, 16)
+    x = (weights @ basis + rng.normal(0, 0.3, (2000, 96))).astype(np.float32)
+    faiss.normalize_L2(x)
+    return x
+
+
+class TestCascadeIndex:
+    """Test coarse candidate search with exact re-ranking"""
+
+    def test_matches_exhaustive_search(self, vectors):
+        """Top hits and scores agree with the full-dimension index"""
+        index = faiss.IndexFlatIP(vectors.shape[1])
+        index.add(vectors)
+        cascade = CascadeIndex.build(vectors, 24)
+
+        queries = vectors[:20] + np.random.default_rng(2).normal(0, 0.02, (20, 96)).astype(np.float32)
+        faiss.normalize_L2(queries)
+        for query in queries:
+            exact_scores, exact_ids = index.search(query[None, :], 5)
+            scores, positions = cascade.search(index.reconstruct_batch, query[None, :], 5, pool=50)
+            assert positions.tolist() == exact_ids[0].tolist()
+            np.testing.assert_allclose(scores, exact_scores[0], rtol=1e-5)
+
+    def test_truncate_projection(self):
+        """Matryoshka projection keeps the leading dimensions"""
+        projection = learn_projection(np.eye(8, dtype=np.float32), 3, method="truncate")
+        assert projection.shape == (8, 3)
+        assert np.array_equal(np.arange(8, dtype=np.float32) @ projection, [0, 1, 2])
+        with pytest.raises(ValueError):
+            learn_projection(np.eye(8, dtype=np.float32), 8)
+
+    def test_save_load_remove(self, vectors, tmp_path):
+        """Saved coarse index round-trips and can be removed"""
+        CascadeIndex.build(vectors, 16).save(str(tmp_path))
+        loaded = CascadeIndex.load(str(tmp_path))
+        assert loaded.dim == 16 and loaded.ntotal == len(vectors)
+        CascadeIndex.remove(str(tmp_path))
+        assert CascadeIndex.load(str(tmp_path)) is None
@@ -0,0 +1,69 @@
+"""
+Unit Tests for named collections (lazy loading, LRU eviction)
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from collection_manager import CollectionManager
+
+
+def make_index(path: Path, n: int = 4, dim: int = 8) -> str:
+    """Write a small index directory like ingest.py does"""
+    path.mkdir(parents=True)
+    vectors = np.random.default_rng(n).random((n, dim), dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    faiss.write_index(index, str(path / "faiss_index.bin"))
+    chunks = [
+        dict(chunk_id=i, filename="a.pdf", page_num=1, text=f"chunk number {i} about loans",
+             excerpt="", char_start=0, char_end=0, language="en")
+        for i in range(n)
+    ]
+    with open(path / "metadata.pkl", "wb") as f:
+        pickle.dump({"chunks": chunks, "embedding_model": "test-model"}, f)
+    return str(path)
+
+
+class TestCollectionManager:
+    """Test lazy loading and the memory budget"""
+
+    def test_discover_and_lazy_load(self, tmp_path):
+        """Collections are found by directory and read on first use"""
+        make_index(tmp_path / "rbi")
+        make_index(tmp_path / "sebi")
+        (tmp_path / "empty").mkdir()
+        manager = CollectionManager(CollectionManager.discover(str(tmp_path)))
+
+        assert manager.names == ["rbi", "sebi"]
+        assert not manager.is_loaded("rbi")
+        collection = manager.get("rbi")
+        assert manager.is_loaded("rbi") and not manager.is_loaded("sebi")
+        assert collection.chunk_positions == {0: 0, 1: 1, 2: 2, 3: 3}
+        assert manager.get("rbi") is collection
+        with pytest.raises(KeyError):
+            manager.get("faq")
+
+    def test_lru_eviction_keeps_pinned(self, tmp_path):
+        """Going over budget unloads the least recently used unpinned collection"""
+        paths = {name: make_index(tmp_path / name) for name in ("default", "rbi", "sebi")}
+        manager = CollectionManager(paths, pinned=["default"])
+        size = manager.get("default").memory_bytes
+        manager.memory_budget_bytes = int(size * 2.5)
+
+        manager.get("rbi")
+        manager.get("sebi")
+
+        assert manager.is_loaded("default")
+        assert not manager.is_loaded("rbi")
+        assert manager.is_loaded("sebi")
+        assert manager.stats["evictions"] == 1
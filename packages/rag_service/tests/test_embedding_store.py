@@ -0,0 +1,104 @@
+"""
+Unit Tests for the saved embedding matrix and index rebuilds
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from embedding_store import load_embeddings, save_embeddings
+
+
+def make_index_dir(path: Path, n: int = 600, dim: int = 32) -> np.ndarray:
+    """Index directory as written by ingest (flat index + store + metadata)"""
+    path.mkdir(parents=True)
+    vectors = np.random.default_rng(0).normal(size=(n, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+    faiss.write_index(index, str(path / "faiss_index.bin"))
+    chunks = [
+        dict(chunk_id=i, filename=f"doc{i // 50}.pdf", page_num=1, text=f"chunk {i}",
+             excerpt="", char_start=0, char_end=0, language="en" if i % 2 else "hi")
+        for i in range(n)
+    ]
+    with open(path / "metadata.pkl", "wb") as f:
+        pickle.dump({"chunks": chunks, "embedding_model": "test-model"}, f)
+    save_embeddings(str(path), vectors, np.arange(n), "test-model")
+    return vectors
+
+
+class TestEmbeddingStore:
+    """Test the memory-mapped embedding matrix"""
+
+    def test_round_trip_is_memory_mapped(self, tmp_path):
+        """Vectors, ids and manifest come back; the matrix is an mmap"""
+        vectors = make_index_dir(tmp_path / "index")
+        loaded, ids, manifest = load_embeddings(str(tmp_path / "index"))
+
+        assert isinstance(loaded, np.memmap)
+        np.testing.assert_array_equal(loaded, vectors)
+        assert ids.tolist() == list(range(600))
+        assert manifest["dim"] == 32 and manifest["embedding_model"] == "test-model"
+        assert load_embeddings(str(tmp_path)) is None
+
+
+class TestRebuildIndex:
+    """Test `ingest.py rebuild-index`"""
+
+    def test_rebuild_other_type_and_shards(self, tmp_path):
+        """HNSW rebuild finds the same neighbours; shards split at documents"""
+        from ingest import rebuild_index
+
+        vectors = make_index_dir(tmp_path / "index")
+        [out] = rebuild_index(str(tmp_path / "index"), str(tmp_path / "hnsw"), "HNSW16")
+        index = faiss.read_index(str(Path(out) / "faiss_index.bin"))
+        assert index.ntotal == 600
+        assert index.search(vectors[:1], 1)[1][0, 0] == 0
+
+        shards = rebuild_index(str(tmp_path / "index"), str(tmp_path / "shards"), shards=4)
+        sizes = []
+        for shard in shards:
+            with open(Path(shard) / "metadata.pkl", "rb") as f:
+                chunks = pickle.load(f)["chunks"]
+            assert chunks[0]["chunk_id"] % 50 == 0
+            sizes.append(len(chunks))
+        assert sum(sizes) == 600 and len(sizes) == 4
+
+    def test_ivf_rebuild_serves_filtered_and_diverse_queries(self, tmp_path):
+        """Language filter and MMR work on a rebuilt IVF index; the store is required"""
+        import pytest
+        import server
+        from collection_manager import Collection
+        from ingest import rebuild_index
+
+        vectors = make_index_dir(tmp_path / "index")
+        [out] = rebuild_index(str(tmp_path / "index"), str(tmp_path / "ivf"), "IVF8,SQ8", nprobe=4)
+        collection = Collection("ivf", out).load()
+        query = vectors[:1].copy()
+
+        request = server.RetrievalRequest(query="q", k=5, language_filter=True, diversify=True,
+                                          max_per_document=2, use_cache=False)
+        scores, positions = server.search_collection(
+            collection, query, request, "hi", server.candidate_count(request)
+        )
+        assert len(positions) and positions[0] == 0
+        assert {collection.chunks[p]["language"] for p in positions} == {"hi"}
+
+        scores, positions, _ = server.diversify_hits(
+            request, [collection], query, scores, positions, np.zeros(len(positions), dtype=np.int64)
+        )
+        assert len(positions) == 5 and positions[0] == 0
+        documents = [collection.chunks[p]["filename"] for p in positions]
+        assert max(documents.count(d) for d in documents) <= 2
+
+        for name in ("embeddings.npy", "embedding_ids.npy", "embeddings.json"):
+            (Path(out) / name).unlink()
+        with pytest.raises(RuntimeError, match="embedding store"):
+            Collection("ivf", out).load()
@@ -0,0 +1,83 @@
+"""
+Unit Tests for the instrument master and symbol search index
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from instruments import Instrument, InstrumentIndex, load_instrument_master
+
+MASTER = Path(__file__).parent.parent / "data" / "instruments.csv"
+
+
+def build_index():
+    return InstrumentIndex.from_files([str(MASTER)])
+
+
+class TestInstrumentMaster:
+    """Test loading master files"""
+
+    def test_load_bundled_master(self):
+        """Bundled master parses symbols, names and Hindi aliases"""
+        instruments = {i.symbol: i for i in load_instrument_master(str(MASTER))}
+        assert instruments['RELIANCE'].name == 'Reliance Industries Limited'
+        assert 'रिलायंस' in instruments['RELIANCE'].aliases
+        assert instruments['M&M'].exchange == 'NSE'
+
+    def test_nse_equity_list_format(self, tmp_path):
+        """NSE EQUITY_L.csv headers (with padding spaces) are accepted"""
+        path = tmp_path / "EQUITY_L.csv"
+        path.write_text("SYMBOL,NAME OF COMPANY, SERIES, DATE OF LISTING\n"
+                        "20MICRONS,20 Microns Limited,EQ,06-OCT-2008\n")
+        (instrument,) = load_instrument_master(str(path))
+        assert instrument.symbol == '20MICRONS'
+        assert instrument.series == 'EQ'
+
+
+class TestInstrumentSearch:
+    """Test ranked search"""
+
+    def test_exact_symbol_first(self):
+        """Exact symbol beats prefix matches"""
+        results = build_index().search('SBIN')
+        assert results[0]['symbol'] == 'SBIN'
+        assert results[0]['match'] == 'symbol'
+
+    def test_prefix_and_word_matches(self):
+        """Name prefixes rank above matches on later words"""
+        results = build_index().search('mahindra')
+        assert results[0]['symbol'] == 'M&M'
+        assert {'KOTAKBANK', 'TECHM'} <= {r['symbol'] for r in results}
+
+    def test_hindi_alias(self):
+        """Devanagari aliases are searchable"""
+        results = build_index().search('टाटा')
+        assert 'TATAMOTORS' in [r['symbol'] for r in results]
+
+    def test_fuzzy_fallback(self):
+        """Misspellings fall back to trigram matches"""
+        results = build_index().search('infosis')
+        assert results[0]['symbol'] == 'INFY'
+        assert results[0]['match'] == 'fuzzy'
+
+    def test_exchange_filter_and_dedup(self):
+        """Same symbol on two exchanges is kept once per exchange"""
+        index = InstrumentIndex([
+            Instrument('TCS', 'Tata Consultancy Services', 'NSE'),
+            Instrument('TCS', 'Tata Consultancy Services', 'BSE'),
+            Instrument('TCS', 'duplicate', 'NSE'),
+        ])
+        assert len(index) == 2
+        assert [r['exchange'] for r in index.search('tcs', exchange='bse')] == ['BSE']
+
+    def test_exchange_filter_beyond_node_capacity(self):
+        """A full trie node on one exchange does not hide another exchange's matches"""
+        instruments = [Instrument(f'ALPHA{i}', f'Alpha Industries {i}', 'NSE') for i in range(100)]
+        instruments.append(Instrument('ALPHAZZZZ', 'Alpha Industries Bombay', 'BSE'))
+        index = InstrumentIndex(instruments)
+        results = index.search('alpha', exchange='BSE')
+        assert [r['symbol'] for r in results] == ['ALPHAZZZZ']
+        assert index.search('alfa industrees', exchange='BSE')[0]['symbol'] == 'ALPHAZZZZ'
@@ -0,0 +1,79 @@
+"""
+Unit Tests for fast query language detection
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import lang_detect
+from lang_detect import (
+    classify_by_script,
+    detect_language,
+    normalize_lang_hint,
+    script_histogram,
+)
+
+
+class TestScriptClassifier:
+    """Test the Unicode script histogram classifier"""
+
+    def test_histogram_counts_matras_with_devanagari(self):
+        """Combining marks are counted with their script"""
+        counts = script_histogram("ऋण 123")
+        assert counts == {'devanagari': 2}
+
+    def test_short_latin_query_is_english(self):
+        """Short Latin-script queries are classified without langdetect"""
+        assert classify_by_script("loan eligibility criteria") == 'en'
+
+    def test_devanagari_query_is_hindi(self):
+        """Devanagari queries are classified as Hindi"""
+        assert classify_by_script("ऋण पात्रता मानदंड क्या हैं?") == 'hi'
+
+    def test_mixed_script_is_ambiguous(self):
+        """Mixed-script queries are left to the full detector"""
+        assert classify_by_script("home loan की ब्याज दर") is None
+
+    def test_long_latin_text_is_ambiguous(self):
+        """Long Latin text may be any language"""
+        text = "taux d'intérêt " * 20
+        assert classify_by_script(text) is None
+        assert classify_by_script(text, short_query_chars=None) == 'en'
+
+    def test_no_letters(self):
+        """Digits and punctuation give no signal"""
+        assert classify_by_script("12345 ?!") is None
+
+
+class TestDetectLanguage:
+    """Test the layered detection entry point"""
+
+    def test_hint_wins(self):
+        """An explicit hint short-circuits detection"""
+        assert detect_language("loan eligibility", lang_hint="hi-IN") == 'hi'
+
+    def test_auto_hint_ignored(self):
+        """Placeholder hints fall through to detection"""
+        assert normalize_lang_hint("auto") is None
+        assert detect_language("loan eligibility", lang_hint="auto") == 'en'
+
+    def test_result_is_memoised(self, monkeypatch):
+        """Repeated queries do not re-run the fallback detector"""
+        calls = []
+
+        def fake_detect(text):
+            calls.append(text)
+            return 'hi'
+
+        monkeypatch.setattr(lang_detect, 'detect', fake_detect, raising=False)
+        monkeypatch.setattr(lang_detect, 'LANGDETECT_AVAILABLE', True)
+        lang_detect._detect_from_text.cache_clear()
+
+        query = "mera home loan ka EMI कितना है"
+        assert detect_language(query) == 'hi'
+        assert detect_language(query) == 'hi'
+        assert len(calls) == 1
+        lang_detect._detect_from_text.cache_clear()
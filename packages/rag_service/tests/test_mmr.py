@@ -0,0 +1,47 @@
+"""
+Unit Tests for MMR hit selection
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mmr import mmr_select
+
+
+def normalized(rows):
+    rows = np.asarray(rows, dtype=np.float32)
+    return rows / np.linalg.norm(rows, axis=1, keepdims=True)
+
+
+class TestMMRSelect:
+    """Test diversity, the per-group cap and the pure-relevance limit"""
+
+    def setup_method(self):
+        # Candidates 0 and 1 are near-duplicates; 2 is different but less relevant
+        self.vectors = normalized([[1.0, 0.0, 0.0], [0.99, 0.1, 0.0], [0.0, 1.0, 0.0], [0.0, 0.0, 1.0]])
+        self.relevance = np.array([0.90, 0.89, 0.70, 0.30], dtype=np.float32)
+
+    def test_skips_near_duplicate(self):
+        """The duplicate of the best hit loses to a novel, slightly less relevant hit"""
+        order = mmr_select(self.relevance, self.vectors, k=2, lambda_mult=0.5)
+        assert order.tolist() == [0, 2]
+
+    def test_lambda_one_is_top_k(self):
+        """lambda 1.0 reproduces plain relevance order"""
+        order = mmr_select(self.relevance, self.vectors, k=3, lambda_mult=1.0)
+        assert order.tolist() == [0, 1, 2]
+
+    def test_per_group_cap(self):
+        """At most max_per_group picks come from one group; fewer than k if capped out"""
+        groups = np.array(["a", "a", "a", "b"])
+        order = mmr_select(self.relevance, None, k=4, groups=groups, max_per_group=1)
+        assert order.tolist() == [0, 3]
+
+    def test_empty_pool(self):
+        order = mmr_select(np.empty(0, dtype=np.float32), None, k=5)
+        assert order.tolist() == []
@@ -0,0 +1,200 @@
+"""
+Unit Tests for the OCR fallback of image-only pages
+"""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import ocr
+from ocr import OCRCache, PageOCR
+
+
+class TestOCRCache:
+    """Test OCR text records keyed by page image hash"""
+
+    def test_round_trip(self, tmp_path):
+        """Saved text is returned for the same page hash only"""
+        cache = OCRCache(str(tmp_path))
+        cache.save("ab" * 32, "स्कैन किया गया परिपत्र")
+        assert cache.load("ab" * 32) == "स्कैन किया गया परिपत्र"
+        assert cache.load("cd" * 32) is None
+
+
+class FakeTesseractError(RuntimeError):
+    pass
+
+
+class FakeImage:
+    size = (10, 10)
+
+    def tobytes(self):
+        return b"page image"
+
+
+class FakePdf:
+    """pypdfium2.PdfDocument stand-in whose pages render to FakeImage"""
+
+    def __init__(self, path):
+        pass
+
+    def __getitem__(self, index):
+        return SimpleNamespace(render=lambda **kw: SimpleNamespace(to_pil=FakeImage))
+
+    def close(self):
+        pass
+
+
+def fake_ocr_modules(monkeypatch, image_to_string):
+    """Stand-ins for pypdfium2 and pytesseract (not needed to test error handling)"""
+    monkeypatch.setattr(ocr, "pdfium", SimpleNamespace(PdfDocument=FakePdf), raising=False)
+    monkeypatch.setattr(ocr, "pytesseract", SimpleNamespace(
+        image_to_string=image_to_string, TesseractError=FakeTesseractError
+    ), raising=False)
+
+
+class TestOCRPage:
+    """Test that failed pages are never cached"""
+
+    def test_timeout_is_not_cached(self, tmp_path, monkeypatch):
+        def timeout(image, lang, timeout):
+            raise RuntimeError("Tesseract process timeout")
+
+        fake_ocr_modules(monkeypatch, timeout)
+        page_num, text, timing = ocr.ocr_page("scan.pdf", 1, 300, "hin+eng", "5", str(tmp_path))
+        assert (page_num, text) == (1, "")
+        assert "timed out" in timing["error"]
+        assert not list(tmp_path.rglob("*.json.gz"))
+
+    def test_tesseract_error_propagates(self, tmp_path, monkeypatch):
+        def missing_language(image, lang, timeout):
+            raise FakeTesseractError("Failed loading language 'hin'")
+
+        fake_ocr_modules(monkeypatch, missing_language)
+        with pytest.raises(FakeTesseractError):
+            ocr.ocr_page("scan.pdf", 1, 300, "hin+eng", "5", str(tmp_path))
+        assert not list(tmp_path.rglob("*.json.gz"))
+
+    def test_run_reports_failed_pages(self, monkeypatch):
+        """One failing page is reported; the other pages still come back"""
+        def ocr_page(pdf_path, page_num, *args):
+            if page_num == 2:
+                raise RuntimeError("render failed")
+            return page_num, f"text {page_num}", {'render_ms': 1.0, 'ocr_ms': 1.0, 'cached': False}
+
+        monkeypatch.setattr(ocr, "ocr_page", ocr_page)
+        monkeypatch.setattr(ocr, "ProcessPoolExecutor", ThreadPoolExecutor)
+        engine = PageOCR.__new__(PageOCR)
+        engine.dpi, engine.lang, engine.workers = 300, "hin+eng", 2
+        engine.cache_dir, engine.page_timeout, engine.engine_version = None, 10, "5"
+        engine._pool = None
+        try:
+            results = engine.run("scan.pdf", [1, 2, 3])
+        finally:
+            engine.close()
+        assert [text for _, text, _ in results] == ["text 1", "", "text 3"]
+        assert "render failed" in results[1][2]["error"]
+
+
+class FakeOCR:
+    """Stand-in engine returning fixed text per page"""
+
+    workers = 2
+    dpi = 300
+    version_tag = "ocr-test"
+
+    def __init__(self):
+        self.calls = []
+
+    def run(self, pdf_path, page_nums):
+        self.calls.append(list(page_nums))
+        return [
+            (page_num, f"scanned text of page {page_num} " * 3,
+             {'render_ms': 1.0, 'ocr_ms': 2.0, 'cached': False})
+            for page_num in page_nums
+        ]
+
+
+class TestPipelineOCR:
+    """Test which pages are sent to OCR"""
+
+    def test_only_pages_without_text_are_ocred(self, tmp_path, monkeypatch):
+        """Text-layer pages are kept, missing and near-empty ones OCRed"""
+        import ingest
+        from ingest import PDFIngestionPipeline
+
+        monkeypatch.setattr(ingest, "page_count", lambda path: 4)
+        pipeline = PDFIngestionPipeline.__new__(PDFIngestionPipeline)
+        pipeline.ocr = FakeOCR()
+        pipeline.ocr_report = {}
+
+        extracted = [(1, "a page with a proper text layer", "pypdf"), (3, " 3 ", "pypdf")]
+        pages, failed = pipeline._ocr_missing_pages(str(tmp_path / "scan.pdf"), extracted)
+        assert not failed
+
+        assert pipeline.ocr.calls == [[2, 3, 4]]
+        assert [page[0] for page in pages] == [1, 2, 3, 4]
+        assert [page[2] for page in pages] == ["pypdf", "ocr", "ocr", "ocr"]
+        assert [t["page"] for t in pipeline.ocr_report["scan.pdf"]] == [2, 3, 4]
+
+    def test_failed_page_keeps_extracted_text(self, tmp_path, monkeypatch):
+        """A page whose OCR failed keeps whatever text extraction found"""
+        import ingest
+        from ingest import PDFIngestionPipeline
+
+        class FailingOCR(FakeOCR):
+            def run(self, pdf_path, page_nums):
+                return [(page_num, "", {'render_ms': 0.0, 'ocr_ms': 0.0, 'cached': False,
+                                        'error': "TesseractError: no hin"})
+                        for page_num in page_nums]
+
+        monkeypatch.setattr(ingest, "page_count", lambda path: 2)
+        pipeline = PDFIngestionPipeline.__new__(PDFIngestionPipeline)
+        pipeline.ocr = FailingOCR()
+        pipeline.ocr_report = {}
+
+        pages, failed = pipeline._ocr_missing_pages(str(tmp_path / "scan.pdf"), [(1, "short", "pypdf")])
+        assert failed
+        assert pages == [(1, "short", "pypdf")]
+        assert pipeline.ocr_report["scan.pdf"][0]["error"] == "TesseractError: no hin"
+
+    def test_failed_page_is_not_cached_as_text(self, tmp_path, monkeypatch):
+        """A file with a failed OCR page skips the page-text cache and is retried"""
+        import ingest
+        from ingest import PDFIngestionPipeline
+        from page_cache import PageTextCache
+
+        class FlakyOCR(FakeOCR):
+            def run(self, pdf_path, page_nums):
+                results = super().run(pdf_path, page_nums)
+                if len(self.calls) == 1:
+                    results[0] = (page_nums[0], "", {'render_ms': 0.0, 'ocr_ms': 0.0, 'cached': False,
+                                                     'error': "timed out after 60s"})
+                return results
+
+        pdf_path = tmp_path / "scan.pdf"
+        pdf_path.write_bytes(b"%PDF-1.4 scanned")
+        monkeypatch.setattr(ingest, "page_count", lambda path: 2)
+        pipeline = PDFIngestionPipeline.__new__(PDFIngestionPipeline)
+        pipeline.extraction_mode = "pypdf"
+        pipeline.ocr = FlakyOCR()
+        pipeline.ocr_report = {}
+        pipeline.text_cache = PageTextCache(str(tmp_path / "pages"))
+        monkeypatch.setattr(pipeline, "_extract_pages", lambda path: [(1, "a page with a proper text layer", "pypdf")])
+
+        first = pipeline.extract_text_from_pdf(str(pdf_path))
+        assert [page[0] for page in first] == [1]
+
+        second = pipeline.extract_text_from_pdf(str(pdf_path))
+        assert pipeline.ocr.calls == [[2], [2]]
+        assert [page[2] for page in second] == ["pypdf", "ocr"]
+
+        # The complete result is cached; a third run needs no OCR
+        assert pipeline.extract_text_from_pdf(str(pdf_path)) == second
+        assert len(pipeline.ocr.calls) == 2
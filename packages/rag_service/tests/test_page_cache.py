@@ -0,0 +1,70 @@
+"""
+Unit Tests for the extracted page-text cache
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from page_cache import PageTextCache, file_hash
+
+
+class TestPageTextCache:
+    """Test records keyed by file hash and extractor version"""
+
+    def test_round_trip_and_version_key(self, tmp_path):
+        """Pages are returned for the same extractor version only"""
+        cache = PageTextCache(str(tmp_path / "cache"))
+        pages = [(1, "पहला पृष्ठ", "pdfplumber"), (3, "third page", "pypdf")]
+        cache.save("ab" * 32, "pdfplumber", "0.10.3", pages, "doc.pdf")
+
+        assert cache.load("ab" * 32, "pdfplumber", "0.10.3") == pages
+        assert cache.load("ab" * 32, "pdfplumber", "0.11.0") is None
+        assert cache.load("cd" * 32, "pdfplumber", "0.10.3") is None
+
+    def test_corrupt_record_is_a_miss(self, tmp_path):
+        """Unreadable records are ignored"""
+        cache = PageTextCache(str(tmp_path))
+        path = cache.path("ab" * 32, "pypdf", "3.17.4")
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"not gzip")
+        assert cache.load("ab" * 32, "pypdf", "3.17.4") is None
+
+    def test_file_hash_tracks_content(self, tmp_path):
+        """Renaming keeps the key, editing changes it"""
+        a = tmp_path / "a.pdf"
+        b = tmp_path / "b.pdf"
+        a.write_bytes(b"%PDF-1.4 same")
+        b.write_bytes(b"%PDF-1.4 same")
+        assert file_hash(str(a)) == file_hash(str(b))
+        b.write_bytes(b"%PDF-1.4 changed")
+        assert file_hash(str(a)) != file_hash(str(b))
+
+
+class TestPipelineUsesCache:
+    """Test that extraction is skipped on a cache hit"""
+
+    def test_second_extract_skips_parsing(self, tmp_path, monkeypatch):
+        """Only the first run parses the PDF"""
+        from ingest import PDFIngestionPipeline
+
+        pdf = tmp_path / "doc.pdf"
+        pdf.write_bytes(b"%PDF-1.4 fake")
+        pipeline = PDFIngestionPipeline.__new__(PDFIngestionPipeline)
+        pipeline.text_cache = PageTextCache(str(tmp_path / "cache"))
+        pipeline.extraction_mode = "adaptive"
+        pipeline.ocr = None
+
+        calls = []
+        def fake_extract(path):
+            calls.append(path)
+            return [(1, "page one text", "pypdf")]
+        monkeypatch.setattr(pipeline, "_extract_pages", fake_extract)
+
+        first = pipeline.extract_text_from_pdf(str(pdf))
+        second = pipeline.extract_text_from_pdf(str(pdf))
+
+        assert first == second == [(1, "page one text", "pypdf")]
+        assert len(calls) == 1
@@ -0,0 +1,54 @@
+"""
+Unit Tests for per-request profiling (stage timings, stack sampling)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from profiling import NO_PROFILE, RequestProfile
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestRequestProfile:
+    """Test stage accounting and the collapsed-stack dump"""
+
+    def test_stages_accumulate(self):
+        """Repeated stages add up; begin/end spans are recorded"""
+        profile = RequestProfile()
+        for _ in range(2):
+            with profile.stage("faiss_search"):
+                time.sleep(0.01)
+        profile.begin("queue_wait")
+        profile.end("queue_wait")
+        report = profile.report()
+        assert report['stages_ms']['faiss_search'] >= 20
+        assert "queue_wait" in report['stages_ms']
+        assert "collapsed" not in report
+
+    def test_collapsed_stacks(self):
+        """Sampling records the sampled thread's stack in flame-graph format"""
+        profile = RequestProfile(collapsed=True)
+        with profile.sampling():
+            busy_wait(0.05)
+        report = profile.report()
+        assert report['samples'] > 0
+        line = report['collapsed'].splitlines()[0]
+        stack, count = line.rsplit(" ", 1)
+        assert int(count) > 0
+        assert "busy_wait" in stack
+
+    def test_no_profile_is_inert(self):
+        """NO_PROFILE hooks do nothing"""
+        with NO_PROFILE.stage("encode"), NO_PROFILE.sampling():
+            NO_PROFILE.begin("queue_wait")
+            NO_PROFILE.end("queue_wait")
+            NO_PROFILE.add("encode", 1.0)
@@ -0,0 +1,94 @@
+"""
+Unit Tests for the bounded quote cache
+"""
+
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from quote_cache import QuoteCache
+from stock_service import IST, StockPriceService, is_market_open
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestQuoteCache:
+    """Test TTL, LRU, single-flight and stale-while-revalidate behaviour"""
+
+    def test_single_flight(self):
+        """Concurrent misses for one key trigger a single upstream call"""
+        cache = QuoteCache()
+        calls = []
+        release = threading.Event()
+
+        def fetch():
+            calls.append(1)
+            release.wait(2)
+            return {'price': 1}
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(cache.get_or_fetch, 'NIFTY', fetch) for _ in range(8)]
+            time.sleep(0.1)
+            release.set()
+            results = [f.result() for f in futures]
+
+        assert len(calls) == 1
+        assert all(r == {'price': 1} for r in results)
+        assert cache.stats['coalesced'] == 7
+
+    def test_stale_while_revalidate(self):
+        """Expired entries are served immediately and refreshed in the background"""
+        clock = FakeClock()
+        executor = ThreadPoolExecutor(max_workers=1)
+        cache = QuoteCache(ttl=lambda key: 10, stale_ttl=100, executor=executor, clock=clock)
+        cache.put('NIFTY', 'old')
+
+        clock.now = 50
+        assert cache.get_or_fetch('NIFTY', lambda: 'new') == 'old'
+        executor.shutdown(wait=True)
+        assert cache.get('NIFTY') == 'new'
+        assert cache.stats['refreshes'] == 1
+
+        clock.now = 500  # Past the stale window: entry is gone
+        assert cache.get('NIFTY') is None
+
+    def test_lru_eviction(self):
+        """Least recently used keys are evicted beyond max_entries"""
+        cache = QuoteCache(max_entries=2)
+        cache.put('A', 1)
+        cache.put('B', 2)
+        cache.get('A')
+        cache.put('C', 3)
+
+        assert 'A' in cache and 'C' in cache and 'B' not in cache
+        assert cache.stats['evictions'] == 1
+
+
+class TestTTLPolicy:
+    """Test TTLs per symbol class and market session"""
+
+    def test_market_hours(self):
+        """Regular session is 09:15-15:30 IST on weekdays"""
+        assert is_market_open(datetime(2024, 1, 3, 10, 0, tzinfo=IST))
+        assert not is_market_open(datetime(2024, 1, 3, 16, 0, tzinfo=IST))
+        assert not is_market_open(datetime(2024, 1, 6, 10, 0, tzinfo=IST))
+
+    def test_indices_refresh_faster_than_equities(self, monkeypatch):
+        """During market hours indices get a shorter TTL than equities"""
+        import stock_service
+        monkeypatch.setattr(stock_service, 'is_market_open', lambda: True)
+        service = StockPriceService(source=object())
+        assert service.cache_ttl('^NSEI') < service.cache_ttl('TCS.NS')
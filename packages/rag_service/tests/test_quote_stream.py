@@ -0,0 +1,146 @@
+"""
+Unit Tests for streaming quote fan-out (against a local fake price source)
+"""
+
+import asyncio
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from quote_stream import QuoteBroadcaster
+from stock_service import StockPriceService
+
+
+class FakePriceSource:
+    """Price source whose prices the test moves by hand"""
+
+    def __init__(self, prices):
+        self.prices = dict(prices)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_info(self, symbol):
+        with self.lock:
+            self.calls.append(symbol)
+        price = self.prices[symbol]
+        return {'currentPrice': price, 'previousClose': 100.0, 'longName': symbol}
+
+    def get_history(self, symbol, period="1mo", interval="1d", start=None):
+        raise NotImplementedError
+
+
+def make_broadcaster(prices):
+    source = FakePriceSource(prices)
+    service = StockPriceService(source=source)
+    return QuoteBroadcaster(service, interval=3600), source
+
+
+class TestQuoteBroadcaster:
+    """Test single-poll fan-out, coalescing and subscription bookkeeping"""
+
+    def test_one_fetch_fans_out_to_all_subscribers(self):
+        """Many subscribers to a symbol cost one upstream fetch per poll"""
+        async def scenario():
+            broadcaster, source = make_broadcaster({'TCS.NS': 101.0})
+            subs = [broadcaster.open(['TCS']) for _ in range(50)]
+            await broadcaster.poll_once()
+            updates = [await sub.get(timeout=1) for sub in subs]
+            await broadcaster.stop()
+            return source, updates
+
+        source, updates = asyncio.run(scenario())
+        assert source.calls.count('TCS.NS') <= 2  # initial wake-up poll + explicit poll
+        assert all(u[0]['symbol'] == 'TCS' and u[0]['current_price'] == 101.0 for u in updates)
+
+    def test_slow_consumer_gets_latest_only(self):
+        """Undelivered updates for a symbol are replaced, not queued"""
+        async def scenario():
+            broadcaster, source = make_broadcaster({'TCS.NS': 101.0})
+            sub = broadcaster.open(['TCS'])
+            for price in (102.0, 103.0, 104.0):
+                source.prices['TCS.NS'] = price
+                await broadcaster.poll_once()
+            updates = await sub.get(timeout=1)
+            await broadcaster.stop()
+            return sub, updates
+
+        sub, updates = asyncio.run(scenario())
+        assert [u['current_price'] for u in updates] == [104.0]
+        assert sub.coalesced >= 2
+
+    def test_unchanged_price_not_pushed_and_late_joiner_gets_snapshot(self):
+        """Same price is not re-sent; new subscribers get the last quote at once"""
+        async def scenario():
+            broadcaster, _ = make_broadcaster({'INFY.NS': 150.0})
+            first = broadcaster.open(['INFY'])
+            await broadcaster.poll_once()
+            await first.get(timeout=1)
+            await broadcaster.poll_once()
+            repeat = await first.get(timeout=0.05)
+            late = broadcaster.open(['infy'])
+            snapshot = await late.get(timeout=0.05)
+            await broadcaster.stop()
+            return repeat, snapshot
+
+        repeat, snapshot = asyncio.run(scenario())
+        assert repeat == []
+        assert snapshot[0]['current_price'] == 150.0
+
+    def test_close_stops_polling_symbol(self):
+        """Symbols without subscribers drop out of the poll set"""
+        async def scenario():
+            broadcaster, _ = make_broadcaster({'TCS.NS': 1.0, 'ITC.NS': 2.0})
+            a = broadcaster.open(['TCS', 'ITC'])
+            b = broadcaster.open(['TCS'])
+            a.close()
+            symbols = broadcaster.symbols
+            await broadcaster.stop()
+            return symbols, b
+
+        symbols, b = asyncio.run(scenario())
+        assert symbols == ['TCS.NS']
+        assert b.closed
+
+    def test_symbol_cap(self):
+        """Subscribing beyond the distinct-symbol cap is rejected"""
+        async def scenario():
+            broadcaster, _ = make_broadcaster({})
+            broadcaster.max_symbols = 1
+            sub = broadcaster.open(['TCS'])
+            try:
+                with pytest.raises(ValueError):
+                    sub.subscribe(['INFY'])
+            finally:
+                await broadcaster.stop()
+
+        asyncio.run(scenario())
+
+    def test_fresh_cached_quotes_are_not_refetched(self):
+        """Polls publish fresh cached quotes and only go upstream near expiry"""
+        async def scenario():
+            broadcaster, source = make_broadcaster({'TCS.NS': 101.0})
+            broadcaster.interval = 5.0
+            service = broadcaster.service
+            service.EQUITY_TTL = (600, 600)
+            sub = broadcaster.open(['TCS'])
+            for _ in range(5):
+                await broadcaster.poll_once()
+            fresh_calls = source.calls.count('TCS.NS')
+
+            service.EQUITY_TTL = (1, 1)
+            service.refresh_quote('TCS')
+            await broadcaster.poll_once()
+            updates = await sub.get(timeout=1)
+            await broadcaster.stop()
+            return fresh_calls, source.calls.count('TCS.NS'), broadcaster.stats, updates
+
+        fresh_calls, total_calls, stats, updates = asyncio.run(scenario())
+        assert fresh_calls <= 2  # first poll (loop wake-up may race the explicit one)
+        assert total_calls == fresh_calls + 2  # explicit refresh + near-expiry refresh
+        assert stats['cached'] >= 4
+        assert updates[0]['current_price'] == 101.0
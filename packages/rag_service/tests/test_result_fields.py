@@ -0,0 +1,100 @@
+"""
+Unit Tests for /retrieve field selection and the /chunks fetch endpoints
+"""
+
+import pickle
+import sys
+import zlib
+from pathlib import Path
+
+import faiss
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server
+
+TEXTS = ["loan eligibility criteria for home loans", "interest rate on savings account",
+         "credit card annual fee waiver", "fixed deposit interest rates for senior citizens"]
+
+
+class FakeModel:
+    """Hashed bag-of-words encoder (no model download)"""
+
+    dim = 32
+
+    def get_sentence_embedding_dimension(self):
+        return self.dim
+
+    def encode(self, texts, convert_to_numpy=True, **kwargs):
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for word in text.lower().split():
+                out[i, zlib.crc32(word.encode()) % self.dim] += 1.0
+        return out
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """Server state with a small in-memory index, startup skipped"""
+    model = FakeModel()
+    vectors = model.encode(TEXTS)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(model.dim)
+    index.add(vectors)
+    faiss.write_index(index, str(tmp_path / "faiss_index.bin"))
+    chunks = [
+        dict(chunk_id=100 + i, filename="faq.pdf", page_num=1, text=text, excerpt=text[:20],
+             char_start=0, char_end=len(text), language="en")
+        for i, text in enumerate(TEXTS)
+    ]
+    with open(tmp_path / "metadata.pkl", "wb") as f:
+        pickle.dump({"chunks": chunks, "embedding_model": server.settings.embedding_model}, f)
+
+    monkeypatch.setattr(server, "state", server.ServerState())
+    monkeypatch.setattr(server.settings, "index_path", str(tmp_path))
+    monkeypatch.setattr(server.settings, "collections_dir", "")
+    server.state.model = model
+    server.load_index_and_metadata()
+    server.state.ready = True
+    return TestClient(server.app)
+
+
+class TestResultFields:
+    """Test that only the requested result fields are built"""
+
+    def test_fields_subset(self, client):
+        response = client.post("/retrieve", json={"query": "savings interest", "k": 2,
+                                                  "fields": ["chunk_id", "score"]})
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert results and all(set(r) == {"chunk_id", "score"} for r in results)
+        assert results[0]["chunk_id"] == 101
+
+    def test_default_fields(self, client):
+        results = client.post("/retrieve", json={"query": "savings interest", "k": 1}).json()["results"]
+        assert set(results[0]) == set(server.RESULT_FIELDS)
+
+    def test_unknown_field_rejected(self, client):
+        response = client.post("/retrieve", json={"query": "test", "fields": ["chunk_id", "embedding"]})
+        assert response.status_code == 422
+
+
+class TestChunksEndpoints:
+    """Test GET /chunks/{id} and POST /chunks"""
+
+    def test_get_chunk(self, client):
+        chunk = client.get("/chunks/102").json()
+        assert chunk["text"] == TEXTS[2] and chunk["chunk_id"] == 102
+        assert client.get("/chunks/999").status_code == 404
+
+    def test_bulk_fetch_with_fields_and_missing(self, client):
+        body = client.post("/chunks", json={"ids": [103, 999, 100], "fields": ["chunk_id", "text"]}).json()
+        assert body["chunks"] == [{"chunk_id": 103, "text": TEXTS[3]}, {"chunk_id": 100, "text": TEXTS[0]}]
+        assert body["missing"] == [999]
+
+    def test_bulk_fetch_needs_ids(self, client):
+        assert client.post("/chunks", json={"ids": []}).status_code == 422
@@ -0,0 +1,59 @@
+"""
+Unit Tests for the semantic query cache
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from semantic_cache import SemanticCache
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class TestSemanticCache:
+    """Test similarity lookups, parameter matching and eviction"""
+
+    def test_near_duplicate_hits_and_distant_misses(self):
+        """Queries above the similarity threshold reuse the cached value"""
+        cache = SemanticCache(dim=3, min_similarity=0.95)
+        cache.store(unit(1, 0, 0), ('k', 5), "hits-a", search_ms=4.0)
+
+        assert cache.lookup(unit(1, 0.1, 0), ('k', 5)) == "hits-a"
+        assert cache.lookup(unit(0, 1, 0), ('k', 5)) is None
+
+        metrics = cache.metrics()
+        assert metrics['hits'] == 1 and metrics['misses'] == 1
+        assert metrics['hit_rate'] == 0.5
+        assert metrics['saved_ms'] == 4.0
+
+    def test_params_must_match(self):
+        """A similar query searched with other parameters is a miss"""
+        cache = SemanticCache(dim=3)
+        cache.store(unit(1, 0, 0), (5, None), "k5")
+        assert cache.lookup(unit(1, 0, 0), (10, None)) is None
+        cache.store(unit(1, 0, 0), (10, None), "k10")
+        assert cache.lookup(unit(1, 0, 0), (10, None)) == "k10"
+
+    def test_lru_eviction_and_clear(self):
+        """The least recently used entry is evicted first"""
+        cache = SemanticCache(dim=3, max_entries=2)
+        cache.store(unit(1, 0, 0), None, "x")
+        cache.store(unit(0, 1, 0), None, "y")
+        cache.lookup(unit(1, 0, 0), None)        # x is now most recent
+        cache.store(unit(0, 0, 1), None, "z")    # evicts y
+
+        assert cache.lookup(unit(0, 1, 0), None) is None
+        assert cache.lookup(unit(1, 0, 0), None) == "x"
+        assert cache.stats['evictions'] == 1
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.lookup(unit(1, 0, 0), None) is None
@@ -0,0 +1,57 @@
+"""
+Unit Tests for lazy STT loading and the components reported by /status
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import server
+
+
+class FakePool:
+    """EnginePool stand-in (no model download)"""
+
+    def __init__(self, backend, model_name, size=1, **kwargs):
+        self.backend = backend
+        self.size = size
+
+
+class TestSTTStatus:
+    """Test that STT availability is reported before and after the lazy load"""
+
+    def test_missing_backend_is_unavailable(self, monkeypatch):
+        """No installed backend: /status says so before any /transcribe call"""
+        monkeypatch.setattr(server, "available_backends", lambda: [])
+        monkeypatch.setattr(server, "state", server.ServerState())
+        client = TestClient(server.app)
+
+        status = client.get("/status").json()
+        assert status["whisper_available"] is False
+        assert status["components"]["stt"] == "unavailable"
+
+        response = client.post("/transcribe", files={"audio": ("a.wav", b"RIFF", "audio/wav")})
+        assert response.status_code == 501
+
+    def test_stt_loads_on_first_use(self, monkeypatch):
+        """Installed backend: not loaded at startup, ready after the first use"""
+        monkeypatch.setattr(server, "available_backends", lambda: [server.settings.stt_backend])
+        monkeypatch.setattr(server, "EnginePool", FakePool)
+        monkeypatch.setattr(server, "state", server.ServerState())
+        client = TestClient(server.app)
+
+        status = client.get("/status").json()
+        assert status["whisper_available"] is True
+        assert status["components"]["stt"] == "not_loaded"
+        assert status["stt_backend"] is None
+
+        assert isinstance(asyncio.run(server.ensure_stt_pool()), FakePool)
+        status = client.get("/status").json()
+        assert status["components"]["stt"] == "ready"
+        assert status["stt_backend"] == server.settings.stt_backend
+        assert "stt" in status["load_times_seconds"]
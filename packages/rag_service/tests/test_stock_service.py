@@ -0,0 +1,259 @@
+"""
+Unit Tests for the stock price service (against a local stub data source)
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stock_service import StockPriceService
+
+
+class StubSource:
+    """In-memory market data source with optional per-symbol delays/failures"""
+
+    def __init__(self, prices=None, delays=None, failures=(), history=None):
+        self.prices = prices or {}
+        self.history = history
+        self.delays = delays or {}
+        self.failures = set(failures)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_info(self, symbol):
+        with self.lock:
+            self.calls.append(symbol)
+        time.sleep(self.delays.get(symbol, 0))
+        if symbol in self.failures:
+            raise ConnectionError(f"upstream error for {symbol}")
+        price = self.prices.get(symbol)
+        if price is None:
+            return {}
+        return {
+            'currentPrice': price,
+            'previousClose': price - 10,
+            'longName': symbol,
+            'currency': 'INR',
+        }
+
+    def get_history(self, symbol, period="1mo", interval="1d", start=None):
+        with self.lock:
+            self.calls.append(('history', period if start is None else start))
+        if self.history is None:
+            raise NotImplementedError
+        if start is not None:
+            return self.history[self.history.index >= start]
+        return self.history
+
+
+def make_history(days=40):
+    """Daily OHLCV frame in IST ending today"""
+    import numpy as np
+    import pandas as pd
+
+    index = pd.date_range(end=pd.Timestamp.now(tz='Asia/Kolkata').normalize(),
+                          periods=days, freq='D')
+    close = np.linspace(100, 140, days)
+    return pd.DataFrame({
+        'Open': close - 1, 'High': close + 2, 'Low': close - 2,
+        'Close': close, 'Volume': np.arange(days) * 1000.0,
+    }, index=index)
+
+
+class TestStockPrice:
+    """Test single quote lookups"""
+
+    def test_normalize_symbol(self):
+        """Indices map to Yahoo codes and equities default to NSE"""
+        service = StockPriceService(source=StubSource())
+        assert service.normalize_symbol('nifty') == '^NSEI'
+        assert service.normalize_symbol('tcs') == 'TCS.NS'
+        assert service.normalize_symbol('TCS.BO') == 'TCS.BO'
+
+    def test_quote_and_cache(self):
+        """Second lookup is served from cache"""
+        source = StubSource(prices={'TCS.NS': 3500.0})
+        service = StockPriceService(source=source)
+
+        first = service.get_stock_price('TCS')
+        second = service.get_stock_price('TCS')
+
+        assert first['current_price'] == 3500.0
+        assert first['change'] == 10.0
+        assert second is first
+        assert source.calls == ['TCS.NS']
+
+    def test_missing_price_returns_none(self):
+        """Symbols without a price resolve to None"""
+        service = StockPriceService(source=StubSource())
+        assert service.get_stock_price('UNKNOWN') is None
+
+
+class TestBulkQuotes:
+    """Test concurrent bulk fetching"""
+
+    def test_bulk_fetch_is_concurrent(self):
+        """Latency is bounded by the slowest symbol, not the sum"""
+        symbols = ['TCS', 'INFY', 'WIPRO', 'ITC']
+        source = StubSource(
+            prices={f"{s}.NS": 100.0 for s in symbols},
+            delays={f"{s}.NS": 0.2 for s in symbols},
+        )
+        service = StockPriceService(source=source, max_workers=4)
+
+        start = time.perf_counter()
+        results = service.get_multiple_stocks(symbols)
+        elapsed = time.perf_counter() - start
+
+        assert list(results) == symbols
+        assert all(r['current_price'] == 100.0 for r in results.values())
+        assert elapsed < 0.6
+
+    def test_partial_failures_and_deadline(self):
+        """Failed and slow symbols are reported without failing the batch"""
+        source = StubSource(
+            prices={'TCS.NS': 100.0, 'SLOW.NS': 100.0, 'BAD.NS': 100.0},
+            delays={'SLOW.NS': 1.0},
+            failures={'BAD.NS'},
+        )
+        service = StockPriceService(source=source)
+
+        results, errors = service.fetch_quotes(['TCS', 'SLOW', 'BAD', 'TCS'], timeout=0.3)
+
+        assert results['TCS']['current_price'] == 100.0
+        assert results['SLOW'] is None and 'Timed out' in errors['SLOW']
+        assert results['BAD'] is None and 'upstream error' in errors['BAD']
+        assert 'TCS' not in errors
+        assert source.calls.count('TCS.NS') == 1
+
+
+class TestAsyncQuotes:
+    """Test the non-blocking wrappers used by the FastAPI handlers"""
+
+    def test_slow_upstream_does_not_block_event_loop(self):
+        """Other coroutines keep running while a quote is fetched"""
+        import asyncio
+
+        source = StubSource(prices={'TCS.NS': 100.0}, delays={'TCS.NS': 0.3})
+        service = StockPriceService(source=source)
+
+        async def scenario():
+            ticks = 0
+
+            async def ticker():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            task = asyncio.create_task(ticker())
+            quote = await service.get_stock_price_async('TCS')
+            task.cancel()
+            return quote, ticks
+
+        quote, ticks = asyncio.run(scenario())
+        assert quote['current_price'] == 100.0
+        assert ticks >= 10
+
+    def test_cached_quote_served_inline(self):
+        """Cached quotes do not hop to the executor"""
+        import asyncio
+
+        source = StubSource(prices={'TCS.NS': 100.0})
+        service = StockPriceService(source=source)
+        service.get_stock_price('TCS')
+
+        quote = asyncio.run(service.get_stock_price_async('TCS'))
+        assert quote['current_price'] == 100.0
+        assert source.calls == ['TCS.NS']
+
+
+class TestPrefetcher:
+    """Test the background watchlist refresher"""
+
+    def test_refresh_warms_cache_and_skips_fresh(self, monkeypatch):
+        """Watched symbols are fetched once, then served from memory"""
+        import asyncio
+        import stock_service
+        from stock_service import MarketDataPrefetcher
+
+        monkeypatch.setattr(stock_service, 'is_market_open', lambda: False)
+
+        source = StubSource(prices={'^NSEI': 22000.0, 'TCS.NS': 3500.0})
+        service = StockPriceService(source=source)
+        prefetcher = MarketDataPrefetcher(
+            service, watchlist=['NIFTY', 'TCS'], max_requests_per_minute=6000
+        )
+
+        assert asyncio.run(prefetcher.refresh_once()) == 2
+        assert prefetcher.due_symbols() == []
+
+        calls_before = len(source.calls)
+        assert service.get_stock_price('NIFTY')['current_price'] == 22000.0
+        assert len(source.calls) == calls_before
+
+    def test_errors_are_counted(self):
+        """Upstream failures do not stop the cycle"""
+        import asyncio
+        from stock_service import MarketDataPrefetcher
+
+        source = StubSource(prices={'TCS.NS': 1.0}, failures={'BAD.NS'})
+        prefetcher = MarketDataPrefetcher(
+            StockPriceService(source=source), watchlist=['BAD', 'TCS'],
+            max_requests_per_minute=6000
+        )
+
+        assert asyncio.run(prefetcher.refresh_once()) == 1
+        assert prefetcher.stats['errors'] == 1
+
+
+class TestHistory:
+    """Test the vectorised history path and its on-disk cache"""
+
+    def test_rows_and_columnar(self):
+        """Both formats carry the same values"""
+        source = StubSource(history=make_history(5))
+        service = StockPriceService(source=source)
+
+        rows = service.get_historical_data('TCS', period='5d')
+        columns = service.get_historical_data('TCS', period='5d', format='columnar')
+
+        assert len(rows['data']) == 5
+        assert rows['data'][-1]['close'] == 140.0
+        assert rows['data'][1]['volume'] == 1000
+        assert 'T' in rows['data'][0]['date']
+        assert columns['format'] == 'columnar'
+        assert columns['data']['close'] == [r['close'] for r in rows['data']]
+
+    def test_cache_serves_shorter_periods_and_fetches_tail(self, tmp_path):
+        """A cached 3mo series answers 1mo locally and later refreshes only the tail"""
+        import history_cache
+
+        source = StubSource(history=make_history(100))
+        service = StockPriceService(source=source, history_cache_dir=str(tmp_path))
+
+        full = service.get_historical_data('TCS', period='3mo')
+        short = service.get_historical_data('TCS', period='1mo')
+        assert len(source.calls) == 1
+        assert len(short['data']) < len(full['data'])
+        assert short['data'][-1] == full['data'][-1]
+
+        # Pretend the cache is old: only the bars from the last cached one are fetched
+        cache = service.history_cache
+        entry = cache.load('TCS.NS', '1d')
+        path = cache.path('TCS.NS', '1d')
+        import numpy as np
+        with np.load(path) as data:
+            arrays = dict(data)
+        arrays['fetched_at'] = np.array(entry['fetched_at'] - 10 * history_cache.min_refresh_seconds('1d'))
+        np.savez_compressed(path, **arrays)
+
+        service.get_historical_data('TCS', period='1mo')
+        kind, start = source.calls[-1]
+        assert kind == 'history' and not isinstance(start, str)
@@ -0,0 +1,149 @@
+"""
+Unit Tests for in-memory decoding and VAD-windowed transcription
+"""
+
+import io
+import sys
+import wave
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from stt_service import SAMPLE_RATE, decode_audio, iter_transcription, vad_segments
+
+
+def make_clip(pattern):
+    """Build a clip from (seconds, is_speech) pairs; speech is a 220 Hz tone"""
+    parts = []
+    for seconds, is_speech in pattern:
+        n = int(seconds * SAMPLE_RATE)
+        if is_speech:
+            t = np.arange(n) / SAMPLE_RATE
+            parts.append(0.5 * np.sin(2 * np.pi * 220 * t))
+        else:
+            parts.append(np.random.default_rng(0).normal(0, 0.001, n))
+    return np.concatenate(parts).astype(np.float32)
+
+
+class FakeWhisper:
+    """Records calls and returns one segment per window"""
+    def __init__(self):
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(options)
+        n = len(self.calls)
+        return {
+            'text': f"window {n}",
+            'language': options.get('language') or 'hi',
+            'segments': [{'start': 0.0, 'end': len(audio) / SAMPLE_RATE,
+                          'text': f" window {n} "}],
+        }
+
+
+class TestVAD:
+    """Test energy-based speech windowing"""
+
+    def test_splits_on_silence(self):
+        """Two utterances separated by a pause give two windows"""
+        clip = make_clip([(0.5, False), (1.0, True), (1.0, False), (1.0, True), (0.5, False)])
+        segments = vad_segments(clip)
+        assert len(segments) == 2
+        first_start = segments[0][0] / SAMPLE_RATE
+        second_start = segments[1][0] / SAMPLE_RATE
+        assert 0.2 < first_start < 0.5
+        assert 2.2 < second_start < 2.5
+
+    def test_long_speech_capped_to_window(self):
+        """Continuous speech is split into windows no longer than the cap"""
+        clip = make_clip([(5.0, True)])
+        segments = vad_segments(clip, max_window_s=2.0)
+        assert len(segments) == 3
+        assert all((end - start) / SAMPLE_RATE <= 2.0 for start, end in segments)
+
+    def test_silence_only(self):
+        """Pure silence produces no windows"""
+        assert vad_segments(make_clip([(2.0, False)])) == []
+
+
+class TestIterTranscription:
+    """Test windowed transcription"""
+
+    def test_offsets_and_language_reuse(self):
+        """Segments get absolute times and later windows reuse the language"""
+        clip = make_clip([(0.5, False), (1.0, True), (1.0, False), (1.0, True)])
+        model = FakeWhisper()
+
+        segments = list(iter_transcription(model, clip))
+
+        assert [s['text'] for s in segments] == ["window 1", "window 2"]
+        assert segments[1]['start'] > 2.0
+        assert model.calls[0]['language'] is None
+        assert model.calls[1]['language'] == 'hi'
+        assert model.calls[1]['initial_prompt'] == "window 1"
+
+
+class TestDecodeAudio:
+    """Test in-memory decoding"""
+
+    def test_decode_wav_bytes(self):
+        """A 16 kHz WAV held in memory decodes to float samples"""
+        pcm = (make_clip([(0.5, True)]) * 32767).astype(np.int16)
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(pcm.tobytes())
+
+        try:
+            samples = decode_audio(buffer.getvalue())
+        except RuntimeError as e:
+            pytest.skip(str(e))
+
+        assert samples.dtype == np.float32
+        assert abs(len(samples) - len(pcm)) < SAMPLE_RATE // 100
+
+
+class TestEnginePool:
+    """Test the STT engine pool"""
+
+    def test_pool_runs_engines_concurrently(self, monkeypatch):
+        """Each concurrent call borrows its own engine instance"""
+        import threading
+        import stt_service
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        class BlockingEngine(FakeWhisper):
+            def __init__(self, model_name, **kwargs):
+                super().__init__()
+
+            def transcribe(self, audio, **options):
+                barrier.wait()  # Deadlocks unless two engines run at once
+                return super().transcribe(audio, **options)
+
+        monkeypatch.setitem(stt_service.STT_ENGINES, 'fake', BlockingEngine)
+        pool = stt_service.EnginePool('fake', 'tiny', size=2)
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(pool.transcribe(np.zeros(10))))
+            for _ in range(2)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(results) == 2
+
+    def test_unknown_backend(self):
+        """Unknown backends are rejected"""
+        import stt_service
+        with pytest.raises(ValueError):
+            stt_service.EnginePool('nope', 'base')
@@ -0,0 +1,36 @@
+"""
+Unit Tests for the extracted-text quality heuristics
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from text_quality import text_quality_issues
+
+
+class TestTextQualityIssues:
+    """Test which pages get re-extracted by the adaptive mode"""
+
+    def test_clean_text_passes(self):
+        """Ordinary English and Hindi prose has no issues"""
+        assert text_quality_issues(
+            "The Reserve Bank of India regulates mutual funds and banks.\n" * 3
+        ) == []
+        assert text_quality_issues("म्यूचुअल फंड में निवेश बाजार जोखिम के अधीन है। " * 3) == []
+
+    def test_empty_and_garbled(self):
+        """Near-empty pages and unmapped glyphs are flagged"""
+        assert text_quality_issues("  12 \n") == ['empty']
+        assert 'garbled' in text_quality_issues("(cid:12)(cid:45) fund (cid:3) " * 5)
+
+    def test_detached_devanagari_marks(self):
+        """Vowel signs split from their consonants are flagged"""
+        assert 'devanagari' in text_quality_issues("म ् य ू च ु अल फ ं ड " * 5)
+
+    def test_column_layout(self):
+        """Lines with wide internal gaps look like side-by-side columns"""
+        text = "\n".join(f"Left column line {i}      Right column line {i}" for i in range(8))
+        assert 'columns' in text_quality_issues(text)
@@ -0,0 +1,79 @@
+"""
+Quality heuristics for extracted PDF page text
+
+Used by the adaptive extraction mode in ingest.py: a page is first read with
+the fast extractor (pypdf) and only re-read with the slow layout-aware one
+(pdfplumber) when its text shows one of these problems:
+
+    empty       -> (almost) no text on the page
+    garbled     -> replacement characters, unmapped glyphs "(cid:NN)",
+                   private-use or control characters
+    legacy_font -> dense Latin-1 symbols typical of non-Unicode Hindi fonts
+    devanagari  -> vowel signs / viramas detached from their consonants
+    columns     -> many lines with wide internal gaps (side-by-side columns)
+"""
+
+import re
+import unicodedata
+from typing import List
+
+# Bump when the heuristics change so cached adaptive extractions are redone
+HEURISTICS_VERSION = 1
+
+MIN_PAGE_CHARS = 20
+GARBLED_RATIO = 0.02
+LEGACY_FONT_RATIO = 0.10
+DETACHED_MARK_RATIO = 0.03
+COLUMN_LINE_RATIO = 0.3
+
+CID_PATTERN = re.compile(r'\(cid:\d+\)')
+COLUMN_GAP_PATTERN = re.compile(r'\S {3,}\S')
+
+# Devanagari dependent vowel signs, virama and nukta
+DEVANAGARI_MARKS = re.compile(r'(?:^|\s)[\u093a-\u094f\u0962\u0963]')
+DEVANAGARI_CHARS = re.compile(r'[\u0900-\u097f]')
+
+
+def text_quality_issues(text: str) -> List[str]:
+    """
+    Problems detected in one page of extracted text
+
+    Args:
+        text: Extracted page text
+
+    Returns:
+        List of issue names (empty when the text looks fine)
+    """
+    stripped = text.strip()
+    if len(stripped) < MIN_PAGE_CHARS:
+        return ['empty']
+
+    issues = []
+    n = len(stripped)
+
+    bad = stripped.count('\ufffd') + 6 * len(CID_PATTERN.findall(stripped))
+    bad += sum(
+        1 for c in stripped
+        if unicodedata.category(c) in ('Co', 'Cc') and c not in '\n\t\r'
+    )
+    if bad / n > GARBLED_RATIO:
+        issues.append('garbled')
+
+    # Legacy (non-Unicode) Hindi fonts come out as Latin-1 symbol soup
+    legacy = sum(1 for c in stripped if '\u00a0' < c <= '\u024f')
+    if legacy / n > LEGACY_FONT_RATIO:
+        issues.append('legacy_font')
+
+    devanagari = len(DEVANAGARI_CHARS.findall(stripped))
+    if devanagari:
+        detached = len(DEVANAGARI_MARKS.findall(stripped)) + stripped.count('\u25cc')
+        if detached / devanagari > DETACHED_MARK_RATIO:
+            issues.append('devanagari')
+
+    lines = [line for line in stripped.splitlines() if line.strip()]
+    if len(lines) >= 5:
+        gapped = sum(1 for line in lines if COLUMN_GAP_PATTERN.search(line.strip()))
+        if gapped / len(lines) > COLUMN_LINE_RATIO:
+            issues.append('columns')
+
+    return issues